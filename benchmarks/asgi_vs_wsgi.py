@@ -0,0 +1,111 @@
+"""Нагрузочное сравнение WSGI и ASGI путей чтения заметок.
+
+Запуск: python -m benchmarks.asgi_vs_wsgi --requests 2000 --concurrency 32
+
+WSGI-путь - синхронные views через django.test.Client в пуле потоков,
+как у потокового WSGI-сервера. ASGI-путь - асинхронные views через
+AsyncClient в одном цикле событий.
+"""
+import argparse
+import asyncio
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.common import (
+    Timer, benchmark_database, setup_django, summarize, use_async_views
+)
+
+
+def seed(notes_count):
+    """Создаёт пользователя с notes_count заметками."""
+    from django.contrib.auth import get_user_model
+
+    from notes.models import Note
+
+    user = get_user_model().objects.create(username='bench')
+    Note.objects.bulk_create(
+        Note(title=f'Заметка {i}', text='Текст ' * 50, slug=f'note-{i}',
+             author=user)
+        for i in range(notes_count)
+    )
+    return user
+
+
+def run_wsgi(urls, user, requests, concurrency):
+    """Синхронные views, клиенты в потоках."""
+    from django.db import connection
+    from django.test import Client
+
+    def worker(share):
+        client = Client()
+        client.force_login(user)
+        samples = []
+        for number in range(share):
+            with Timer() as timer:
+                client.get(urls[number % len(urls)])
+            samples.append(timer.ms)
+        connection.close()
+        return samples
+
+    use_async_views(False)
+    started = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as executor:
+        results = executor.map(worker, [requests // concurrency] * concurrency)
+        samples = [sample for result in results for sample in result]
+    return summarize(samples, time.perf_counter() - started)
+
+
+def run_asgi(urls, user, requests, concurrency):
+    """Асинхронные views, клиенты в одном цикле событий."""
+    from asgiref.sync import sync_to_async
+
+    from django.test import AsyncClient
+
+    async def worker(share):
+        client = AsyncClient()
+        await sync_to_async(client.force_login)(user)
+        samples = []
+        for number in range(share):
+            with Timer() as timer:
+                await client.get(urls[number % len(urls)])
+            samples.append(timer.ms)
+        return samples
+
+    async def main():
+        results = await asyncio.gather(
+            *(worker(requests // concurrency) for _ in range(concurrency))
+        )
+        return [sample for result in results for sample in result]
+
+    use_async_views(True)
+    started = time.perf_counter()
+    samples = asyncio.run(main())
+    return summarize(samples, time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--requests', type=int, default=1000)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--notes', type=int, default=200)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.urls import reverse
+
+    with benchmark_database():
+        user = seed(args.notes)
+        urls = [reverse('notes:list')] + [
+            reverse('notes:detail', args=(f'note-{i}',))
+            for i in range(min(args.notes, 50))
+        ]
+        report = {
+            'wsgi': run_wsgi(urls, user, args.requests, args.concurrency),
+            'asgi': run_asgi(urls, user, args.requests, args.concurrency),
+        }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+"""Запросы к базе и задержка на сессию и пользователя для list и detail.
+
+Запуск:
+    python -m benchmarks.auth_overhead --iterations 200
+
+Сравниваются движки сессий db, cached_db и signed_cookies с кэшем
+пользователей CachedModelBackend и без него. Столбец saved - на
+сколько запросов меньше, чем у db без кэша пользователей.
+"""
+import argparse
+import json
+
+from benchmarks.common import benchmark_database, setup_django
+from benchmarks.crud import measure
+
+SESSION_ENGINES = 'django.contrib.sessions.backends.'
+CONFIGS = (
+    ('db', 0),
+    ('db', 60),
+    ('cached_db', 0),
+    ('cached_db', 60),
+    ('signed_cookies', 60),
+)
+
+
+def run(rows, iterations):
+    """Прогоняет list и detail для каждой пары (движок, TTL кэша)."""
+    from django.conf import settings
+    from django.test import Client
+    from django.urls import reverse
+
+    from benchmarks.data import seed
+    from notes.auth import user_cache
+    from notes.models import Note
+
+    results = []
+    with benchmark_database():
+        author, = seed(1, rows)
+        slug = Note.objects.filter(author=author).values_list(
+            'slug', flat=True
+        ).first()
+        pages = {
+            'list': reverse('notes:list'),
+            'detail': reverse('notes:detail', args=(slug,)),
+        }
+        for engine, user_cache_ttl in CONFIGS:
+            settings.SESSION_ENGINE = SESSION_ENGINES + engine
+            settings.NOTES_USER_CACHE_TTL = user_cache_ttl
+            user_cache.clear()
+            client = Client()
+            client.force_login(author)
+            for page, url in pages.items():
+                result = measure(
+                    client, lambda client, number: client.get(url), iterations
+                )
+                results.append({
+                    'session_engine': engine,
+                    'user_cache_ttl': user_cache_ttl,
+                    'page': page,
+                    **result,
+                })
+    baseline = {
+        result['page']: result['queries_per_request']
+        for result in results
+        if (result['session_engine'], result['user_cache_ttl']) == CONFIGS[0]
+    }
+    for result in results:
+        result['saved'] = round(
+            baseline[result['page']] - result['queries_per_request'], 2
+        )
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=1000)
+    parser.add_argument('--iterations', type=int, default=100)
+    args = parser.parse_args()
+
+    setup_django()
+    print(json.dumps(
+        run(args.rows, args.iterations), indent=2, ensure_ascii=False
+    ))
+
+
+if __name__ == '__main__':
+    main()
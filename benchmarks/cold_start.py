@@ -0,0 +1,81 @@
+"""Холодный старт: от запуска процесса до первого ответа.
+
+Запуск:
+    python -m benchmarks.cold_start --runs 10 --path /
+
+Каждый замер - новый интерпретатор, который импортирует
+yanote.wsgi (с прогревом шаблонов, как в продакшене) и отдаёт
+приложению один GET-запрос. Время считается от момента перед
+запуском процесса до готового ответа; сравниваются запуски с
+админкой и без неё (NOTES_ADMIN=0).
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+from benchmarks.common import summarize
+
+VARIANTS = {
+    'admin': {'NOTES_ADMIN': '1'},
+    'no-admin': {'NOTES_ADMIN': '0'},
+}
+
+
+def first_request(started, path):
+    """Поднимает WSGI-приложение и выполняет первый запрос (в потомке)."""
+    from wsgiref.util import setup_testing_defaults
+
+    from yanote.wsgi import application
+
+    environ = {'PATH_INFO': path}
+    setup_testing_defaults(environ)
+    statuses = []
+    response = application(
+        environ, lambda status, headers: statuses.append(status)
+    )
+    b''.join(response)
+    response.close()
+    return {
+        'status': statuses[0],
+        'ms': round((time.time() - started) * 1000, 3),
+    }
+
+
+def spawn(path, env):
+    """Один холодный старт в новом процессе, время в миллисекундах."""
+    started = time.time()
+    result = subprocess.run(
+        [
+            sys.executable, '-m', 'benchmarks.cold_start',
+            '--child', str(started), '--path', path,
+        ],
+        capture_output=True, text=True, check=True,
+        env={**os.environ, **env}
+    )
+    child = json.loads(result.stdout)
+    if not child['status'].startswith('200'):
+        raise RuntimeError(f'{path} ответил {child["status"]}')
+    return child['ms']
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--path', default='/')
+    parser.add_argument('--child', type=float, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child is not None:
+        print(json.dumps(first_request(args.child, args.path)))
+        return
+    results = []
+    for name, env in VARIANTS.items():
+        samples = [spawn(args.path, env) for _ in range(args.runs)]
+        results.append({'variant': name, **summarize(samples)})
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
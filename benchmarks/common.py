@@ -0,0 +1,79 @@
+import os
+import time
+from contextlib import contextmanager
+from importlib import reload
+from statistics import quantiles
+
+import django
+
+
+def setup_django():
+    """Настраивает Django для запуска бенчмарка как скрипта."""
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yanote.settings')
+    django.setup()
+    from django.conf import settings
+
+    # Бенчмарки сами создают нагрузку, ограничитель её бы срезал.
+    settings.NOTES_RATE_LIMIT_ENABLED = False
+
+
+@contextmanager
+def benchmark_database():
+    """Создаёт тестовую базу на время бенчмарка и удаляет её после."""
+    from django.db import connection
+    from django.test.utils import (
+        setup_test_environment, teardown_test_environment
+    )
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(
+        verbosity=0, autoclobber=True
+    )
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+
+def use_async_views(enabled):
+    """Переключает URLConf между синхронными и асинхронными views."""
+    from django.conf import settings
+    from django.urls import clear_url_caches
+
+    import notes.urls
+    import yanote.urls
+
+    settings.NOTES_ASYNC_VIEWS = enabled
+    reload(notes.urls)
+    reload(yanote.urls)
+    clear_url_caches()
+
+
+class Timer:
+    """Замер времени выполнения блока в миллисекундах."""
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.ms = (time.perf_counter() - self.started) * 1000
+
+
+def summarize(samples_ms, elapsed_s=None):
+    """Сводка по замерам: число, среднее, перцентили, запросы в секунду."""
+    samples_ms = sorted(samples_ms)
+    cuts = quantiles(samples_ms, n=100) if len(samples_ms) > 1 else (
+        samples_ms * 99
+    )
+    summary = {
+        'count': len(samples_ms),
+        'mean_ms': round(sum(samples_ms) / len(samples_ms), 3),
+        'p50_ms': round(cuts[49], 3),
+        'p95_ms': round(cuts[94], 3),
+        'p99_ms': round(cuts[98], 3),
+    }
+    if elapsed_s:
+        summary['rps'] = round(len(samples_ms) / elapsed_s, 1)
+    return summary
@@ -0,0 +1,51 @@
+"""Сравнение двух прогонов benchmarks.crud.
+
+Запуск: python -m benchmarks.compare old.json new.json [--threshold 10]
+
+Печатает изменение p50 и числа запросов для каждой операции и объёма,
+помечая ухудшения больше порога в процентах. Код выхода 1, если
+ухудшения есть.
+"""
+import argparse
+import json
+import sys
+
+
+def load(path):
+    """Результаты прогона по ключу (rows, операция)."""
+    with open(path) as file:
+        report = json.load(file)
+    return {
+        (scale['rows'], name): result
+        for scale in report['scales']
+        for name, result in scale['operations'].items()
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('old')
+    parser.add_argument('new')
+    parser.add_argument('--threshold', type=float, default=10.0)
+    args = parser.parse_args()
+
+    old, new = load(args.old), load(args.new)
+    regressions = 0
+    for key in sorted(old.keys() & new.keys()):
+        before, after = old[key], new[key]
+        change = (after['p50_ms'] - before['p50_ms']) / before['p50_ms'] * 100
+        queries = (
+            after['queries_per_request'] - before['queries_per_request']
+        )
+        regressed = change > args.threshold or queries > 0
+        regressions += regressed
+        print(
+            f'{key[0]:>9} {key[1]:<18} p50 {before["p50_ms"]:>9.2f} -> '
+            f'{after["p50_ms"]:>9.2f} ms ({change:+.1f}%) '
+            f'queries {queries:+.2f}' + ('  REGRESSION' if regressed else '')
+        )
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,149 @@
+"""Задержка и число запросов CRUD-операций с заметками на разных объёмах.
+
+Запуск:
+    python -m benchmarks.crud --rows 1000,100000 --output bench.json
+    python -m benchmarks.compare old.json bench.json
+
+Для каждого объёма создаётся новая тестовая база, в неё загружаются
+rows заметок, поровну между --users пользователями, затем операции
+выполняются через django.test.Client от имени одного из них.
+"""
+import argparse
+import json
+import platform
+import random
+from datetime import datetime, timezone
+from itertools import count
+
+from benchmarks.common import (
+    Timer, benchmark_database, setup_django, summarize
+)
+
+
+def measure(client, operation, iterations):
+    """Выполняет operation iterations раз, собирая время и запросы."""
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    samples, queries = [], []
+    for number in range(iterations):
+        with CaptureQueriesContext(connection) as captured, Timer() as timer:
+            response = operation(client, number)
+            if response.streaming:
+                b''.join(response.streaming_content)
+        assert response.status_code < 400, (operation, response.status_code)
+        samples.append(timer.ms)
+        queries.append(len(captured.captured_queries))
+    result = summarize(samples)
+    result['queries_per_request'] = round(sum(queries) / len(queries), 2)
+    return result
+
+
+def operations(author):
+    """Набор измеряемых операций от имени author."""
+    from django.core.cache import cache
+    from django.urls import reverse
+
+    from benchmarks.data import make_text, make_title
+    from notes.models import Note
+
+    slugs = list(
+        Note.objects.filter(author=author).values_list('slug', flat=True)
+    )
+    created = count()
+    deleted = count()
+    rng = random.Random(1)
+
+    def list_cold(client, number):
+        cache.clear()
+        return client.get(reverse('notes:list'))
+
+    def list_cached(client, number):
+        return client.get(reverse('notes:list'))
+
+    def detail(client, number):
+        return client.get(
+            reverse('notes:detail', args=(slugs[number % len(slugs)],))
+        )
+
+    def create(client, number):
+        return client.post(reverse('notes:add'), {
+            'title': make_title(rng), 'text': make_text(rng), 'slug': '',
+        })
+
+    def create_with_slug(client, number):
+        return client.post(reverse('notes:add'), {
+            'title': make_title(rng),
+            'text': make_text(rng),
+            'slug': f'bench-created-{next(created)}',
+        })
+
+    def update(client, number):
+        slug = slugs[number % len(slugs)]
+        return client.post(reverse('notes:edit', args=(slug,)), {
+            'title': make_title(rng), 'text': make_text(rng), 'slug': slug,
+        })
+
+    def delete(client, number):
+        slug = f'bench-created-{next(deleted)}'
+        return client.post(reverse('notes:delete', args=(slug,)))
+
+    return {
+        'list_cold': list_cold,
+        'list_cached': list_cached,
+        'detail': detail,
+        'create': create,
+        'create_with_slug': create_with_slug,
+        'update': update,
+        'delete': delete,
+    }
+
+
+def run_scale(rows, users, iterations):
+    """Прогон всех операций на базе с rows заметками."""
+    from django.test import Client
+
+    from benchmarks.data import seed
+
+    with benchmark_database():
+        with Timer() as seeding:
+            authors = seed(users, max(rows // users, 1))
+        client = Client()
+        client.force_login(authors[0])
+        return {
+            'rows': rows,
+            'users': users,
+            'seed_s': round(seeding.ms / 1000, 2),
+            'operations': {
+                name: measure(client, operation, iterations)
+                for name, operation in operations(authors[0]).items()
+            },
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', default='1000,100000,1000000')
+    parser.add_argument('--users', type=int, default=100)
+    parser.add_argument('--iterations', type=int, default=50)
+    parser.add_argument('--output', help='Файл для результатов в JSON.')
+    args = parser.parse_args()
+
+    setup_django()
+    report = {
+        'started_at': datetime.now(timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'scales': [
+            run_scale(int(rows), args.users, args.iterations)
+            for rows in args.rows.split(',')
+        ],
+    }
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, 'w') as file:
+            file.write(output)
+    print(output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+"""Генератор реалистичных данных: N пользователей по M заметок."""
+import random
+
+WORDS = (
+    'список', 'покупок', 'идеи', 'для', 'проекта', 'встреча', 'с',
+    'командой', 'планы', 'на', 'неделю', 'рецепт', 'борща', 'книги',
+    'прочитать', 'заметки', 'лекции', 'по', 'истории', 'отпуск', 'море',
+    'подарки', 'друзьям', 'тренировка', 'бег', 'утром', 'кино', 'вечером',
+    'ремонт', 'кухни', 'дача', 'огород', 'рассада', 'отчёт', 'квартал',
+    'бюджет', 'семьи', 'день', 'рождения', 'мамы', 'врач', 'запись',
+    'английский', 'язык', 'слова', 'урок', 'черновик', 'письма', 'важно',
+    'срочно', 'позвонить', 'Москва', 'Казань', 'Новосибирск',
+)
+BATCH_SIZE = 5000
+
+
+def make_title(rng):
+    """Заголовок из 2-5 слов с заглавной буквы."""
+    return ' '.join(rng.choices(WORDS, k=rng.randint(2, 5))).capitalize()
+
+
+def make_text(rng):
+    """Текст из нескольких предложений разной длины."""
+    sentences = (
+        ' '.join(rng.choices(WORDS, k=rng.randint(5, 15))).capitalize() + '.'
+        for _ in range(rng.randint(1, 20))
+    )
+    return ' '.join(sentences)
+
+
+def seed(users, notes_per_user, seed=0, batch_size=BATCH_SIZE):
+    """Создаёт пользователей и их заметки пачками, возвращает пользователей."""
+    from django.contrib.auth import get_user_model
+    from django.db import transaction
+
+    from notes.models import Note, NoteStats
+    from notes.slugs import transliterate
+
+    rng = random.Random(seed)
+    User = get_user_model()
+    authors = User.objects.bulk_create(
+        User(username=f'bench-{index}') for index in range(users)
+    )
+    batch = []
+    number = 0
+    for author in authors:
+        for _ in range(notes_per_user):
+            title = make_title(rng)
+            note = Note(
+                title=title,
+                text=make_text(rng),
+                slug=f'{transliterate(title)[:80]}-{number}',
+                author=author,
+            )
+            note.fill_computed_fields()
+            batch.append(note)
+            number += 1
+            if len(batch) == batch_size:
+                with transaction.atomic():
+                    Note.objects.bulk_create(batch)
+                batch = []
+    with transaction.atomic():
+        Note.objects.bulk_create(batch)
+    for start in range(0, len(authors), batch_size):
+        NoteStats.objects.rebuild(
+            [author.pk for author in authors[start:start + batch_size]]
+        )
+    return authors
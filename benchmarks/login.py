@@ -0,0 +1,81 @@
+"""Пропускная способность входа для разных хешеров паролей.
+
+Запуск:
+    python -m benchmarks.login --logins 100 --threads 8
+
+Для каждого хешера создаётся пользователь с его хешем, затем
+threads потоков выполняют logins входов через authenticate().
+Проверка пароля идёт через пул NOTES_LOGIN_WORKERS потоков, как
+и в запросах; столбец rps - успешных входов в секунду.
+"""
+import argparse
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.common import (
+    Timer, benchmark_database, setup_django, summarize
+)
+
+PASSWORD = 'Tr1cky-passw0rd'
+HASHERS = {
+    'pbkdf2': 'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+    'scrypt-django': 'django.contrib.auth.hashers.ScryptPasswordHasher',
+    'scrypt': 'notes.hashers.ScryptPasswordHasher',
+}
+
+
+def use_hasher(path):
+    """Делает хешер path предпочтительным и сбрасывает кэш хешеров."""
+    from django.conf import settings
+    from django.contrib.auth import hashers
+
+    settings.PASSWORD_HASHERS = [path]
+    hashers.get_hashers.cache_clear()
+    hashers.get_hashers_by_algorithm.cache_clear()
+
+
+def run_hasher(name, logins, threads):
+    """Замеры входа одного пользователя из threads потоков."""
+    from django.contrib.auth import authenticate, get_user_model
+    from django.db import close_old_connections
+
+    use_hasher(HASHERS[name])
+    user = get_user_model().objects.create_user(
+        f'bench-{name}', password=PASSWORD
+    )
+
+    def log_in(_):
+        with Timer() as timer:
+            assert authenticate(username=user.username, password=PASSWORD)
+        close_old_connections()
+        return timer.ms
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(threads) as pool:
+        samples = list(pool.map(log_in, range(logins)))
+    return {
+        'hasher': name,
+        'threads': threads,
+        **summarize(samples, time.perf_counter() - started),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--logins', type=int, default=100)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--hashers', default=','.join(HASHERS))
+    args = parser.parse_args()
+
+    setup_django()
+    with benchmark_database():
+        results = [
+            run_hasher(name, args.logins, args.threads)
+            for name in args.hashers.split(',')
+        ]
+    print(json.dumps(results, indent=2, ensure_ascii=False))
+
+
+if __name__ == '__main__':
+    main()
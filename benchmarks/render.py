@@ -0,0 +1,110 @@
+"""Время рендеринга list.html и detail.html при разных настройках шаблонов.
+
+Запуск:
+    python -m benchmarks.render --iterations 2000
+
+Сравниваются: загрузчики без кэша и все context processors (как до
+явной настройки при DEBUG), кэширующий загрузчик с теми же processors
+и движок 'lean' только с auth. База не нужна: шаблоны рендерятся
+с заметками в памяти.
+"""
+import argparse
+import json
+from copy import deepcopy
+
+from benchmarks.common import Timer, setup_django, summarize
+
+NOTES_ON_PAGE = 50
+
+
+def make_engines():
+    """Движки для сравнения, собранные из TEMPLATES проекта."""
+    from django.conf import settings
+    from django.template.backends.django import DjangoTemplates
+
+    def engine(params, **overrides):
+        params = {**deepcopy(params), 'APP_DIRS': False, **overrides}
+        params.pop('BACKEND')
+        return DjangoTemplates(params)
+
+    default, lean = settings.TEMPLATES
+    uncached_options = {
+        **default['OPTIONS'], 'loaders': default['OPTIONS']['loaders'][0][1]
+    }
+    return {
+        'uncached_all_processors': engine(
+            default, NAME='uncached', OPTIONS=uncached_options
+        ),
+        'cached_all_processors': engine(default, NAME='cached'),
+        'cached_lean': engine(lean),
+    }
+
+
+def make_request():
+    """Запрос авторизованного пользователя с сессией и сообщениями."""
+    from django.contrib.auth import get_user_model
+    from django.contrib.messages.storage.fallback import FallbackStorage
+    from django.contrib.sessions.backends.signed_cookies import SessionStore
+    from django.test import RequestFactory
+
+    request = RequestFactory().get('/notes/')
+    request.user = get_user_model()(id=1, username='bench')
+    request.session = SessionStore()
+    request._messages = FallbackStorage(request)
+    return request
+
+
+def make_pages():
+    """Шаблоны и контексты страниц списка и заметки."""
+    from notes.models import Note
+    from notes.pagination import CursorPage
+
+    notes = [
+        Note(id=number, title=f'Заметка {number}', slug=f'note-{number}',
+             text='Текст заметки. ' * 100)
+        for number in range(1, NOTES_ON_PAGE + 1)
+    ]
+    page = CursorPage(notes, next_cursor='MTo1MA')
+    return {
+        'list': ('notes/list.html', {
+            'object_list': notes,
+            'page_obj': page,
+            'is_paginated': True,
+            'list_cache_key': 'bench',
+            'list_cache_timeout': 0,
+        }),
+        'detail': ('notes/detail.html', {
+            'object': notes[0], 'note': notes[0]
+        }),
+    }
+
+
+def run(iterations):
+    """Рендерит каждую страницу iterations раз каждым движком."""
+    request = make_request()
+    pages = make_pages()
+    results = {}
+    for engine_name, engine in make_engines().items():
+        for page_name, (template_name, context) in pages.items():
+            samples = []
+            for _ in range(iterations):
+                with Timer() as timer:
+                    engine.get_template(template_name).render(
+                        context, request
+                    )
+                samples.append(timer.ms)
+            results[f'{page_name}/{engine_name}'] = summarize(samples)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--iterations', type=int, default=1000)
+    args = parser.parse_args()
+
+    setup_django()
+    print(json.dumps(run(args.iterations), indent=2, ensure_ascii=False))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+"""Объём истории заметок и время восстановления ревизий.
+
+Запуск:
+    python -m benchmarks.revisions --sizes 1000,100000 --edits 100
+
+Для каждого размера заметки (в строках) выполняется edits правок по
+несколько строк и сравнивается объём ревизий с объёмом полных копий
+при разных K - частоте снимков. Затем замеряется восстановление
+случайных ревизий.
+"""
+import argparse
+import json
+import random
+
+from benchmarks.common import (
+    Timer, benchmark_database, setup_django, summarize
+)
+
+SNAPSHOT_EVERY = (1, 10, 50)
+LINES_PER_EDIT = 3
+
+
+def edit(rng, lines):
+    """Меняет, вставляет или удаляет несколько строк текста."""
+    from benchmarks.data import make_title
+
+    lines = list(lines)
+    for _ in range(LINES_PER_EDIT):
+        position = rng.randrange(len(lines))
+        action = rng.choice(('replace', 'insert', 'delete'))
+        if action == 'replace':
+            lines[position] = make_title(rng) + '\n'
+        elif action == 'insert':
+            lines.insert(position, make_title(rng) + '\n')
+        elif len(lines) > 1:
+            del lines[position]
+    return lines
+
+
+def run_size(author, lines_count, edits, snapshot_every, samples):
+    """Правки одной заметки и замеры её истории."""
+    from django.conf import settings
+    from django.db.models import Sum
+    from django.db.models.functions import Length
+
+    from benchmarks.data import make_title
+    from notes.models import Note, NoteRevision
+
+    settings.NOTES_REVISION_SNAPSHOT_EVERY = snapshot_every
+    # Ревизия на каждую правку: в фоне правки одной заметки склеиваются.
+    settings.NOTES_TASK_BACKEND = 'inline'
+    rng = random.Random(lines_count)
+    lines = [make_title(rng) + '\n' for _ in range(lines_count)]
+    note = Note.objects.create(
+        title='Бенчмарк', text=''.join(lines), author=author
+    )
+    full_copies = len(note.text.encode())
+    save_ms = []
+    for _ in range(edits):
+        lines = edit(rng, lines)
+        note.text = ''.join(lines)
+        full_copies += len(note.text.encode())
+        with Timer() as timer:
+            note.save()
+        save_ms.append(timer.ms)
+    stored = NoteRevision.objects.filter(note=note).aggregate(
+        size=Sum(Length('data'))
+    )['size']
+    restore_ms = []
+    for _ in range(samples):
+        number = rng.randint(1, edits + 1)
+        with Timer() as timer:
+            NoteRevision.objects.restore(note.pk, number)
+        restore_ms.append(timer.ms)
+    return {
+        'lines': lines_count,
+        'snapshot_every': snapshot_every,
+        'revisions': edits + 1,
+        'full_copies_bytes': full_copies,
+        'stored_bytes': stored,
+        'ratio': round(stored / full_copies, 4),
+        'save': summarize(save_ms),
+        'restore': summarize(restore_ms),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', default='100,1000,10000')
+    parser.add_argument('--edits', type=int, default=100)
+    parser.add_argument('--samples', type=int, default=100)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.contrib.auth import get_user_model
+
+    with benchmark_database():
+        author = get_user_model().objects.create(username='bench')
+        results = [
+            run_size(author, int(size), args.edits, every, args.samples)
+            for size in args.sizes.split(',')
+            for every in SNAPSHOT_EVERY
+        ]
+    print(json.dumps(results, indent=2, ensure_ascii=False))
+
+
+if __name__ == '__main__':
+    main()
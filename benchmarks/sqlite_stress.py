@@ -0,0 +1,124 @@
+"""Стресс-тест SQLite: одновременные писатели и читатели.
+
+Запуск: python -m benchmarks.sqlite_stress --writers 8 --readers 8
+
+Сравнивает стандартные настройки Django (журнал отката, отложенные
+транзакции) с yanote.sqlite.PRAGMAS и BEGIN IMMEDIATE. Писатель, как
+NoteForm.clean_slug, сначала проверяет slug, потом вставляет заметку.
+"""
+import argparse
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+from yanote.sqlite import PRAGMAS
+
+SCHEMA = (
+    'CREATE TABLE note (id INTEGER PRIMARY KEY, slug TEXT UNIQUE, text TEXT)'
+)
+
+
+def connect(path, tuned):
+    """Соединение, настроенное как у Django с NOTES_SQLITE_TUNING или без."""
+    connection = sqlite3.connect(path, timeout=5, isolation_level=None)
+    if tuned:
+        for name, value in PRAGMAS.items():
+            connection.execute(f'PRAGMA {name}={value}')
+    return connection
+
+
+class Stress:
+    """Общие для потоков параметры прогона и счётчики."""
+
+    def __init__(self, path, tuned, writes, text_size):
+        self.path = path
+        self.tuned = tuned
+        self.writes = writes
+        self.text = 'т' * text_size
+        self.stats = {'writes': 0, 'reads': 0, 'locked': 0}
+        self.lock = threading.Lock()
+        self.done = threading.Event()
+
+    def count(self, key):
+        with self.lock:
+            self.stats[key] += 1
+
+    def writer(self, index):
+        connection = connect(self.path, self.tuned)
+        for number in range(self.writes):
+            try:
+                connection.execute(
+                    'BEGIN IMMEDIATE' if self.tuned else 'BEGIN'
+                )
+                connection.execute(
+                    'SELECT 1 FROM note WHERE slug = ?', (f'{index}-{number}',)
+                ).fetchone()
+                connection.execute(
+                    'INSERT INTO note (slug, text) VALUES (?, ?)',
+                    (f'{index}-{number}', self.text)
+                )
+                connection.execute('COMMIT')
+                self.count('writes')
+            except sqlite3.OperationalError:
+                connection.rollback()
+                self.count('locked')
+
+    def reader(self):
+        connection = connect(self.path, self.tuned)
+        while not self.done.is_set():
+            try:
+                connection.execute('SELECT count(*) FROM note').fetchone()
+                self.count('reads')
+            except sqlite3.OperationalError:
+                self.count('locked')
+
+
+def run(tuned, writers, readers, writes, text_size):
+    """Прогон одной конфигурации, возвращает счётчики операций и ошибок."""
+    fd, path = tempfile.mkstemp(suffix='.sqlite3')
+    os.close(fd)
+    connect(path, tuned).execute(SCHEMA)
+    stress = Stress(path, tuned, writes, text_size)
+    reader_threads = [
+        threading.Thread(target=stress.reader) for _ in range(readers)
+    ]
+    writer_threads = [
+        threading.Thread(target=stress.writer, args=(index,))
+        for index in range(writers)
+    ]
+    started = time.perf_counter()
+    for thread in reader_threads + writer_threads:
+        thread.start()
+    for thread in writer_threads:
+        thread.join()
+    stress.done.set()
+    for thread in reader_threads:
+        thread.join()
+    stress.stats['elapsed_s'] = round(time.perf_counter() - started, 2)
+    for suffix in ('', '-wal', '-shm'):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+    return stress.stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--writers', type=int, default=8)
+    parser.add_argument('--readers', type=int, default=8)
+    parser.add_argument('--writes', type=int, default=200)
+    parser.add_argument('--text-size', type=int, default=2000)
+    args = parser.parse_args()
+    report = {
+        name: run(
+            tuned, args.writers, args.readers, args.writes, args.text_size
+        )
+        for name, tuned in (('stock', False), ('tuned', True))
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,156 @@
+import json
+from http import HTTPStatus
+
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+from django.http import Http404, HttpResponse
+from django.utils.decorators import method_decorator
+from django.views import generic
+
+from .forms import WARNING, NoteForm
+from .listing import filter_notes, read_list_params
+from .pagination import CursorPaginator
+from .ratelimit import rate_limit
+from .serializers import (
+    DETAIL_FIELDS, LIST_FIELDS, api_response, read_fields, select_fields,
+    serialize_note
+)
+from .views import NoteBase
+
+API_PAGE_SIZE = 50
+API_MAX_PAGE_SIZE = 200
+FORM_FIELDS = ('title', 'text', 'slug', 'tags')
+
+
+def read_payload(body):
+    """Разбирает JSON-объект заметки из тела запроса."""
+    try:
+        payload = json.loads(body or b'{}')
+    except ValueError as error:
+        raise ValidationError(f'Некорректный JSON: {error}')
+    if not isinstance(payload, dict):
+        raise ValidationError('Ожидается объект JSON.')
+    unknown = sorted(set(payload) - set(FORM_FIELDS))
+    if unknown:
+        raise ValidationError(f'Неизвестные поля: {", ".join(unknown)}.')
+    if isinstance(payload.get('tags'), list):
+        payload['tags'] = ', '.join(map(str, payload['tags']))
+    return payload
+
+
+def read_page_size(params):
+    try:
+        size = int(params.get('limit', API_PAGE_SIZE))
+    except ValueError:
+        raise ValidationError('limit - целое число.')
+    if not 1 <= size <= API_MAX_PAGE_SIZE:
+        raise ValidationError(f'limit - от 1 до {API_MAX_PAGE_SIZE}.')
+    return size
+
+
+class NoteApiBase(NoteBase):
+    """Общее для JSON API: те же права, что и у HTML-страниц.
+
+    Аутентификация - сессией, поэтому изменяющие запросы, как и
+    формы, требуют CSRF-токен в заголовке X-CSRFToken.
+    """
+
+    def handle_no_permission(self):
+        return self.error(HTTPStatus.UNAUTHORIZED, 'Нужно войти.')
+
+    def error(self, status, *messages):
+        return api_response(
+            self.request, {'errors': list(messages)}, status=status
+        )
+
+    def dispatch(self, request, *args, **kwargs):
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        except ValidationError as error:
+            return self.error(HTTPStatus.BAD_REQUEST, *error.messages)
+        except Http404 as error:
+            return self.error(HTTPStatus.NOT_FOUND, str(error))
+
+    def save(self, form, status):
+        """Сохраняет заметку из формы, отвечает заметкой или ошибками."""
+        fields = read_fields(self.request.GET, DETAIL_FIELDS)
+        if form.is_valid():
+            try:
+                with transaction.atomic():
+                    note = form.save()
+            except IntegrityError:
+                form.add_error('slug', form.cleaned_data['slug'] + WARNING)
+        if form.errors:
+            return api_response(
+                self.request, {'errors': form.errors},
+                status=HTTPStatus.BAD_REQUEST
+            )
+        return api_response(
+            self.request, serialize_note(note, fields), status=status
+        )
+
+
+@method_decorator(rate_limit('notes-write'), name='dispatch')
+class NoteApiList(NoteApiBase, generic.View):
+    """Список заметок с курсорной пагинацией и создание заметки."""
+    query_budget = {'GET': 3, 'POST': 16}
+
+    def get(self, request, *args, **kwargs):
+        fields = read_fields(request.GET, LIST_FIELDS)
+        params = read_list_params(request.GET)
+        paginator = CursorPaginator(
+            read_page_size(request.GET), request.user.pk, params['sort']
+        )
+        queryset = select_fields(
+            filter_notes(self.get_queryset(), request.user.pk, **params),
+            fields, paginator.sort_field
+        )
+        cursor = request.GET.get('after')
+        page = paginator.page(paginator.window(queryset, cursor), cursor)
+        return api_response(request, {
+            'results': [serialize_note(note, fields) for note in page],
+            'next': page.next_cursor,
+        })
+
+    def post(self, request, *args, **kwargs):
+        form = NoteForm(data=read_payload(request.body))
+        form.instance.author = request.user
+        return self.save(form, HTTPStatus.CREATED)
+
+
+@method_decorator(rate_limit('notes-write'), name='dispatch')
+class NoteApiDetail(NoteApiBase, generic.View):
+    """Заметка: чтение, полное и частичное изменение, удаление."""
+    query_budget = {'GET': 3, 'PUT': 14, 'PATCH': 14, 'DELETE': 7}
+
+    def get_note(self, queryset):
+        note = queryset.filter(slug=self.kwargs['slug']).first()
+        if note is None:
+            raise Http404('Заметка не найдена.')
+        return note
+
+    def get(self, request, *args, **kwargs):
+        fields = read_fields(request.GET, DETAIL_FIELDS)
+        note = self.get_note(select_fields(self.get_queryset(), fields))
+        return api_response(request, serialize_note(note, fields))
+
+    def put(self, request, *args, **kwargs):
+        note = self.get_note(self.get_queryset().with_text())
+        form = NoteForm(data=read_payload(request.body), instance=note)
+        return self.save(form, HTTPStatus.OK)
+
+    def patch(self, request, *args, **kwargs):
+        """Меняет только переданные поля, остальные берёт из заметки."""
+        note = self.get_note(self.get_queryset().with_text())
+        payload = read_payload(request.body)
+        form = NoteForm(data={
+            'title': note.title, 'text': note.text, 'slug': note.slug,
+            **payload
+        }, instance=note)
+        if 'tags' not in payload:
+            form.data['tags'] = ', '.join(form.current_tags)
+        return self.save(form, HTTPStatus.OK)
+
+    def delete(self, request, *args, **kwargs):
+        self.get_note(self.get_queryset()).delete()
+        return HttpResponse(status=HTTPStatus.NO_CONTENT)
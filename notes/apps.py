@@ -1,6 +1,30 @@
 from django.apps import AppConfig
+from django.conf import settings
+from django.contrib.auth.signals import user_logged_out
+from django.db.backends.signals import connection_created
+from django.db.models.signals import (
+    post_delete, post_migrate, post_save, pre_delete
+)
 
 
 class NotesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'notes'
+
+    def ready(self):
+        from . import tasks  # noqa: F401 - регистрирует задачи очереди
+        from .auth import forget_logged_out_user, forget_user
+        from .middleware import install_query_counter
+        from .models import Note, create_note_stats
+        from .search import ensure_search_index, unindex_deleted_note
+        from .tags import ensure_tag_triggers
+        post_migrate.connect(ensure_search_index, sender=self)
+        post_migrate.connect(ensure_tag_triggers, sender=self)
+        pre_delete.connect(unindex_deleted_note, sender=Note)
+        post_save.connect(forget_user, sender=settings.AUTH_USER_MODEL)
+        post_delete.connect(forget_user, sender=settings.AUTH_USER_MODEL)
+        post_save.connect(
+            create_note_stats, sender=settings.AUTH_USER_MODEL
+        )
+        user_logged_out.connect(forget_logged_out_user)
+        connection_created.connect(install_query_counter)
@@ -0,0 +1,114 @@
+from django.conf import settings
+from django.contrib.auth.views import redirect_to_login
+from django.http import Http404
+from django.shortcuts import render
+from django.views import generic
+from django.views.decorators.http import condition
+
+from .cache import aget_or_set, alist_cache_key
+from .conditional import (
+    aload_note_state, aload_notes_list_state, note_etag, note_last_modified,
+    notes_list_etag
+)
+from .models import Note, Tag
+from .pagination import CursorPaginator
+from .listing import filter_notes_list, list_query, read_list_params
+from .views import NoteDetail, NotesList
+
+
+class AsyncNoteBase(generic.View):
+    """Базовый класс асинхронных CBV.
+
+    Пользователь загружается через request.auser(), поэтому проверка
+    авторизации не уходит в поток sync_to_async.
+    """
+    model = Note
+
+    async def dispatch(self, request, *args, **kwargs):
+        user = await request.auser()
+        if not user.is_authenticated:
+            return redirect_to_login(request.get_full_path())
+        request.user = user
+        return await super().dispatch(request, *args, **kwargs)
+
+    def get_queryset(self):
+        """Пользователь может работать только со своими заметками."""
+        return self.model.objects.filter(author=self.request.user)
+
+
+class AsyncNotesList(AsyncNoteBase):
+    """Список заметок пользователя для ASGI."""
+    template_name = NotesList.template_name
+    template_engine = NotesList.template_engine
+    paginate_by = NotesList.paginate_by
+    cursor_kwarg = 'after'
+
+    async def get(self, request, *args, **kwargs):
+        """Страница списка или 304 по ETag, как у NotesList."""
+        await aload_notes_list_state(request)
+        render_page = condition(etag_func=notes_list_etag)(self.render_page)
+        return await render_page(request, *args, **kwargs)
+
+    async def render_page(self, request, *args, **kwargs):
+        cursor = request.GET.get(self.cursor_kwarg)
+        params = read_list_params(request.GET)
+        query = list_query(**params)
+        paginator = CursorPaginator(
+            self.paginate_by, request.user.pk, params['sort']
+        )
+        queryset = filter_notes_list(
+            self.get_queryset(), request.user.pk, **params
+        )
+        user_tags = Tag.objects.filter(
+            author=request.user, note_count__gt=0
+        ).only('name', 'note_count')
+
+        async def fetch_page():
+            window = paginator.window(queryset, cursor)
+            page = paginator.page([note async for note in window], cursor)
+            return (
+                paginator, page, page.object_list, page.has_other_pages(),
+                [tag async for tag in user_tags]
+            )
+
+        key = await alist_cache_key(request.user.pk, cursor, query)
+        result, hit = await aget_or_set(key, fetch_page)
+        paginator, page, object_list, is_paginated, user_tags = result
+        response = render(request, self.template_name, {
+            'paginator': paginator,
+            'page_obj': page,
+            'is_paginated': is_paginated,
+            'object_list': object_list,
+            'note_list': object_list,
+            'list_cache_key': key,
+            'list_cache_timeout': settings.NOTES_LIST_CACHE_TIMEOUT,
+            'list_query': query,
+            'user_tags': user_tags,
+            **params,
+        }, using=self.template_engine)
+        response['X-Notes-List-Cache'] = 'hit' if hit else 'miss'
+        return response
+
+
+class AsyncNoteDetail(AsyncNoteBase):
+    """Заметка подробно для ASGI."""
+    template_name = NoteDetail.template_name
+    template_engine = NoteDetail.template_engine
+
+    async def get(self, request, slug, *args, **kwargs):
+        """Заметка или 304 по ETag и Last-Modified, как у NoteDetail."""
+        await aload_note_state(request, slug)
+        render_note = condition(
+            etag_func=note_etag, last_modified_func=note_last_modified
+        )(self.render_note)
+        return await render_note(request, slug, *args, **kwargs)
+
+    async def render_note(self, request, slug, *args, **kwargs):
+        try:
+            note = await self.get_queryset().with_text().aget(slug=slug)
+        except Note.DoesNotExist:
+            raise Http404('Заметка не найдена.')
+        return render(
+            request, self.template_name, {'object': note, 'note': note},
+            using=self.template_engine
+        )
@@ -0,0 +1,170 @@
+import copy
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from threading import BoundedSemaphore, Lock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.hashers import make_password, verify_password
+from django.core.exceptions import PermissionDenied
+from django.http import HttpResponse
+
+
+class UserCache:
+    """Кэш пользователей в памяти процесса с временем жизни записей.
+
+    Сбрасывается сигналами при сохранении пользователя и выходе, но
+    только в своём процессе: в остальных запись живёт не дольше
+    NOTES_USER_CACHE_TTL секунд.
+    """
+
+    def __init__(self):
+        self._users = {}
+        self._lock = Lock()
+
+    def get(self, user_id):
+        with self._lock:
+            entry = self._users.get(user_id)
+        if entry is None:
+            return None
+        expires, user = entry
+        if expires < time.monotonic():
+            self.discard(user_id)
+            return None
+        return copy.copy(user)
+
+    def set(self, user_id, user):
+        if not settings.NOTES_USER_CACHE_TTL:
+            return
+        expires = time.monotonic() + settings.NOTES_USER_CACHE_TTL
+        with self._lock:
+            self._users.pop(user_id, None)
+            while len(self._users) >= settings.NOTES_USER_CACHE_SIZE:
+                del self._users[next(iter(self._users))]
+            self._users[user_id] = (expires, copy.copy(user))
+
+    def discard(self, user_id):
+        with self._lock:
+            self._users.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._users.clear()
+
+
+user_cache = UserCache()
+
+
+class LoginBusy(Exception):
+    """Все потоки проверки паролей заняты, и очередь к ним полна."""
+
+
+class PasswordPool:
+    """Ограниченный пул потоков для хеширования паролей.
+
+    Одновременно хешируют не больше NOTES_LOGIN_WORKERS потоков, ещё
+    NOTES_LOGIN_QUEUE проверок ждут в очереди; остальным сразу
+    отказывается, а не копится очередь из занятых обработчиков.
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        self._executor = None
+        self._slots = None
+
+    def start(self):
+        with self._lock:
+            if self._executor is None:
+                workers = settings.NOTES_LOGIN_WORKERS
+                self._slots = BoundedSemaphore(
+                    workers + settings.NOTES_LOGIN_QUEUE
+                )
+                self._executor = ThreadPoolExecutor(
+                    workers, thread_name_prefix='notes-login'
+                )
+
+    def run(self, func, *args):
+        """Выполняет func(*args) в пуле и ждёт результат."""
+        self.start()
+        if not self._slots.acquire(timeout=settings.NOTES_LOGIN_WAIT):
+            raise LoginBusy
+        try:
+            future = self._executor.submit(func, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda future: self._slots.release())
+        return future.result()
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown()
+            self._executor = self._slots = None
+
+
+password_pool = PasswordPool()
+
+
+def login_busy_response():
+    """Ответ 503 на вход, когда password_pool переполнен."""
+    response = HttpResponse(
+        'Слишком много входов одновременно, попробуйте ещё раз.',
+        status=HTTPStatus.SERVICE_UNAVAILABLE,
+        content_type='text/plain; charset=utf-8'
+    )
+    response['Retry-After'] = '1'
+    return response
+
+
+class CachedModelBackend(ModelBackend):
+    """ModelBackend, который не читает пользователя на каждом запросе.
+
+    Пароль проверяется в password_pool: поток запроса только читает и
+    сохраняет пользователя. Хеш в устаревшем формате или с прежними
+    параметрами заменяется при успешном входе.
+    """
+
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        User = get_user_model()
+        if username is None:
+            username = kwargs.get(User.USERNAME_FIELD)
+        if username is None or password is None:
+            return None
+        try:
+            user = User._default_manager.get_by_natural_key(username)
+        except User.DoesNotExist:
+            # Время ответа не должно выдавать, есть ли такой пользователь.
+            password_pool.run(make_password, password)
+            raise PermissionDenied
+        is_correct, must_update = password_pool.run(
+            verify_password, password, user.password
+        )
+        if not is_correct or not self.user_can_authenticate(user):
+            # Следующий бэкенд проверил бы тот же пароль ещё раз.
+            raise PermissionDenied
+        if must_update:
+            user.password = password_pool.run(make_password, password)
+            user.save(update_fields=['password'])
+        return user
+
+    def get_user(self, user_id):
+        user = user_cache.get(user_id)
+        if user is None:
+            user = super().get_user(user_id)
+            if user is not None:
+                user_cache.set(user_id, user)
+        return user
+
+
+def forget_user(sender, instance, **kwargs):
+    """Сбрасывает кэш после изменения пользователя, в том числе пароля."""
+    user_cache.discard(instance.pk)
+
+
+def forget_logged_out_user(sender, request, user, **kwargs):
+    """Сбрасывает кэш при выходе пользователя."""
+    if user is not None:
+        user_cache.discard(user.pk)
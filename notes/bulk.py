@@ -0,0 +1,335 @@
+import json
+from itertools import islice
+
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from .cache import invalidate_notes_list
+from .forms import WARNING
+from .models import (
+    Note, NoteBody, NoteStats, compress_text, decompress_text,
+    revision_order,
+)
+from .search import compressed_entries, index_entries
+from .slugs import SLUG_ATTEMPTS, allocate_slugs, transliterate
+from .taskqueue import enqueue
+
+IMPORT_CHUNK_SIZE = 500
+EXPORT_CHUNK_SIZE = 2000
+NOTE_FIELDS = ('title', 'text', 'slug')
+BATCH_LIMIT = 1000
+BATCH_KEYS = {'slugs': ('slug', str), 'ids': ('id', int)}
+BATCH_FIELDS = ('title', 'text')
+COMPUTED_FIELDS = ('content_hash', 'excerpt', 'text_size', 'compressed')
+CHUNK_FAILED = 'Не удалось сохранить порцию с этой строкой, повторите импорт.'
+
+
+def read_records(lines):
+    """Разбирает JSON Lines, пропуская пустые строки."""
+    for number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield number, json.loads(line)
+        except ValueError as error:
+            yield number, error
+
+
+def build_note(author, record):
+    """Проверяет запись без запросов к базе и создаёт объект заметки."""
+    if isinstance(record, ValueError):
+        raise ValidationError(f'Некорректный JSON: {record}')
+    if not isinstance(record, dict):
+        raise ValidationError('Ожидается объект JSON.')
+    note = Note(
+        author=author,
+        **{field: record[field] for field in NOTE_FIELDS if field in record}
+    )
+    note.full_clean(
+        exclude=('author',), validate_unique=False, validate_constraints=False
+    )
+    note.fill_computed_fields()
+    return note
+
+
+def split_compressed(notes):
+    """Забирает у заметок текст, который будет храниться в NoteBody."""
+    texts = []
+    for note in notes:
+        if note.compressed:
+            texts.append((note, note.text))
+            note.text = ''
+    return texts
+
+
+def reject_taken_slugs(slugs):
+    """Номера заданных в пачке slug, которые уже заняты.
+
+    Занятым считается и slug, который уже встретился в пачке.
+    """
+    explicit = {slug for slug in slugs if slug}
+    taken = set(
+        Note.objects.filter(slug__in=explicit).values_list('slug', flat=True)
+    ) if explicit else set()
+    rejected = set()
+    for index, slug in enumerate(slugs):
+        if slug in taken:
+            rejected.add(index)
+        elif slug:
+            taken.add(slug)
+    return rejected
+
+
+def create_notes(notes):
+    """Сохраняет пачку заметок одним INSERT.
+
+    Заметкам без slug подбирается свободный, заметки с занятым slug
+    не сохраняются. Возвращает созданные заметки и номера отвергнутых.
+    """
+    max_slug_length = Note._meta.get_field('slug').max_length
+    explicit = [note.slug for note in notes]
+    texts = split_compressed(notes)
+    try:
+        for attempt in range(SLUG_ATTEMPTS):
+            for note, slug in zip(notes, explicit):
+                note.pk, note.slug = None, slug
+            try:
+                with transaction.atomic():
+                    rejected = reject_taken_slugs(explicit)
+                    kept = [
+                        note for index, note in enumerate(notes)
+                        if index not in rejected
+                    ]
+                    # Заданные slug занимаются раньше подобранных.
+                    ordered = sorted(kept, key=lambda note: not note.slug)
+                    slugs = allocate_slugs(Note.objects.all(), [
+                        note.slug
+                        or transliterate(note.title)[:max_slug_length]
+                        for note in ordered
+                    ], max_slug_length)
+                    for note, slug in zip(ordered, slugs):
+                        note.slug = slug
+                    created = Note.objects.bulk_create(kept)
+                    stored = [
+                        (note, text) for note, text in texts
+                        if note.pk is not None
+                    ]
+                    NoteBody.objects.bulk_create(
+                        NoteBody(note=note, data=compress_text(text))
+                        for note, text in stored
+                    )
+                    index_entries([
+                        (note.pk, note.title, text) for note, text in stored
+                    ])
+                    NoteStats.objects.add_notes(created)
+                    return created, rejected
+            except IntegrityError:
+                if attempt == SLUG_ATTEMPTS - 1:
+                    raise
+    finally:
+        for note, text in texts:
+            note.text = text
+
+
+def import_chunk(numbered, errors):
+    """Сохраняет порцию импорта [(строка, заметка)].
+
+    Ошибки строк дописываются в errors; возвращается число созданных.
+    """
+    try:
+        created, rejected = create_notes([note for _, note in numbered])
+    except IntegrityError:
+        errors.extend(
+            {'line': number, 'errors': [CHUNK_FAILED]}
+            for number, _ in numbered
+        )
+        return 0
+    errors.extend(
+        {'line': numbered[index][0], 'errors': [
+            numbered[index][1].slug + WARNING
+        ]}
+        for index in rejected
+    )
+    return len(created)
+
+
+def import_notes(author, lines, chunk_size=IMPORT_CHUNK_SIZE):
+    """Импортирует заметки из JSON Lines порциями по chunk_size.
+
+    Каждая порция сохраняется в своей транзакции: строки порции,
+    которую сохранить не удалось, попадают в errors, как и строки
+    с занятым slug.
+    """
+    records = read_records(lines)
+    created, errors = 0, []
+    try:
+        while chunk := list(islice(records, chunk_size)):
+            numbered = []
+            for number, record in chunk:
+                try:
+                    numbered.append((number, build_note(author, record)))
+                except ValidationError as error:
+                    errors.append({'line': number, 'errors': error.messages})
+            if numbered:
+                created += import_chunk(numbered, errors)
+    finally:
+        invalidate_notes_list(author.pk)
+    errors.sort(key=lambda error: error['line'])
+    return {'created': created, 'errors': errors}
+
+
+def export_notes(queryset, chunk_size=EXPORT_CHUNK_SIZE):
+    """Отдаёт заметки строками JSON Lines, не держа их все в памяти."""
+    rows = queryset.order_by('id').values(
+        *NOTE_FIELDS, 'compressed', 'body__data'
+    )
+    for row in rows.iterator(chunk_size=chunk_size):
+        data = row.pop('body__data')
+        if row.pop('compressed'):
+            row['text'] = decompress_text(data)
+        yield json.dumps(row, ensure_ascii=False) + '\n'
+
+
+def read_batch(body, with_changes=False):
+    """Разбирает тело пакетного запроса.
+
+    Ожидается {"slugs": [...]} или {"ids": [...]}, для изменения ещё
+    {"changes": {"title": ..., "text": ...}}. Возвращает поле, по
+    которому искать заметки, значения без повторов и изменения.
+    """
+    try:
+        payload = json.loads(body)
+    except ValueError as error:
+        raise ValidationError(f'Некорректный JSON: {error}')
+    if not isinstance(payload, dict):
+        raise ValidationError('Ожидается объект JSON.')
+    names = [name for name in BATCH_KEYS if name in payload]
+    if len(names) != 1:
+        raise ValidationError('Укажите либо slugs, либо ids.')
+    key, value_type = BATCH_KEYS[names[0]]
+    values = payload[names[0]]
+    if not isinstance(values, list) or not all(
+        type(value) is value_type for value in values
+    ):
+        raise ValidationError(f'{names[0]} - список значений {key}.')
+    if len(values) > BATCH_LIMIT:
+        raise ValidationError(f'Не больше {BATCH_LIMIT} заметок за раз.')
+    changes = payload.get('changes')
+    if with_changes and (
+        not isinstance(changes, dict) or not changes
+        or set(changes) - set(BATCH_FIELDS)
+    ):
+        raise ValidationError(
+            f'changes - изменения полей {", ".join(BATCH_FIELDS)}.'
+        )
+    return key, list(dict.fromkeys(values)), changes
+
+
+def find_notes(queryset, key, values):
+    """Одним запросом находит среди queryset заметки пачки."""
+    rows = queryset.filter(**{f'{key}__in': values}).values(
+        'id', 'slug', 'title', 'text_size', 'compressed'
+    )
+    return {row[key]: row for row in rows}
+
+
+def batch_results(key, values, found, status):
+    """Результат по каждой заметке пачки в порядке запроса."""
+    return [
+        {key: value, 'status': status if value in found else 'not_found'}
+        for value in values
+    ]
+
+
+def delete_batch(queryset, author, key, values):
+    """Удаляет заметки пачки одним delete() в одной транзакции."""
+    with transaction.atomic():
+        found = find_notes(queryset, key, values)
+        if found:
+            queryset.filter(
+                pk__in=[row['id'] for row in found.values()]
+            ).only('id', 'compressed').delete()
+            NoteStats.objects.add(
+                author.pk,
+                notes=-len(found),
+                text_bytes=-sum(row['text_size'] for row in found.values()),
+            )
+    invalidate_notes_list(author.pk)
+    return batch_results(key, values, found, 'deleted')
+
+
+def build_changes(author, changes):
+    """Проверяет изменения как поля заметки и дополняет вычисляемыми."""
+    note = Note(author=author, **changes)
+    note.clean_fields(exclude=[
+        field.name for field in Note._meta.fields
+        if field.name not in changes
+    ])
+    values = dict(changes, updated_at=timezone.now())
+    if 'text' in changes:
+        note.fill_computed_fields()
+        values.update(
+            {field: getattr(note, field) for field in COMPUTED_FIELDS}
+        )
+        if note.compressed:
+            values['text'] = ''
+    return note, values
+
+
+def update_batch(queryset, author, key, values, changes):
+    """Применяет одни изменения к заметкам пачки одним update()."""
+    note, changes = build_changes(author, changes)
+    with transaction.atomic():
+        found = find_notes(queryset, key, values)
+        ids = [row['id'] for row in found.values()]
+        if ids:
+            index_entries(compressed_entries(
+                [row['id'] for row in found.values() if row['compressed']]
+            ), delete=True)
+            queryset.filter(pk__in=ids).update(**changes)
+            text_bytes = 0
+            if 'text' in changes:
+                replace_bodies(ids, note)
+                text_bytes = note.text_size * len(ids) - sum(
+                    row['text_size'] for row in found.values()
+                )
+            index_entries(batch_entries(found, note, changes))
+            NoteStats.objects.add(author.pk, text_bytes=text_bytes)
+            enqueue(
+                'record_revisions', order=revision_order(author.pk),
+                note_ids=ids, **{
+                    field: getattr(note, field)
+                    for field in BATCH_FIELDS if field in changes
+                }
+            )
+    invalidate_notes_list(author.pk)
+    return batch_results(key, values, found, 'updated')
+
+
+def batch_entries(found, note, changes):
+    """Строки поискового индекса сжатых заметок пачки после update()."""
+    if 'text' not in changes:
+        return compressed_entries(
+            [row['id'] for row in found.values() if row['compressed']]
+        )
+    if not note.compressed:
+        return []
+    return [
+        (row['id'], changes.get('title', row['title']), note.text)
+        for row in found.values()
+    ]
+
+
+def replace_bodies(ids, note):
+    """Приводит NoteBody заметок ids в соответствие с новым текстом."""
+    if not note.compressed:
+        NoteBody.objects.filter(note_id__in=ids).delete()
+        return
+    data = compress_text(note.text)
+    NoteBody.objects.bulk_create(
+        [NoteBody(note_id=note_id, data=data) for note_id in ids],
+        update_conflicts=True,
+        unique_fields=('note',),
+        update_fields=('data',),
+    )
@@ -0,0 +1,141 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+VERSION_KEY = 'notes:list-version:{user_id}'
+LIST_KEY = 'notes:list:{user_id}:{version}:{cursor}:{query}'
+HITS_KEY = 'notes:list-cache:hits'
+MISSES_KEY = 'notes:list-cache:misses'
+
+
+def get_cache():
+    """Кэш, в котором хранятся списки заметок."""
+    return caches[settings.NOTES_LIST_CACHE]
+
+
+def get_list_version(user_id):
+    """Текущая версия списка заметок пользователя."""
+    cache = get_cache()
+    key = VERSION_KEY.format(user_id=user_id)
+    version = cache.get(key)
+    if version is None:
+        # После вытеснения версия не должна совпасть с уже выданной.
+        cache.add(key, time.time_ns(), None)
+        version = cache.get(key)
+    return version
+
+
+def bump_list_version(user_id):
+    """Делает недействительными все закэшированные страницы списка."""
+    cache = get_cache()
+    key = VERSION_KEY.format(user_id=user_id)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), None)
+
+
+def invalidate_notes_list(user_id):
+    """Сбрасывает кэш списка сейчас и ещё раз после коммита.
+
+    Второй сброс дешёвый и выполняется сразу при коммите, а не в
+    очереди задач: иначе читатель успел бы закэшировать страницу до
+    коммита под новой версией.
+    """
+    bump_list_version(user_id)
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(lambda: bump_list_version(user_id))
+
+
+def query_digest(query):
+    """Короткий ключ для фильтра списка из строки запроса."""
+    if not query:
+        return ''
+    return hashlib.md5(query.encode(), usedforsecurity=False).hexdigest()
+
+
+def list_cache_key(user_id, cursor=None, query=''):
+    """Ключ страницы списка с учётом версии и фильтра."""
+    return LIST_KEY.format(
+        user_id=user_id,
+        version=get_list_version(user_id),
+        cursor=cursor or '',
+        query=query_digest(query),
+    )
+
+
+def _count(key):
+    cache = get_cache()
+    cache.add(key, 0, None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, None)
+
+
+def get_or_set(key, default):
+    """Достаёт значение из кэша или вычисляет его, считая попадания."""
+    cache = get_cache()
+    value = cache.get(key)
+    if value is not None:
+        _count(HITS_KEY)
+        return value, True
+    _count(MISSES_KEY)
+    value = default()
+    cache.set(key, value, settings.NOTES_LIST_CACHE_TIMEOUT)
+    return value, False
+
+
+def list_cache_stats():
+    """Счётчики попаданий и промахов кэша списка."""
+    cache = get_cache()
+    return {
+        'hits': cache.get(HITS_KEY, 0),
+        'misses': cache.get(MISSES_KEY, 0),
+    }
+
+
+async def aget_list_version(user_id):
+    """Асинхронный вариант get_list_version()."""
+    cache = get_cache()
+    key = VERSION_KEY.format(user_id=user_id)
+    version = await cache.aget(key)
+    if version is None:
+        await cache.aadd(key, time.time_ns(), None)
+        version = await cache.aget(key)
+    return version
+
+
+async def alist_cache_key(user_id, cursor=None, query=''):
+    """Асинхронный вариант list_cache_key()."""
+    return LIST_KEY.format(
+        user_id=user_id,
+        version=await aget_list_version(user_id),
+        cursor=cursor or '',
+        query=query_digest(query),
+    )
+
+
+async def _acount(key):
+    cache = get_cache()
+    await cache.aadd(key, 0, None)
+    try:
+        await cache.aincr(key)
+    except ValueError:
+        await cache.aset(key, 1, None)
+
+
+async def aget_or_set(key, default):
+    """Асинхронный вариант get_or_set(), default - корутинная функция."""
+    cache = get_cache()
+    value = await cache.aget(key)
+    if value is not None:
+        await _acount(HITS_KEY)
+        return value, True
+    await _acount(MISSES_KEY)
+    value = await default()
+    await cache.aset(key, value, settings.NOTES_LIST_CACHE_TIMEOUT)
+    return value, False
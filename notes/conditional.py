@@ -0,0 +1,78 @@
+import hashlib
+
+from django.db.models import Count, Max
+
+from .models import Note
+
+LIST_STATE = {'last_modified': Max('updated_at'), 'count': Count('id')}
+
+
+def make_etag(*parts):
+    """Собирает ETag из частей, от которых зависит страница."""
+    return hashlib.md5(
+        ':'.join(map(str, parts)).encode(), usedforsecurity=False
+    ).hexdigest()
+
+
+def _note_state_query(request, slug):
+    return Note.objects.filter(
+        author=request.user, slug=slug
+    ).values_list('title', 'content_hash', 'updated_at')
+
+
+def _note_state(request, slug):
+    """Валидаторы заметки одним запросом на оба колбэка condition()."""
+    cache = request.__dict__.setdefault('_note_state', {})
+    if slug not in cache:
+        cache[slug] = _note_state_query(request, slug).first()
+    return cache[slug]
+
+
+async def aload_note_state(request, slug):
+    """Загружает валидаторы заметки для condition() в async-представлении.
+
+    Колбэки condition() вызываются синхронно, поэтому запрос делается
+    заранее, а note_etag и note_last_modified берут готовый результат.
+    """
+    cache = request.__dict__.setdefault('_note_state', {})
+    if slug not in cache:
+        cache[slug] = await _note_state_query(request, slug).afirst()
+
+
+def note_etag(request, slug, **kwargs):
+    state = _note_state(request, slug)
+    if state is None:
+        return None
+    return make_etag(request.session.session_key, slug, *state)
+
+
+def note_last_modified(request, slug, **kwargs):
+    state = _note_state(request, slug)
+    return state[-1] if state else None
+
+
+async def aload_notes_list_state(request):
+    """Загружает состояние списка для notes_list_etag в async-представлении."""
+    if '_notes_list_state' not in request.__dict__:
+        request._notes_list_state = await Note.objects.filter(
+            author=request.user
+        ).aaggregate(**LIST_STATE)
+
+
+def notes_list_etag(request, *args, **kwargs):
+    """Возвращает ETag списка из max(updated_at) и числа заметок.
+
+    Число нужно, чтобы удаление не самой свежей заметки тоже меняло
+    ETag. По той же причине у списка нет Last-Modified.
+    """
+    if '_notes_list_state' not in request.__dict__:
+        request._notes_list_state = Note.objects.filter(
+            author=request.user
+        ).aggregate(**LIST_STATE)
+    state = request._notes_list_state
+    return make_etag(
+        request.session.session_key,
+        request.GET.urlencode(),
+        state['count'],
+        state['last_modified'],
+    )
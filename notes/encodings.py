@@ -0,0 +1,39 @@
+"""Выбор сжатия ответа по заголовку Accept-Encoding."""
+import re
+
+CODING = re.compile(
+    r'^\s*(?P<coding>[\w*-]+)\s*(?:;\s*q\s*=\s*(?P<q>[\d.]+))?\s*$'
+)
+
+
+def accepted_encodings(header):
+    """Кодировки из Accept-Encoding со значениями q.
+
+    Кодировка с q=0 остаётся в словаре: клиент явно её не принимает.
+    """
+    qualities = {}
+    for item in header.split(','):
+        match = CODING.match(item)
+        if match is None:
+            continue
+        try:
+            quality = float(match['q'] or 1)
+        except ValueError:
+            quality = 0.0
+        qualities[match['coding'].lower()] = quality
+    return qualities
+
+
+def preferred_encoding(header, available):
+    """Кодировка из available с наибольшим q у клиента или None.
+
+    При равных q выигрывает та, что раньше в available; '*'
+    задаёт q кодировок, не названных явно.
+    """
+    qualities = accepted_encodings(header)
+    best, best_quality = None, 0
+    for encoding in available:
+        quality = qualities.get(encoding, qualities.get('*', 0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
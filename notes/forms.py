@@ -1,9 +1,8 @@
-from pytils.translit import slugify
-
 from django import forms
 from django.core.exceptions import ValidationError
 
 from .models import Note
+from .tags import MAX_TAGS, parse_tags, set_note_tags
 
 WARNING = ' - такой slug уже существует, придумайте уникальное значение!'
 
@@ -11,19 +10,65 @@ WARNING = ' - такой slug уже существует, придумайте
 class NoteForm(forms.ModelForm):
     """Форма для создания или обновления заметки."""
 
+    tags = forms.CharField(
+        label='Теги',
+        required=False,
+        help_text=f'Через запятую, не больше {MAX_TAGS}'
+    )
+
     class Meta:
         model = Note
         fields = ('title', 'text', 'slug')
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.current_tags = []
+        if self.instance.pk:
+            self.current_tags = list(
+                self.instance.tags.values_list('name', flat=True)
+            )
+            self.initial.setdefault('tags', ', '.join(self.current_tags))
+
     def clean_slug(self):
-        """Обрабатывает случай, если slug не уникален."""
-        cleaned_data = super().clean()
-        slug = cleaned_data.get('slug')
+        """Обрабатывает случай, если slug не уникален.
+
+        Пустой slug подберёт модель при сохранении: к занятому
+        адресу из заголовка будет добавлен свободный суффикс -N.
+        """
+        slug = self.cleaned_data.get('slug')
         if not slug:
-            title = cleaned_data.get('title')
-            slug = slugify(title)[:100]
+            return slug
         if Note.objects.filter(
                 slug=slug
         ).exclude(id=self.instance.pk).exists():
             raise ValidationError(slug + WARNING)
         return slug
+
+    def clean_tags(self):
+        tags = parse_tags(self.cleaned_data.get('tags'))
+        if len(tags) > MAX_TAGS:
+            raise ValidationError(f'Не больше {MAX_TAGS} тегов.')
+        return tags
+
+    def save(self, commit=True):
+        """Теги сохраняются вместе с заметкой.
+
+        При commit=False - в save_m2m(), после сохранения заметки.
+        """
+        note = super().save(commit)
+        if commit:
+            self.save_tags()
+        else:
+            save_m2m = self.save_m2m
+
+            def save_m2m_and_tags():
+                save_m2m()
+                self.save_tags()
+
+            self.save_m2m = save_m2m_and_tags
+        return note
+
+    def save_tags(self):
+        set_note_tags(
+            self.instance, self.cleaned_data['tags'], self.current_tags
+        )
@@ -0,0 +1,28 @@
+from django.conf import settings
+from django.contrib.auth import hashers
+
+
+class ScryptPasswordHasher(hashers.ScryptPasswordHasher):
+    """scrypt с параметрами из NOTES_SCRYPT.
+
+    Алгоритм тот же, что у встроенного хешера, поэтому его хеши
+    проверяются как есть. Если параметры в настройках изменились,
+    must_update() вернёт True и пароль перехешируется при входе.
+    """
+
+    @property
+    def work_factor(self):
+        return settings.NOTES_SCRYPT['work_factor']
+
+    @property
+    def block_size(self):
+        return settings.NOTES_SCRYPT['block_size']
+
+    @property
+    def parallelism(self):
+        return settings.NOTES_SCRYPT['parallelism']
+
+    @property
+    def maxmem(self):
+        # С запасом: hashlib отказывает, если нужно больше maxmem.
+        return 2 * 128 * self.block_size * self.work_factor
@@ -0,0 +1,72 @@
+import sys
+from urllib.parse import urlencode
+
+from .models import Note
+from .pagination import SORTS
+from .tags import filter_by_tags, prefetch_tags, read_tag_filter
+
+TITLE_LENGTH = Note._meta.get_field('title').max_length
+LIST_FIELDS = ('id', 'slug', 'title', 'created_at', 'updated_at')
+SURROGATES = range(0xD800, 0xE000)
+
+
+def read_list_params(params):
+    """Сортировка и фильтры списка заметок из строки запроса."""
+    tags, match_all = read_tag_filter(params)
+    sort = params.get('sort', '')
+    return {
+        'sort': sort if sort in SORTS else '',
+        'q_title': params.get('q_title', '').strip()[:TITLE_LENGTH],
+        'tags': tags,
+        'match_all': match_all,
+    }
+
+
+def list_query(sort='', q_title='', tags=(), match_all=True):
+    """Строка запроса списка без курсора, обратная read_list_params()."""
+    query = [('sort', sort), ('q_title', q_title)]
+    query += [('tag', name) for name in tags]
+    if tags and not match_all:
+        query.append(('match', 'any'))
+    return urlencode([(name, value) for name, value in query if value])
+
+
+def title_prefix_range(prefix):
+    """Границы [prefix, upper) для поиска по началу заголовка.
+
+    В отличие от LIKE 'prefix%', диапазон SQLite берёт по индексу
+    (author, title, id); сравнение при этом учитывает регистр.
+    Последний символ без следующего (U+10FFFF) отбрасывается, а
+    суррогаты, которые база не примет, пропускаются. Для prefix из
+    одних U+10FFFF верхней границы нет: upper равна None.
+    """
+    head = prefix.rstrip(chr(sys.maxunicode))
+    if not head:
+        return prefix, None
+    code = ord(head[-1]) + 1
+    if code in SURROGATES:
+        code = SURROGATES.stop
+    return prefix, head[:-1] + chr(code)
+
+
+def filter_title_prefix(queryset, prefix):
+    """Заметки, заголовок которых начинается с prefix."""
+    if not prefix:
+        return queryset
+    lower, upper = title_prefix_range(prefix)
+    if upper is None:
+        return queryset.filter(title__gte=lower)
+    return queryset.filter(title__gte=lower, title__lt=upper)
+
+
+def filter_notes(queryset, author_id, q_title='', tags=(), match_all=True,
+                 **kwargs):
+    """Отбор заметок по началу заголовка и тегам."""
+    queryset = filter_title_prefix(queryset, q_title)
+    return filter_by_tags(queryset, author_id, tags, match_all)
+
+
+def filter_notes_list(queryset, author_id, **params):
+    """Выборка страницы списка: фильтры, нужные поля и теги заметок."""
+    queryset = filter_notes(queryset.only(*LIST_FIELDS), author_id, **params)
+    return prefetch_tags(queryset)
@@ -0,0 +1,27 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from notes.bulk import EXPORT_CHUNK_SIZE, export_notes
+from notes.models import Note
+
+
+class Command(BaseCommand):
+    help = 'Выгружает заметки пользователя в JSON Lines.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('username')
+        parser.add_argument(
+            '--chunk-size', type=int, default=EXPORT_CHUNK_SIZE
+        )
+
+    def handle(self, *args, **options):
+        User = get_user_model()
+        try:
+            author = User.objects.get(username=options['username'])
+        except User.DoesNotExist:
+            raise CommandError(
+                f'Пользователь {options["username"]} не найден.'
+            )
+        notes = Note.objects.filter(author=author)
+        for line in export_notes(notes, options['chunk_size']):
+            self.stdout.write(line, ending='')
@@ -0,0 +1,44 @@
+import sys
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from notes.bulk import IMPORT_CHUNK_SIZE, import_notes
+
+
+class Command(BaseCommand):
+    help = 'Импортирует заметки пользователя из файла JSON Lines.'
+    stealth_options = ('stdin',)
+
+    def add_arguments(self, parser):
+        parser.add_argument('username')
+        parser.add_argument(
+            'path', nargs='?', default='-',
+            help='Файл JSON Lines, по умолчанию стандартный ввод.'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=IMPORT_CHUNK_SIZE
+        )
+
+    def handle(self, *args, **options):
+        User = get_user_model()
+        try:
+            author = User.objects.get(username=options['username'])
+        except User.DoesNotExist:
+            raise CommandError(
+                f'Пользователь {options["username"]} не найден.'
+            )
+        if options['path'] == '-':
+            result = import_notes(
+                author, options.get('stdin', sys.stdin), options['chunk_size']
+            )
+        else:
+            with open(options['path'], encoding='utf-8') as lines:
+                result = import_notes(author, lines, options['chunk_size'])
+        for error in result['errors']:
+            self.stderr.write(
+                f'Строка {error["line"]}: {" ".join(error["errors"])}'
+            )
+        self.stdout.write(
+            self.style.SUCCESS(f'Создано заметок: {result["created"]}')
+        )
@@ -0,0 +1,40 @@
+import json
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from notes.metrics import METRICS, percentile_report, read_log
+
+
+class Command(BaseCommand):
+    help = 'Перцентили времени ответа и запросов к базе по именам URL.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path', default=settings.NOTES_PERF_LOG,
+            help='Журнал замеров, по умолчанию NOTES_PERF_LOG.'
+        )
+        parser.add_argument('--json', action='store_true')
+
+    def handle(self, *args, **options):
+        if not options['path']:
+            raise CommandError(
+                'Журнал замеров не задан: укажите --path или NOTES_PERF_LOG.'
+            )
+        try:
+            report = percentile_report(read_log(options['path']))
+        except FileNotFoundError:
+            raise CommandError(f'Файл {options["path"]} не найден.')
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+        header = f'{"view":<20} {"count":>6}' + ''.join(
+            f' {metric + " p50/p95/p99":>30}' for metric in METRICS
+        )
+        self.stdout.write(header)
+        for view, row in report.items():
+            cells = ''.join(
+                ' {p50:>9} {p95:>9} {p99:>9}'.format(**row[metric])
+                for metric in METRICS
+            )
+            self.stdout.write(f'{view:<20} {row["count"]:>6}{cells}')
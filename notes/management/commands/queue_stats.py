@@ -0,0 +1,18 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from notes.taskqueue import get_backend
+
+
+class Command(BaseCommand):
+    help = 'Глубина очереди задач, счётчики и задержка запуска.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--backend', help='Очередь, по умолчанию NOTES_TASK_BACKEND.'
+        )
+
+    def handle(self, *args, **options):
+        stats = get_backend(options['backend']).stats()
+        self.stdout.write(json.dumps(stats, indent=2))
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS
+
+from notes.search import ensure_search_index, rebuild_search_index
+
+
+class Command(BaseCommand):
+    help = 'Перестраивает полнотекстовый индекс заметок порциями.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, **options):
+        ensure_search_index(using=options['database'])
+        total = rebuild_search_index(
+            batch_size=options['batch_size'], using=options['database']
+        )
+        self.stdout.write(
+            self.style.SUCCESS(f'Проиндексировано заметок: {total}')
+        )
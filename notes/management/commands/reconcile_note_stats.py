@@ -0,0 +1,28 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from notes.models import NoteStats
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает NoteStats по таблице заметок порциями.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        user_ids = get_user_model().objects.order_by('pk').values_list(
+            'pk', flat=True
+        )
+        last_id, total = 0, 0
+        while batch := list(
+            user_ids.filter(pk__gt=last_id)[:options['batch_size']]
+        ):
+            with transaction.atomic():
+                NoteStats.objects.rebuild(batch)
+            last_id = batch[-1]
+            total += len(batch)
+        self.stdout.write(
+            self.style.SUCCESS(f'Пересчитано пользователей: {total}')
+        )
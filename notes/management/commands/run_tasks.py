@@ -0,0 +1,31 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from notes.taskqueue import get_backend
+
+
+class Command(BaseCommand):
+    help = 'Выполняет задачи из очереди в базе (NOTES_TASK_BACKEND).'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Выйти, когда готовых задач не останется.'
+        )
+        parser.add_argument(
+            '--sleep', type=float, default=1,
+            help='Пауза между проверками пустой очереди, секунд.'
+        )
+
+    def handle(self, *args, **options):
+        backend = get_backend('database')
+        done = 0
+        while True:
+            if backend.run_next():
+                done += 1
+            elif options['once']:
+                break
+            else:
+                time.sleep(options['sleep'])
+        self.stdout.write(f'Выполнено задач: {done}')
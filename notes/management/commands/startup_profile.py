@@ -0,0 +1,54 @@
+import json
+import subprocess
+
+from django.core.management.base import BaseCommand, CommandError
+
+from notes.startup import run_profile, top_imports
+
+
+class Command(BaseCommand):
+    help = 'Время импорта модулей и AppConfig.ready() при запуске проекта.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--top', type=int, default=20,
+            help='Сколько самых долгих импортов показать.'
+        )
+        parser.add_argument(
+            '--sort', choices=('cumulative', 'self'), default='cumulative',
+            help='Сортировка импортов: с вложенными или без.'
+        )
+        parser.add_argument(
+            '--no-admin', action='store_true',
+            help='Запуск с NOTES_ADMIN=0.'
+        )
+        parser.add_argument('--json', action='store_true')
+
+    def handle(self, *args, **options):
+        env = {'NOTES_ADMIN': '0'} if options['no_admin'] else None
+        try:
+            report = run_profile(env)
+        except subprocess.CalledProcessError as error:
+            raise CommandError(f'Запуск проекта упал:\n{error.stderr}')
+        report['imports'] = top_imports(
+            report['imports'], options['top'], f'{options["sort"]}_ms'
+        )
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+        self.stdout.write(
+            f'django.setup(): {report["setup_ms"]} ms, '
+            f'URLConf: {report["urlconf_ms"]} ms, '
+            f'импорты всего: {report["imports_ms"]} ms'
+        )
+        self.stdout.write(f'\n{"AppConfig.ready()":<40} {"ms":>10}')
+        for label, ms in sorted(
+            report['ready_ms'].items(), key=lambda item: -item[1]
+        ):
+            self.stdout.write(f'{label:<40} {ms:>10}')
+        self.stdout.write(f'\n{"module":<40} {"self ms":>10} {"cum. ms":>10}')
+        for row in report['imports']:
+            self.stdout.write(
+                f'{row["module"]:<40} {row["self_ms"]:>10} '
+                f'{row["cumulative_ms"]:>10}'
+            )
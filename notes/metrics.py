@@ -0,0 +1,65 @@
+import json
+import threading
+from collections import defaultdict, deque
+from statistics import quantiles
+
+from django.conf import settings
+
+SAMPLES_PER_VIEW = 1000
+METRICS = ('total_ms', 'db_ms', 'queries')
+
+_lock = threading.Lock()
+_samples = defaultdict(lambda: deque(maxlen=SAMPLES_PER_VIEW))
+
+
+def record(view_name, total_ms, db_ms, queries):
+    """Сохраняет замер запроса в памяти и, если задан, в журнале."""
+    sample = {
+        'view': view_name,
+        'total_ms': round(total_ms, 3),
+        'db_ms': round(db_ms, 3),
+        'queries': queries,
+    }
+    with _lock:
+        _samples[view_name].append(sample)
+        if settings.NOTES_PERF_LOG:
+            with open(settings.NOTES_PERF_LOG, 'a') as log:
+                log.write(json.dumps(sample) + '\n')
+
+
+def samples():
+    """Замеры текущего процесса."""
+    with _lock:
+        return [sample for view in _samples.values() for sample in view]
+
+
+def reset():
+    with _lock:
+        _samples.clear()
+
+
+def read_log(path):
+    """Замеры из журнала NOTES_PERF_LOG всех процессов."""
+    with open(path) as log:
+        return [json.loads(line) for line in log if line.strip()]
+
+
+def percentile_report(samples):
+    """Перцентили p50/p95/p99 каждой метрики по именам URL."""
+    by_view = defaultdict(list)
+    for sample in samples:
+        by_view[sample['view']].append(sample)
+    report = {}
+    for view, view_samples in sorted(by_view.items()):
+        report[view] = {'count': len(view_samples)}
+        for metric in METRICS:
+            values = [sample[metric] for sample in view_samples]
+            cuts = quantiles(values, n=100) if len(values) > 1 else (
+                values * 99
+            )
+            report[view][metric] = {
+                'p50': round(cuts[49], 3),
+                'p95': round(cuts[94], 3),
+                'p99': round(cuts[98], 3),
+            }
+    return report
@@ -0,0 +1,205 @@
+import logging
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+from . import metrics, routers
+from .auth import LoginBusy, login_busy_response
+
+logger = logging.getLogger(__name__)
+
+
+class QueryBudgetExceeded(Exception):
+    """Представление выполнило больше запросов, чем объявило."""
+
+
+class QueryCounter:
+    """Обёртка execute_wrapper, считающая запросы и их время."""
+
+    def __init__(self):
+        self.queries = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.duration += time.perf_counter() - started
+
+
+current_counter = ContextVar('query_counter', default=None)
+
+
+def count_queries(execute, sql, params, many, context):
+    """execute_wrapper, передающий запрос счётчику текущего запроса.
+
+    Счётчик лежит в ContextVar, поэтому запросы считаются и тогда,
+    когда async-представление выполняет ORM в потоке sync_to_async
+    на соединении этого потока.
+    """
+    counter = current_counter.get()
+    if counter is None:
+        return execute(sql, params, many, context)
+    return counter(execute, sql, params, many, context)
+
+
+def install_query_counter(sender, connection, **kwargs):
+    """Ставит count_queries на соединение (сигнал connection_created)."""
+    if count_queries not in connection.execute_wrappers:
+        connection.execute_wrappers.append(count_queries)
+
+
+class HybridMiddleware:
+    """Middleware, работающее и в синхронном, и в асинхронном стеке.
+
+    Без этого Django оборачивает асинхронную цепочку в async_to_sync
+    и занимает поток на каждый запрос.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+
+class PerformanceMiddleware(HybridMiddleware):
+    """Замеряет время ответа, число и время запросов к базе.
+
+    Результат попадает в заголовок Server-Timing и в metrics по имени
+    URL. Если у класса представления задан query_budget и запросов
+    больше, при NOTES_ENFORCE_QUERY_BUDGETS выбрасывается исключение.
+    query_budget - число или словарь {HTTP-метод: число}; HEAD
+    считается по бюджету GET.
+    """
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        counter = QueryCounter()
+        started = time.perf_counter()
+        token = current_counter.set(counter)
+        try:
+            response = self.get_response(request)
+        finally:
+            current_counter.reset(token)
+        return self.report(request, response, counter, started)
+
+    async def __acall__(self, request):
+        counter = QueryCounter()
+        started = time.perf_counter()
+        token = current_counter.set(counter)
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_counter.reset(token)
+        return self.report(request, response, counter, started)
+
+    def report(self, request, response, counter, started):
+        total_ms = (time.perf_counter() - started) * 1000
+        db_ms = counter.duration * 1000
+        response['Server-Timing'] = (
+            f'app;dur={total_ms:.1f}, '
+            f'db;dur={db_ms:.1f};desc="{counter.queries} queries"'
+        )
+        match = request.resolver_match
+        if match is not None:
+            metrics.record(match.view_name, total_ms, db_ms, counter.queries)
+            self.check_budget(request, match, counter.queries)
+        return response
+
+    def check_budget(self, request, match, queries):
+        view_class = getattr(match.func, 'view_class', None)
+        budget = getattr(view_class, 'query_budget', None)
+        if isinstance(budget, dict):
+            method = 'GET' if request.method == 'HEAD' else request.method
+            budget = budget.get(method)
+        if budget is None or queries <= budget:
+            return
+        message = (
+            f'{match.view_name} {request.method}: {queries} запросов к базе '
+            f'при бюджете {budget}'
+        )
+        if settings.NOTES_ENFORCE_QUERY_BUDGETS:
+            raise QueryBudgetExceeded(message)
+        logger.warning(message)
+
+
+class ReplicaPinMiddleware(HybridMiddleware):
+    """Закрепляет сессию за основной базой после записи.
+
+    После запроса с записью браузер получает подписанную cookie на
+    NOTES_REPLICA_PIN_SECONDS секунд, и пока она жива, чтение идёт
+    мимо реплик: пользователь видит свои изменения, даже если реплика
+    отстаёт. Cookie, а не сессия, потому что сама сессия читается из
+    базы. Должен стоять до SessionMiddleware.
+    """
+
+    cookie_name = 'primary_pin'
+    salt = 'notes.middleware.ReplicaPinMiddleware'
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        tokens = self.pin(request)
+        try:
+            return self.remember_write(self.get_response(request))
+        finally:
+            self.unpin(tokens)
+
+    async def __acall__(self, request):
+        # Переменные ставятся в контексте самой корутины: оттуда их
+        # копирует sync_to_async, и туда же возвращает запись роутера.
+        tokens = self.pin(request)
+        try:
+            return self.remember_write(await self.get_response(request))
+        finally:
+            self.unpin(tokens)
+
+    def pin(self, request):
+        pinned = request.get_signed_cookie(
+            self.cookie_name, default=None, salt=self.salt,
+            max_age=settings.NOTES_REPLICA_PIN_SECONDS,
+        ) is not None
+        return (
+            routers.pinned_to_primary.set(pinned),
+            routers.wrote_to_primary.set(False),
+        )
+
+    def unpin(self, tokens):
+        pinned_token, wrote_token = tokens
+        routers.pinned_to_primary.reset(pinned_token)
+        routers.wrote_to_primary.reset(wrote_token)
+
+    def remember_write(self, response):
+        if routers.wrote_to_primary.get():
+            response.set_signed_cookie(
+                self.cookie_name, '1', salt=self.salt,
+                max_age=settings.NOTES_REPLICA_PIN_SECONDS,
+                httponly=True, samesite='Lax',
+            )
+        return response
+
+
+class LoginBusyMiddleware(HybridMiddleware):
+    """Отвечает 503 с Retry-After, если password_pool переполнен.
+
+    Пароль проверяет любой вызов authenticate(): вход на сайт, вход
+    в админку, смена пароля. Поэтому LoginBusy переводится в ответ
+    здесь, одинаково для всех представлений.
+    """
+
+    def __call__(self, request):
+        return self.get_response(request)
+
+    def process_exception(self, request, exception):
+        if isinstance(exception, LoginBusy):
+            return login_busy_response()
+        return None
@@ -0,0 +1,51 @@
+import hashlib
+
+from django.db import migrations, models
+import django.utils.timezone
+
+BATCH_SIZE = 1000
+
+
+def fill_content_hash(apps, schema_editor):
+    Note = apps.get_model('notes', 'Note')
+    manager = Note.objects.db_manager(schema_editor.connection.alias)
+    notes = manager.only('text')
+    batch = []
+    for note in notes.iterator(chunk_size=BATCH_SIZE):
+        note.content_hash = hashlib.md5(
+            note.text.encode(), usedforsecurity=False
+        ).hexdigest()
+        batch.append(note)
+        if len(batch) == BATCH_SIZE:
+            manager.bulk_update(batch, ['content_hash'])
+            batch = []
+    manager.bulk_update(batch, ['content_hash'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notes', '0002_note_author_id_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='note',
+            name='updated_at',
+            field=models.DateTimeField(
+                auto_now=True, db_index=True,
+                default=django.utils.timezone.now, verbose_name='Изменено'
+            ),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='note',
+            name='content_hash',
+            field=models.CharField(
+                default='', editable=False, max_length=32,
+                verbose_name='Хеш текста'
+            ),
+            preserve_default=False,
+        ),
+        migrations.RunPython(fill_content_hash, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,65 @@
+from django.db import migrations, models
+import django.db.models.deletion
+from django.utils.text import Truncator
+
+BATCH_SIZE = 1000
+EXCERPT_LENGTH = 200
+
+
+def fill_excerpt_and_size(apps, schema_editor):
+    Note = apps.get_model('notes', 'Note')
+    manager = Note.objects.db_manager(schema_editor.connection.alias)
+    notes = manager.only('text')
+    batch = []
+    for note in notes.iterator(chunk_size=BATCH_SIZE):
+        note.excerpt = Truncator(note.text).chars(EXCERPT_LENGTH)
+        note.text_size = len(note.text.encode())
+        batch.append(note)
+        if len(batch) == BATCH_SIZE:
+            manager.bulk_update(batch, ['excerpt', 'text_size'])
+            batch = []
+    manager.bulk_update(batch, ['excerpt', 'text_size'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notes', '0003_note_updated_at_content_hash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='note',
+            name='excerpt',
+            field=models.CharField(
+                blank=True, editable=False, max_length=200,
+                verbose_name='Начало текста'
+            ),
+        ),
+        migrations.AddField(
+            model_name='note',
+            name='text_size',
+            field=models.PositiveIntegerField(
+                default=0, editable=False, verbose_name='Размер текста, байт'
+            ),
+        ),
+        migrations.AddField(
+            model_name='note',
+            name='compressed',
+            field=models.BooleanField(
+                default=False, editable=False, verbose_name='Текст сжат'
+            ),
+        ),
+        migrations.CreateModel(
+            name='NoteBody',
+            fields=[
+                ('note', models.OneToOneField(
+                    on_delete=django.db.models.deletion.CASCADE,
+                    primary_key=True, related_name='body', serialize=False,
+                    to='notes.note'
+                )),
+                ('data', models.BinaryField(verbose_name='Сжатый текст')),
+            ],
+        ),
+        migrations.RunPython(fill_excerpt_and_size, migrations.RunPython.noop),
+    ]
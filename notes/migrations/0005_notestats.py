@@ -0,0 +1,52 @@
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+from django.db.models import Count, Max, Sum
+
+BATCH_SIZE = 1000
+
+
+def fill_note_stats(apps, schema_editor):
+    alias = schema_editor.connection.alias
+    Note = apps.get_model('notes', 'Note')
+    NoteStats = apps.get_model('notes', 'NoteStats')
+    rows = Note.objects.using(alias).order_by().values('author_id').annotate(
+        note_count=Count('id'),
+        text_bytes=Sum('text_size'),
+        last_modified=Max('updated_at'),
+    )
+    NoteStats.objects.using(alias).bulk_create(
+        (NoteStats(user_id=row.pop('author_id'), **row) for row in rows),
+        batch_size=BATCH_SIZE,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notes', '0004_note_excerpt_text_size_notebody'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NoteStats',
+            fields=[
+                ('user', models.OneToOneField(
+                    on_delete=django.db.models.deletion.CASCADE,
+                    primary_key=True, related_name='note_stats',
+                    serialize=False, to=settings.AUTH_USER_MODEL
+                )),
+                ('note_count', models.IntegerField(
+                    default=0, verbose_name='Заметок'
+                )),
+                ('text_bytes', models.BigIntegerField(
+                    default=0, verbose_name='Размер текстов, байт'
+                )),
+                ('last_modified', models.DateTimeField(
+                    null=True, verbose_name='Изменено'
+                )),
+            ],
+        ),
+        migrations.RunPython(fill_note_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,72 @@
+import zlib
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+BATCH_SIZE = 1000
+
+
+def snapshot_existing_notes(apps, schema_editor):
+    alias = schema_editor.connection.alias
+    Note = apps.get_model('notes', 'Note')
+    NoteRevision = apps.get_model('notes', 'NoteRevision')
+    rows = Note.objects.using(alias).order_by('id').values_list(
+        'id', 'title', 'text', 'compressed', 'body__data'
+    )
+    batch = []
+    for note_id, title, text, compressed, body in rows.iterator(
+        chunk_size=BATCH_SIZE
+    ):
+        batch.append(NoteRevision(
+            note_id=note_id, number=1, title=title, is_snapshot=True,
+            data=bytes(body) if compressed else zlib.compress(text.encode()),
+        ))
+        if len(batch) == BATCH_SIZE:
+            NoteRevision.objects.using(alias).bulk_create(batch)
+            batch = []
+    NoteRevision.objects.using(alias).bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notes', '0005_notestats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NoteRevision',
+            fields=[
+                ('id', models.BigAutoField(
+                    auto_created=True, primary_key=True, serialize=False,
+                    verbose_name='ID'
+                )),
+                ('number', models.PositiveIntegerField(verbose_name='Номер')),
+                ('title', models.CharField(
+                    max_length=100, verbose_name='Заголовок'
+                )),
+                ('is_snapshot', models.BooleanField(
+                    default=False, verbose_name='Полная копия'
+                )),
+                ('data', models.BinaryField(
+                    verbose_name='Текст или разница с предыдущей версией'
+                )),
+                ('created_at', models.DateTimeField(
+                    auto_now_add=True, verbose_name='Создана'
+                )),
+                ('note', models.ForeignKey(
+                    on_delete=django.db.models.deletion.CASCADE,
+                    related_name='revisions', to='notes.note'
+                )),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(
+                    fields=('note', 'number'),
+                    name='note_revision_number_unique'
+                )],
+            },
+        ),
+        migrations.RunPython(
+            snapshot_existing_notes, migrations.RunPython.noop
+        ),
+    ]
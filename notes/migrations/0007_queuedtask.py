@@ -0,0 +1,63 @@
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notes', '0006_noterevision'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QueuedTask',
+            fields=[
+                ('id', models.BigAutoField(
+                    auto_created=True, primary_key=True, serialize=False,
+                    verbose_name='ID'
+                )),
+                ('name', models.CharField(
+                    max_length=100, verbose_name='Задача'
+                )),
+                ('kwargs', models.JSONField(
+                    default=dict, verbose_name='Аргументы'
+                )),
+                ('dedupe_key', models.CharField(
+                    max_length=200, null=True, verbose_name='Ключ'
+                )),
+                ('status', models.CharField(
+                    choices=[
+                        ('pending', 'Ждёт'),
+                        ('running', 'Выполняется'),
+                        ('failed', 'Не выполнена'),
+                    ],
+                    default='pending', max_length=10,
+                    verbose_name='Состояние'
+                )),
+                ('attempts', models.PositiveSmallIntegerField(
+                    default=0, verbose_name='Попыток'
+                )),
+                ('run_after', models.DateTimeField(
+                    default=django.utils.timezone.now,
+                    verbose_name='Не раньше'
+                )),
+                ('enqueued_at', models.DateTimeField(
+                    auto_now_add=True, verbose_name='Поставлена'
+                )),
+                ('last_error', models.TextField(
+                    blank=True, verbose_name='Ошибка'
+                )),
+            ],
+            options={
+                'indexes': [models.Index(
+                    fields=['status', 'run_after'],
+                    name='queued_task_ready_idx'
+                )],
+                'constraints': [models.UniqueConstraint(
+                    condition=models.Q(('status', 'pending')),
+                    fields=('dedupe_key',),
+                    name='queued_task_pending_key_unique'
+                )],
+            },
+        ),
+    ]
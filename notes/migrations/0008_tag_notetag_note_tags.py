@@ -0,0 +1,70 @@
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('notes', '0007_queuedtask'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tag',
+            fields=[
+                ('id', models.BigAutoField(
+                    auto_created=True, primary_key=True, serialize=False,
+                    verbose_name='ID'
+                )),
+                ('name', models.CharField(
+                    max_length=50, verbose_name='Название'
+                )),
+                ('note_count', models.PositiveIntegerField(
+                    default=0, verbose_name='Заметок'
+                )),
+                ('author', models.ForeignKey(
+                    on_delete=django.db.models.deletion.CASCADE,
+                    related_name='tags', to=settings.AUTH_USER_MODEL
+                )),
+            ],
+            options={
+                'ordering': ('name',),
+                'constraints': [models.UniqueConstraint(
+                    fields=('author', 'name'), name='tag_author_name_unique'
+                )],
+            },
+        ),
+        migrations.CreateModel(
+            name='NoteTag',
+            fields=[
+                ('id', models.BigAutoField(
+                    auto_created=True, primary_key=True, serialize=False,
+                    verbose_name='ID'
+                )),
+                ('note', models.ForeignKey(
+                    on_delete=django.db.models.deletion.CASCADE,
+                    related_name='note_tags', to='notes.note'
+                )),
+                ('tag', models.ForeignKey(
+                    db_index=False,
+                    on_delete=django.db.models.deletion.CASCADE,
+                    related_name='note_tags', to='notes.tag'
+                )),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(
+                    fields=('tag', 'note'), name='note_tag_tag_note_unique'
+                )],
+            },
+        ),
+        migrations.AddField(
+            model_name='note',
+            name='tags',
+            field=models.ManyToManyField(
+                blank=True, related_name='notes', through='notes.NoteTag',
+                to='notes.tag', verbose_name='Теги'
+            ),
+        ),
+    ]
@@ -0,0 +1,50 @@
+from django.db import migrations, models
+from django.db.models import F
+import django.utils.timezone
+
+
+def fill_created_at(apps, schema_editor):
+    Note = apps.get_model('notes', 'Note')
+    Note.objects.using(schema_editor.connection.alias).update(
+        created_at=F('updated_at')
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notes', '0008_tag_notetag_note_tags'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='note',
+            name='created_at',
+            field=models.DateTimeField(
+                auto_now_add=True, default=django.utils.timezone.now,
+                verbose_name='Создано'
+            ),
+            preserve_default=False,
+        ),
+        migrations.RunPython(fill_created_at, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='note',
+            index=models.Index(
+                fields=['author', 'title', 'id'], name='note_author_title_idx'
+            ),
+        ),
+        migrations.AddIndex(
+            model_name='note',
+            index=models.Index(
+                fields=['author', 'created_at', 'id'],
+                name='note_author_created_idx'
+            ),
+        ),
+        migrations.AddIndex(
+            model_name='note',
+            index=models.Index(
+                fields=['author', 'updated_at', 'id'],
+                name='note_author_updated_idx'
+            ),
+        ),
+    ]
@@ -0,0 +1,18 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notes', '0009_note_created_at_sort_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='queuedtask',
+            name='claimed_at',
+            field=models.DateTimeField(
+                blank=True, null=True, verbose_name='Взята'
+            ),
+        ),
+    ]
@@ -0,0 +1,28 @@
+from django.db import migrations
+
+OLD_TRIGGERS = (
+    'notes_note_fts_insert', 'notes_note_fts_delete', 'notes_note_fts_update'
+)
+
+
+def drop_search_triggers(apps, schema_editor):
+    """Удаляет триггеры поиска, которые не знали о сжатых заметках.
+
+    Новые триггеры и перестроенный индекс создаст ensure_search_index
+    после миграции.
+    """
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for name in OLD_TRIGGERS:
+        schema_editor.execute(f'DROP TRIGGER IF EXISTS {name}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notes', '0010_queuedtask_claimed_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_search_triggers, migrations.RunPython.noop),
+    ]
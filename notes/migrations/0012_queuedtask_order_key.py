@@ -0,0 +1,24 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notes', '0011_search_index_compressed_notes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='queuedtask',
+            name='order_key',
+            field=models.CharField(
+                max_length=200, null=True, verbose_name='Порядок'
+            ),
+        ),
+        migrations.AddIndex(
+            model_name='queuedtask',
+            index=models.Index(
+                fields=['order_key', 'id'], name='queued_task_order_idx'
+            ),
+        ),
+    ]
@@ -1,7 +1,77 @@
+import hashlib
+import zlib
+from collections import defaultdict
+
 from django.conf import settings
-from django.db import models
+from django.db import IntegrityError, models, router, transaction
+from django.db.models import Count, F, Max, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from django.utils.text import Truncator
+
+from .cache import invalidate_notes_list
+from .revisions import encode_delta, encode_snapshot, replay
+from .slugs import SLUG_ATTEMPTS, allocate_slug, transliterate
+from .taskqueue import enqueue
+
+
+def text_hash(text):
+    """Хеш текста заметки для валидаторов HTTP-кэша."""
+    return hashlib.md5(text.encode(), usedforsecurity=False).hexdigest()
+
+
+EXCERPT_LENGTH = 200
+
+
+def make_excerpt(text):
+    """Начало текста для списков и страниц, где весь текст не нужен."""
+    return Truncator(text).chars(EXCERPT_LENGTH)
+
+
+def compress_text(text):
+    """Сжимает текст заметки для NoteBody."""
+    return zlib.compress(text.encode())
+
+
+def decompress_text(data):
+    """Распаковывает текст заметки из NoteBody."""
+    return zlib.decompress(data).decode()
+
 
-from pytils.translit import slugify
+def revision_order(author_id):
+    """Ключ order задач ревизий: правки автора записываются по порядку."""
+    return f'revisions:{author_id}'
+
+
+def should_compress(text_size):
+    """Текст длиннее NOTES_COMPRESS_TEXT_OVER байт хранится сжатым."""
+    limit = settings.NOTES_COMPRESS_TEXT_OVER
+    return limit is not None and text_size > limit
+
+
+class NoteIterable(models.query.ModelIterable):
+    """Подставляет в заметки распакованный текст из NoteBody."""
+
+    def __iter__(self):
+        for note in super().__iter__():
+            note.inflate_text()
+            yield note
+
+
+class NoteQuerySet(models.QuerySet):
+    """Выборки заметок с текстом и без."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._iterable_class = NoteIterable
+
+    def without_text(self):
+        """Заметки без текста: он нужен только на странице заметки."""
+        return self.defer('text')
+
+    def with_text(self):
+        """Заметки с полным текстом, сжатый текст - тем же запросом."""
+        return self.defer(None).select_related('body')
 
 
 class Note(models.Model):
@@ -27,12 +97,469 @@ class Note(models.Model):
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
     )
+    created_at = models.DateTimeField(
+        'Создано',
+        auto_now_add=True
+    )
+    updated_at = models.DateTimeField(
+        'Изменено',
+        auto_now=True,
+        db_index=True
+    )
+    content_hash = models.CharField(
+        'Хеш текста',
+        max_length=32,
+        editable=False
+    )
+    excerpt = models.CharField(
+        'Начало текста',
+        max_length=EXCERPT_LENGTH,
+        blank=True,
+        editable=False
+    )
+    text_size = models.PositiveIntegerField(
+        'Размер текста, байт',
+        default=0,
+        editable=False
+    )
+    compressed = models.BooleanField(
+        'Текст сжат',
+        default=False,
+        editable=False
+    )
+    tags = models.ManyToManyField(
+        'Tag',
+        through='NoteTag',
+        related_name='notes',
+        blank=True,
+        verbose_name='Теги'
+    )
+
+    objects = NoteQuerySet.as_manager()
+
+    class Meta:
+        indexes = (
+            models.Index(
+                fields=('author', 'id'), name='note_author_id_idx'
+            ),
+            # Сортировки и поиск по началу заголовка в списке заметок.
+            models.Index(
+                fields=('author', 'title', 'id'), name='note_author_title_idx'
+            ),
+            models.Index(
+                fields=('author', 'created_at', 'id'),
+                name='note_author_created_idx'
+            ),
+            models.Index(
+                fields=('author', 'updated_at', 'id'),
+                name='note_author_updated_idx'
+            ),
+        )
 
     def __str__(self):
         return self.title
 
+    def fill_computed_fields(self):
+        """Обновляет поля, вычисляемые из текста, если текст загружен."""
+        if 'text' not in self.get_deferred_fields():
+            self.content_hash = text_hash(self.text)
+            self.excerpt = make_excerpt(self.text)
+            self.text_size = len(self.text.encode())
+            self.compressed = should_compress(self.text_size)
+
+    def inflate_text(self):
+        """Заменяет пустой text сжатой заметки её настоящим текстом."""
+        if self.__dict__.get('compressed') and 'text' in self.__dict__:
+            self.text = decompress_text(self.body.data)
+
     def save(self, *args, **kwargs):
-        if not self.slug:
-            max_slug_length = self._meta.get_field('slug').max_length
-            self.slug = slugify(self.title)[:max_slug_length]
-        super().save(*args, **kwargs)
+        text_loaded = 'text' not in self.get_deferred_fields()
+        was_compressed = text_loaded and self.compressed
+        self.fill_computed_fields()
+        adding = self._state.adding
+        with transaction.atomic(savepoint=False):
+            counted = adding or NoteStats.objects.add(
+                self.author_id,
+                text_bytes=(
+                    self.text_size - self._stored_text_size()
+                    if text_loaded else 0
+                ),
+            )
+            if was_compressed or self.compressed:
+                self._save_with_body(*args, **kwargs)
+            else:
+                self._save(*args, **kwargs)
+            if adding:
+                counted = NoteStats.objects.add(
+                    self.author_id, notes=1, text_bytes=self.text_size
+                )
+            if not counted:
+                NoteStats.objects.rebuild([self.author_id])
+            if text_loaded:
+                # Задача несёт снимок этой правки и не схлопывается с
+                # ждущими: пока она в очереди, заметку могут изменить
+                # ещё раз, а ревизия нужна каждой версии. Ревизии
+                # пишутся строго в порядке правок.
+                enqueue(
+                    'record_revision', order=revision_order(self.author_id),
+                    note_id=self.pk, title=self.title, text=self.text
+                )
+        invalidate_notes_list(self.author_id)
+
+    def _stored_text_size(self):
+        """Размер текста в базе до сохранения, как подзапрос."""
+        return Subquery(
+            Note.objects.filter(pk=self.pk).values('text_size')
+        )
+
+    def _save(self, *args, **kwargs):
+        if self.slug:
+            super().save(*args, **kwargs)
+        else:
+            self._save_with_free_slug(*args, **kwargs)
+
+    def _save_with_body(self, *args, **kwargs):
+        """Сохраняет заметку, держа сжатый текст в NoteBody.
+
+        В строке notes_note остаётся пустой text, чтобы строки списка
+        оставались короткими, а в поисковый индекс сжатая заметка
+        попадает отсюда, с распакованным текстом.
+        """
+        from .search import compressed_entries, index_entries
+
+        text = self.text
+        using = router.db_for_write(Note, instance=self)
+        with transaction.atomic(using=using):
+            if not self._state.adding:
+                index_entries(
+                    compressed_entries([self.pk], using), using, delete=True
+                )
+            if self.compressed:
+                self.text = ''
+            try:
+                self._save(*args, **kwargs)
+            finally:
+                self.text = text
+            if self.compressed:
+                NoteBody.objects.update_or_create(
+                    note=self, defaults={'data': compress_text(text)}
+                )
+            else:
+                NoteBody.objects.filter(note=self).delete()
+            if self.compressed:
+                index_entries([(self.pk, self.title, text)], using)
+
+    def _save_with_free_slug(self, *args, **kwargs):
+        """Подбирает свободный slug и повторяет вставку при гонке."""
+        max_slug_length = self._meta.get_field('slug').max_length
+        base = transliterate(self.title)[:max_slug_length]
+        others = Note.objects.exclude(pk=self.pk)
+        for attempt in range(SLUG_ATTEMPTS):
+            try:
+                with transaction.atomic():
+                    self.slug = allocate_slug(others, base, max_slug_length)
+                    super().save(*args, **kwargs)
+                return
+            except IntegrityError:
+                self.slug = ''
+                if attempt == SLUG_ATTEMPTS - 1:
+                    raise
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic(savepoint=False):
+            counted = NoteStats.objects.add(
+                self.author_id, notes=-1, text_bytes=-self._stored_text_size()
+            )
+            result = super().delete(*args, **kwargs)
+            if not counted:
+                NoteStats.objects.rebuild([self.author_id])
+        invalidate_notes_list(self.author_id)
+        return result
+
+
+class NoteBody(models.Model):
+    """Сжатый zlib текст больших заметок."""
+    note = models.OneToOneField(
+        Note,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='body'
+    )
+    data = models.BinaryField('Сжатый текст')
+
+
+class TagQuerySet(models.QuerySet):
+
+    def recount(self):
+        """Пересчитывает note_count выбранных тегов одним UPDATE."""
+        counts = NoteTag.objects.filter(tag=OuterRef('pk')).values(
+            'tag'
+        ).annotate(count=Count('note')).values('count')
+        return self.update(note_count=Coalesce(Subquery(counts), 0))
+
+
+class Tag(models.Model):
+    """Тег пользователя.
+
+    note_count поддерживают триггеры на notes_notetag, см. notes.tags.
+    """
+    author = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='tags'
+    )
+    name = models.CharField('Название', max_length=50)
+    note_count = models.PositiveIntegerField('Заметок', default=0)
+
+    objects = TagQuerySet.as_manager()
+
+    class Meta:
+        ordering = ('name',)
+        constraints = (
+            models.UniqueConstraint(
+                fields=('author', 'name'), name='tag_author_name_unique'
+            ),
+        )
+
+    def __str__(self):
+        return self.name
+
+
+class NoteTag(models.Model):
+    """Связь заметки с тегом.
+
+    Уникальный индекс (tag, note) покрывает выборку заметок по тегам,
+    индекс по note - загрузку тегов для списка заметок.
+    """
+    note = models.ForeignKey(
+        Note, on_delete=models.CASCADE, related_name='note_tags'
+    )
+    tag = models.ForeignKey(
+        Tag, on_delete=models.CASCADE, related_name='note_tags',
+        db_index=False
+    )
+
+    class Meta:
+        constraints = (
+            models.UniqueConstraint(
+                fields=('tag', 'note'), name='note_tag_tag_note_unique'
+            ),
+        )
+
+
+class NoteStatsManager(models.Manager):
+    """Изменение счётчиков NoteStats без пересчёта заметок."""
+
+    def add(self, user_id, notes=0, text_bytes=0):
+        """Прибавляет к счётчикам пользователя, False - если строки нет."""
+        return bool(self.filter(user_id=user_id).update(
+            note_count=F('note_count') + notes,
+            text_bytes=F('text_bytes') + text_bytes,
+            last_modified=timezone.now(),
+        ))
+
+    def add_notes(self, notes):
+        """Учитывает пачку созданных заметок."""
+        totals = defaultdict(lambda: [0, 0])
+        for note in notes:
+            totals[note.author_id][0] += 1
+            totals[note.author_id][1] += note.text_size
+        missing = [
+            user_id for user_id, (count, size) in totals.items()
+            if not self.add(user_id, notes=count, text_bytes=size)
+        ]
+        if missing:
+            self.rebuild(missing)
+
+    def rebuild(self, user_ids):
+        """Пересчитывает строки пользователей по таблице заметок."""
+        totals = {
+            row.pop('author_id'): row
+            for row in Note.objects.filter(
+                author_id__in=user_ids
+            ).order_by().values('author_id').annotate(
+                note_count=Count('id'),
+                text_bytes=Sum('text_size'),
+                last_modified=Max('updated_at'),
+            )
+        }
+        return self.bulk_create(
+            [
+                NoteStats(user_id=user_id, **totals.get(user_id, {}))
+                for user_id in user_ids
+            ],
+            update_conflicts=True,
+            unique_fields=('user',),
+            update_fields=('note_count', 'text_bytes', 'last_modified'),
+        )
+
+
+class NoteStats(models.Model):
+    """Счётчики заметок пользователя, чтобы не считать их COUNT(*)."""
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='note_stats'
+    )
+    note_count = models.IntegerField('Заметок', default=0)
+    text_bytes = models.BigIntegerField('Размер текстов, байт', default=0)
+    last_modified = models.DateTimeField('Изменено', null=True)
+
+    objects = NoteStatsManager()
+
+
+class NoteRevisionManager(models.Manager):
+    """Запись и восстановление ревизий заметок."""
+
+    def chain(self, note_id, number=None):
+        """Ревизии от ближайшего снимка до number одним запросом."""
+        revisions = self.filter(note_id=note_id)
+        if number is not None:
+            revisions = revisions.filter(number__lte=number)
+        last_snapshot = revisions.filter(is_snapshot=True).order_by(
+            '-number'
+        ).values('number')[:1]
+        return list(
+            revisions.filter(number__gte=Subquery(last_snapshot)).order_by(
+                'number'
+            )
+        )
+
+    def chains(self, note_ids):
+        """Цепочки ревизий нескольких заметок одним запросом."""
+        last_snapshot = self.filter(
+            note_id=OuterRef('note_id'), is_snapshot=True
+        ).order_by('-number').values('number')[:1]
+        chains = defaultdict(list)
+        for revision in self.filter(
+            note_id__in=note_ids, number__gte=Subquery(last_snapshot)
+        ).order_by('note_id', 'number'):
+            chains[revision.note_id].append(revision)
+        return chains
+
+    def next_revision(self, note, chain):
+        """Поля новой ревизии после chain или None без изменений.
+
+        Каждая NOTES_REVISION_SNAPSHOT_EVERY-я ревизия - полная копия,
+        остальные - разница с предыдущей.
+        """
+        if not chain:
+            return dict(
+                note=note, number=1, title=note.title, is_snapshot=True,
+                data=encode_snapshot(note.text),
+            )
+        text = replay(chain)
+        if (chain[-1].title, text) == (note.title, note.text):
+            return None
+        number = chain[-1].number + 1
+        is_snapshot = (
+            number - chain[0].number >= settings.NOTES_REVISION_SNAPSHOT_EVERY
+        )
+        return dict(
+            note=note, number=number, title=note.title,
+            is_snapshot=is_snapshot,
+            data=(
+                encode_snapshot(note.text) if is_snapshot
+                else encode_delta(text, note.text)
+            ),
+        )
+
+    def record(self, note, adding=False):
+        """Сохраняет текущую версию заметки, если она изменилась."""
+        fields = self.next_revision(
+            note, [] if adding else self.chain(note.pk)
+        )
+        return None if fields is None else self.create(**fields)
+
+    def record_many(self, notes):
+        """Сохраняет изменившиеся версии заметок одним INSERT."""
+        chains = self.chains([note.pk for note in notes])
+        revisions = [
+            self.model(**fields) for fields in (
+                self.next_revision(note, chains[note.pk]) for note in notes
+            ) if fields is not None
+        ]
+        return self.bulk_create(revisions)
+
+    def restore(self, note_id, number):
+        """Ревизия number с восстановленным текстом в атрибуте text."""
+        chain = self.chain(note_id, number)
+        if not chain or chain[-1].number != number:
+            raise self.model.DoesNotExist
+        revision = chain[-1]
+        revision.text = replay(chain)
+        return revision
+
+
+class NoteRevision(models.Model):
+    """Версия заметки: снимок текста или разница с предыдущей версией."""
+    note = models.ForeignKey(
+        Note,
+        on_delete=models.CASCADE,
+        related_name='revisions'
+    )
+    number = models.PositiveIntegerField('Номер')
+    title = models.CharField('Заголовок', max_length=100)
+    is_snapshot = models.BooleanField('Полная копия', default=False)
+    data = models.BinaryField('Текст или разница с предыдущей версией')
+    created_at = models.DateTimeField('Создана', auto_now_add=True)
+
+    objects = NoteRevisionManager()
+
+    class Meta:
+        constraints = (
+            models.UniqueConstraint(
+                fields=('note', 'number'), name='note_revision_number_unique'
+            ),
+        )
+
+
+class QueuedTask(models.Model):
+    """Задача очереди NOTES_TASK_BACKEND = 'database'."""
+    PENDING = 'pending'
+    RUNNING = 'running'
+    FAILED = 'failed'
+    STATUSES = (
+        (PENDING, 'Ждёт'),
+        (RUNNING, 'Выполняется'),
+        (FAILED, 'Не выполнена'),
+    )
+
+    name = models.CharField('Задача', max_length=100)
+    kwargs = models.JSONField('Аргументы', default=dict)
+    dedupe_key = models.CharField('Ключ', max_length=200, null=True)
+    order_key = models.CharField('Порядок', max_length=200, null=True)
+    status = models.CharField(
+        'Состояние', max_length=10, choices=STATUSES, default=PENDING
+    )
+    attempts = models.PositiveSmallIntegerField('Попыток', default=0)
+    run_after = models.DateTimeField('Не раньше', default=timezone.now)
+    enqueued_at = models.DateTimeField('Поставлена', auto_now_add=True)
+    claimed_at = models.DateTimeField('Взята', null=True, blank=True)
+    last_error = models.TextField('Ошибка', blank=True)
+
+    class Meta:
+        indexes = (
+            models.Index(
+                fields=('status', 'run_after'), name='queued_task_ready_idx'
+            ),
+            models.Index(
+                fields=('order_key', 'id'), name='queued_task_order_idx'
+            ),
+        )
+        constraints = (
+            models.UniqueConstraint(
+                fields=('dedupe_key',),
+                condition=models.Q(status='pending'),
+                name='queued_task_pending_key_unique',
+            ),
+        )
+
+
+def create_note_stats(sender, instance, created, raw=False, **kwargs):
+    """Заводит пустые счётчики новому пользователю."""
+    if created and not raw:
+        NoteStats.objects.bulk_create(
+            [NoteStats(user=instance)], ignore_conflicts=True
+        )
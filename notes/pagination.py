@@ -0,0 +1,153 @@
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from django.http import Http404
+from django.utils.encoding import force_bytes, force_str
+from django.utils.http import urlsafe_base64_decode, urlsafe_base64_encode
+
+INVALID_CURSOR = 'Неверный курсор страницы.'
+
+# Порядок списка для ?sort=; у каждого есть индекс (author, поле, id).
+SORTS = {
+    '': ('id',),
+    'title': ('title', 'id'),
+    '-title': ('-title', '-id'),
+    'created': ('created_at', 'id'),
+    '-created': ('-created_at', '-id'),
+    'updated': ('updated_at', 'id'),
+    '-updated': ('-updated_at', '-id'),
+}
+
+
+def encode_cursor(author_id, note_id, sort='', value=None):
+    """Упаковывает позицию последней заметки в непрозрачный токен.
+
+    Без сортировки это пара (author_id, id), иначе к ней добавляются
+    сортировка и значение поля, по которому идёт список.
+    """
+    parts = [author_id, note_id]
+    if sort:
+        parts[1:1] = [sort]
+        parts.append(value)
+    return urlsafe_base64_encode(force_bytes(':'.join(map(str, parts))))
+
+
+def decode_cursor(cursor, author_id, sort=''):
+    """Возвращает (id, значение поля) последней показанной заметки."""
+    try:
+        parts = force_str(urlsafe_base64_decode(cursor)).split(':', 3)
+        if sort:
+            cursor_author_id, cursor_sort, note_id, value = parts
+        else:
+            (cursor_author_id, note_id), cursor_sort, value = parts, '', None
+        cursor_author_id, note_id = int(cursor_author_id), int(note_id)
+    except (TypeError, ValueError, UnicodeDecodeError):
+        raise Http404(INVALID_CURSOR)
+    if cursor_author_id != author_id or cursor_sort != sort:
+        raise Http404(INVALID_CURSOR)
+    return note_id, value
+
+
+def after(ordering, note_id, value):
+    """Условие «после позиции курсора» для порядка ordering.
+
+    Лишнее условие field >= value сужает диапазон индекса, остальное
+    отсекает заметки с тем же значением до курсора.
+    """
+    field, _ = ordering
+    descending = field.startswith('-')
+    field = field.lstrip('-')
+    strict, loose = ('lt', 'lte') if descending else ('gt', 'gte')
+    return Q(**{f'{field}__{loose}': value}) & (
+        Q(**{f'{field}__{strict}': value})
+        | Q(**{field: value, f'id__{strict}': note_id})
+    )
+
+
+class CursorPage:
+    """Страница, полученная курсорной пагинацией."""
+
+    def __init__(self, object_list, next_cursor=None, has_previous=False):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self._has_previous = has_previous
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class CursorPaginator:
+    """Пагинатор по ключу (author_id, [поле,] id) без OFFSET и COUNT(*)."""
+
+    def __init__(self, per_page, author_id, sort=''):
+        self.per_page = per_page
+        self.author_id = author_id
+        self.sort = sort if sort in SORTS else ''
+        self.ordering = SORTS[self.sort]
+
+    @property
+    def sort_field(self):
+        return self.ordering[0].lstrip('-') if self.sort else None
+
+    def window(self, queryset, cursor=None):
+        """Ограничивает выборку одной страницей и одной лишней записью."""
+        if cursor:
+            note_id, value = decode_cursor(cursor, self.author_id, self.sort)
+            if self.sort:
+                field = queryset.model._meta.get_field(self.sort_field)
+                try:
+                    value = field.to_python(value)
+                except ValidationError:
+                    raise Http404(INVALID_CURSOR)
+                queryset = queryset.filter(
+                    after(self.ordering, note_id, value)
+                )
+            else:
+                queryset = queryset.filter(id__gt=note_id)
+        return queryset.order_by(*self.ordering)[:self.per_page + 1]
+
+    def page(self, rows, cursor=None):
+        """Собирает страницу из результата window()."""
+        rows = list(rows)
+        next_cursor = None
+        if len(rows) > self.per_page:
+            rows = rows[:self.per_page]
+            last = rows[-1]
+            next_cursor = encode_cursor(
+                self.author_id, last.id, self.sort,
+                self.sort_field and getattr(last, self.sort_field)
+            )
+        return CursorPage(rows, next_cursor, has_previous=bool(cursor))
+
+
+class CursorPaginationMixin:
+    """Заменяет постраничную пагинацию ListView на курсорную."""
+
+    cursor_kwarg = 'after'
+    sort_kwarg = 'sort'
+
+    def get_cursor(self):
+        return self.request.GET.get(self.cursor_kwarg)
+
+    def get_sort(self):
+        sort = self.request.GET.get(self.sort_kwarg, '')
+        return sort if sort in SORTS else ''
+
+    def paginate_queryset(self, queryset, page_size):
+        paginator = CursorPaginator(
+            page_size, self.request.user.pk, self.get_sort()
+        )
+        cursor = self.get_cursor()
+        page = paginator.page(paginator.window(queryset, cursor), cursor)
+        return (paginator, page, page.object_list, page.has_other_pages())
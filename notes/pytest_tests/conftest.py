@@ -1,8 +1,55 @@
+import zlib
+from importlib import reload
+from types import SimpleNamespace
+
 import pytest
 
-from django.test.client import Client
+from django.core.cache import cache
+from django.test.client import AsyncClient, Client
+from django.urls import clear_url_caches
 
+import notes.serializers
+import notes.staticfiles
+import notes.urls
+import yanote.urls
+from notes.auth import user_cache
 from notes.models import Note
+from notes.views import NotesList
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Фикстура для очистки кэшей между тестами."""
+    cache.clear()
+    user_cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def inline_tasks(settings):
+    """Фикстура, выполняющая фоновые задачи сразу."""
+    settings.NOTES_TASK_BACKEND = 'inline'
+
+
+@pytest.fixture(autouse=True)
+def enforce_query_budgets(settings):
+    """Фикстура, превращающая превышение query_budget в ошибку."""
+    settings.NOTES_ENFORCE_QUERY_BUDGETS = True
+
+
+@pytest.fixture
+def fake_brotli(monkeypatch):
+    """Фикстура, подменяющая необязательный пакет brotli.
+
+    Вместо brotli - zlib с приставкой b'br', чтобы ответ нельзя было
+    спутать с gzip.
+    """
+    brotli = SimpleNamespace(
+        compress=lambda data: b'br' + zlib.compress(data, 9),
+        decompress=lambda data: zlib.decompress(data.removeprefix(b'br')),
+    )
+    for module in (notes.serializers, notes.staticfiles):
+        monkeypatch.setattr(module, 'brotli', brotli)
+    return brotli
 
 
 @pytest.fixture
@@ -33,6 +80,31 @@ def not_author_client(not_author):
     return client
 
 
+def reload_urls():
+    """Пересобирает URLConf после смены NOTES_ASYNC_VIEWS."""
+    reload(notes.urls)
+    reload(yanote.urls)
+    clear_url_caches()
+
+
+@pytest.fixture
+def async_views(settings):
+    """Фикстура для подключения асинхронных представлений."""
+    settings.NOTES_ASYNC_VIEWS = True
+    reload_urls()
+    yield
+    settings.NOTES_ASYNC_VIEWS = False
+    reload_urls()
+
+
+@pytest.fixture
+def async_author_client(author):
+    """Фикстура для создания асинхронного клиента автора."""
+    client = AsyncClient()
+    client.force_login(author)
+    return client
+
+
 @pytest.fixture
 def note(author):
     """Фикстура для создания заметки."""
@@ -59,3 +131,17 @@ def form_data():
         'text': 'Новый текст',
         'slug': 'new-slug'
     }
+
+
+@pytest.fixture
+def many_notes(author):
+    """Фикстура для создания заметок на две страницы списка."""
+    return Note.objects.bulk_create(
+        Note(
+            title=f'Заметка {index}',
+            text='Текст',
+            slug=f'note-{index}',
+            author=author
+        )
+        for index in range(NotesList.paginate_by + 1)
+    )
@@ -0,0 +1,237 @@
+import gzip
+import json
+from http import HTTPStatus
+
+import pytest
+from pytest_lazy_fixtures import lf
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from notes.models import Note
+from notes.serializers import LIST_FIELDS
+from notes.tags import set_note_tags
+
+LIST_URL = reverse('notes:api_list')
+
+
+def detail_url(slug):
+    return reverse('notes:api_detail', args=(slug,))
+
+
+def send(client, method, url, payload):
+    """Запрос с JSON-телом."""
+    return getattr(client, method)(
+        url, data=json.dumps(payload), content_type='application/json'
+    )
+
+
+@pytest.fixture
+def tagged_note(note):
+    """Фикстура для заметки с тегами."""
+    set_note_tags(note, ['работа', 'дом'])
+    return note
+
+
+def test_list_default_fields(author_client, tagged_note):
+    """Тест списка с полями по умолчанию и тегами заметок."""
+    data = author_client.get(LIST_URL).json()
+    assert data['next'] is None
+    [item] = data['results']
+    assert tuple(item) == LIST_FIELDS
+    assert item['slug'] == tagged_note.slug
+    assert sorted(item['tags']) == ['дом', 'работа']
+    assert 'text' not in item
+
+
+def test_sparse_fields_map_to_only(author_client, note):
+    """Тест: ?fields= сужает и ответ, и SELECT."""
+    with CaptureQueriesContext(connection) as queries:
+        response = author_client.get(
+            LIST_URL, data={'fields': 'slug,title'}
+        )
+    assert response.json()['results'] == [
+        {'slug': note.slug, 'title': note.title}
+    ]
+    [select] = [
+        query['sql'] for query in queries
+        if query['sql'].startswith('SELECT') and 'notes_note' in query['sql']
+    ]
+    assert '"notes_note"."excerpt"' not in select
+    assert '"notes_note"."text"' not in select
+
+
+def test_unknown_field_is_rejected(author_client, note):
+    """Тест ошибки 400 на неизвестное поле."""
+    response = author_client.get(LIST_URL, data={'fields': 'title,secret'})
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+    assert 'secret' in response.json()['errors'][0]
+
+
+def test_list_cursor_pagination(author_client, many_notes):
+    """Тест обхода списка по курсорам."""
+    slugs, params = [], {'fields': 'slug', 'limit': 20, 'sort': '-title'}
+    while True:
+        data = author_client.get(LIST_URL, data=params).json()
+        slugs += [item['slug'] for item in data['results']]
+        if not data['next']:
+            break
+        params['after'] = data['next']
+    assert len(slugs) == len(many_notes)
+    assert slugs == [
+        note.slug
+        for note in sorted(many_notes, key=lambda note: note.title)[::-1]
+    ]
+
+
+def test_detail_includes_text(author_client, note):
+    """Тест заметки с текстом и датами в ISO 8601."""
+    data = author_client.get(detail_url(note.slug)).json()
+    assert data['text'] == note.text
+    assert data['created_at'].startswith(str(note.created_at.year))
+
+
+@pytest.mark.parametrize(
+    'parametrized_client, expected_status',
+    (
+        (lf('author_client'), HTTPStatus.OK),
+        (lf('not_author_client'), HTTPStatus.NOT_FOUND),
+        (lf('client'), HTTPStatus.UNAUTHORIZED),
+    )
+)
+def test_detail_availability(parametrized_client, expected_status, note):
+    """Тест: чужие заметки не видны, аноним получает 401, а не редирект."""
+    response = parametrized_client.get(detail_url(note.slug))
+    assert response.status_code == expected_status
+    assert response['Content-Type'] == 'application/json'
+
+
+def test_create(author, author_client):
+    """Тест создания заметки с тегами списком."""
+    response = send(author_client, 'post', LIST_URL, {
+        'title': 'Из API', 'text': 'Текст', 'tags': ['Мобильное']
+    })
+    assert response.status_code == HTTPStatus.CREATED
+    data = response.json()
+    assert data['slug'] == 'iz-api'
+    assert data['tags'] == ['мобильное']
+    assert Note.objects.get(slug='iz-api').author == author
+
+
+@pytest.mark.parametrize(
+    'payload',
+    (
+        {'title': 'Без текста'},
+        {'title': 'Лишнее', 'text': 'Текст', 'author': 1},
+        ['не объект'],
+    )
+)
+def test_create_invalid(author_client, payload):
+    """Тест ошибок валидации без создания заметки."""
+    response = send(author_client, 'post', LIST_URL, payload)
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+    assert response.json()['errors']
+    assert not Note.objects.exists()
+
+
+def test_create_duplicate_slug(author_client, note):
+    """Тест занятого slug."""
+    response = send(author_client, 'post', LIST_URL, {
+        'title': 'Дубль', 'text': 'Текст', 'slug': note.slug
+    })
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+    assert 'slug' in response.json()['errors']
+
+
+def test_patch_changes_only_given_fields(author_client, tagged_note):
+    """Тест частичного изменения: теги и slug остаются прежними."""
+    response = send(
+        author_client, 'patch', detail_url(tagged_note.slug),
+        {'text': 'Новый текст'}
+    )
+    assert response.status_code == HTTPStatus.OK
+    tagged_note.refresh_from_db()
+    assert tagged_note.text == 'Новый текст'
+    assert sorted(response.json()['tags']) == ['дом', 'работа']
+
+
+def test_put_replaces_note(author_client, tagged_note):
+    """Тест полной замены заметки, включая теги."""
+    response = send(author_client, 'put', detail_url(tagged_note.slug), {
+        'title': 'Заменена', 'text': 'Текст', 'slug': tagged_note.slug
+    })
+    assert response.status_code == HTTPStatus.OK
+    assert response.json()['tags'] == []
+    assert response.json()['title'] == 'Заменена'
+
+
+@pytest.mark.parametrize(
+    'parametrized_client, expected_status, expected_count',
+    (
+        (lf('author_client'), HTTPStatus.NO_CONTENT, 0),
+        (lf('not_author_client'), HTTPStatus.NOT_FOUND, 1),
+    )
+)
+def test_delete(parametrized_client, expected_status, expected_count, note):
+    """Тест удаления своей и чужой заметки."""
+    response = parametrized_client.delete(detail_url(note.slug))
+    assert response.status_code == expected_status
+    assert Note.objects.count() == expected_count
+
+
+@pytest.mark.parametrize(
+    'accept, compressed',
+    (
+        ('gzip, br', True),
+        ('', False),
+        ('gzip;q=0, identity', False),
+        ('*;q=0.5', True),
+    )
+)
+def test_large_response_is_gzipped(
+    settings, author_client, many_notes, accept, compressed
+):
+    """Тест сжатия большого ответа, если клиент его принимает."""
+    settings.NOTES_API_COMPRESS_OVER = 100
+    response = author_client.get(LIST_URL, HTTP_ACCEPT_ENCODING=accept)
+    content = response.content
+    if compressed:
+        assert response['Content-Encoding'] in ('gzip', 'br')
+        assert 'Accept-Encoding' in response['Vary']
+        if response['Content-Encoding'] == 'gzip':
+            content = gzip.decompress(content)
+    else:
+        assert not response.has_header('Content-Encoding')
+    if not compressed or response['Content-Encoding'] == 'gzip':
+        assert len(json.loads(content)['results']) == 50
+
+
+def test_large_response_prefers_brotli(
+    settings, fake_brotli, author_client, many_notes
+):
+    """Тест сжатия brotli, если пакет установлен и клиент его принимает."""
+    settings.NOTES_API_COMPRESS_OVER = 100
+    response = author_client.get(LIST_URL, HTTP_ACCEPT_ENCODING='gzip, br')
+    assert response['Content-Encoding'] == 'br'
+    content = fake_brotli.decompress(response.content)
+    assert len(json.loads(content)['results']) == 50
+
+
+def test_small_response_is_not_compressed(author_client, note):
+    """Тест: короткий ответ не сжимается."""
+    response = author_client.get(
+        detail_url(note.slug), HTTP_ACCEPT_ENCODING='gzip'
+    )
+    assert not response.has_header('Content-Encoding')
+
+
+def test_compressed_text_in_sparse_detail(settings, author, author_client):
+    """Тест текста сжатой заметки при выборке только поля text."""
+    settings.NOTES_COMPRESS_TEXT_OVER = 10
+    text = 'Длинный текст заметки. ' * 20
+    note = Note.objects.create(title='Сжатая', text=text, author=author)
+    response = author_client.get(
+        detail_url(note.slug), data={'fields': 'text'}
+    )
+    assert response.json() == {'text': text}
@@ -0,0 +1,148 @@
+from http import HTTPStatus
+
+import pytest
+from asgiref.sync import async_to_sync
+from pytest_lazy_fixtures import lf
+
+from django.core.cache import cache
+from django.test import AsyncClient
+from django.urls import reverse
+
+import notes.urls
+from notes.models import Note
+from notes.tags import set_note_tags
+
+from .conftest import reload_urls
+
+
+@pytest.fixture
+def async_not_author_client(not_author):
+    """Фикстура для создания асинхронного клиента другого пользователя."""
+    client = AsyncClient()
+    client.force_login(not_author)
+    return client
+
+
+def get(client, url, **kwargs):
+    """Выполняет запрос асинхронного клиента из синхронного теста."""
+    return async_to_sync(client.get)(url, **kwargs)
+
+
+def test_urls_select_async_views(async_views):
+    """Тест выбора асинхронных представлений настройкой."""
+    assert notes.urls.NotesList is notes.urls.async_views.AsyncNotesList
+    assert notes.urls.NoteDetail is notes.urls.async_views.AsyncNoteDetail
+
+
+def test_async_list_shows_own_notes(async_views, async_author_client, note):
+    """Тест асинхронного списка заметок."""
+    response = get(async_author_client, reverse('notes:list'))
+    assert response.status_code == HTTPStatus.OK
+    assert note in response.context['object_list']
+    response = get(async_author_client, reverse('notes:list'))
+    assert response['X-Notes-List-Cache'] == 'hit'
+
+
+def test_async_list_uses_cursor_pagination(
+    async_views, async_author_client, many_notes
+):
+    """Тест курсорной пагинации асинхронного списка."""
+    url = reverse('notes:list')
+    page = get(async_author_client, url).context['page_obj']
+    response = get(async_author_client, url, data={'after': page.next_cursor})
+    assert list(response.context['object_list']) == [many_notes[-1]]
+
+
+def test_async_list_filters_by_tags(
+    async_views, async_author_client, author, note
+):
+    """Тест фильтра по тегам и тегов заметок в асинхронном списке."""
+    other = Note.objects.create(title='Другая', text='Текст', author=author)
+    set_note_tags(note, ['работа'])
+    set_note_tags(other, ['дом'])
+    response = get(
+        async_author_client, reverse('notes:list'), data={'tag': 'работа'}
+    )
+    assert list(response.context['object_list']) == [note]
+    assert '#работа' in response.content.decode()
+    assert [tag.name for tag in response.context['user_tags']] == [
+        'дом', 'работа'
+    ]
+
+
+def test_async_list_sorted_by_title(
+    async_views, async_author_client, author, note
+):
+    """Тест сортировки и поиска по началу заголовка в асинхронном списке."""
+    Note.objects.create(title='Абв', text='Текст', author=author)
+    Note.objects.create(title='Яблоко', text='Текст', author=author)
+    response = get(
+        async_author_client, reverse('notes:list'), data={'sort': '-title'}
+    )
+    titles = [note.title for note in response.context['object_list']]
+    assert titles == sorted(titles, reverse=True)
+    response = get(
+        async_author_client, reverse('notes:list'), data={'q_title': 'Яб'}
+    )
+    assert [note.title for note in response.context['object_list']] == [
+        'Яблоко'
+    ]
+
+
+@pytest.mark.parametrize(
+    'parametrized_client, expected_status',
+    (
+        (lf('async_author_client'), HTTPStatus.OK),
+        (lf('async_not_author_client'), HTTPStatus.NOT_FOUND),
+    )
+)
+def test_async_detail_availability(
+    async_views, note, parametrized_client, expected_status
+):
+    """Тест доступности асинхронной страницы заметки."""
+    response = get(
+        parametrized_client, reverse('notes:detail', args=(note.slug,))
+    )
+    assert response.status_code == expected_status
+
+
+@pytest.mark.parametrize('name', ('notes:list', 'notes:detail'))
+def test_async_views_redirect_anonymous(async_views, note, name):
+    """Тест редиректа анонимного пользователя на страницу входа."""
+    args = (note.slug,) if name == 'notes:detail' else None
+    url = reverse(name, args=args)
+    response = get(AsyncClient(), url)
+    assert response.status_code == HTTPStatus.FOUND
+    assert response.url == f'{reverse("users:login")}?next={url}'
+
+
+@pytest.mark.parametrize('name', ('notes:list', 'notes:detail'))
+def test_async_conditional_get_matches_sync(
+    async_views, settings, author_client, note, name
+):
+    """Тест тех же ETag, Last-Modified и ответа 304, что у синхронных."""
+    args = (note.slug,) if name == 'notes:detail' else None
+    url = reverse(name, args=args)
+    client = AsyncClient()
+    client.cookies = author_client.cookies
+    response = get(client, url)
+    assert response.has_header('ETag')
+    not_modified = get(client, url, headers={
+        'If-None-Match': response['ETag']
+    })
+    assert not_modified.status_code == HTTPStatus.NOT_MODIFIED
+    assert not_modified.templates == []
+    Note.objects.create(title='Вторая', text='Текст', author=note.author)
+    note.text = 'Новый текст'
+    note.save()
+    assert get(client, url, headers={
+        'If-None-Match': response['ETag']
+    }).status_code == HTTPStatus.OK
+    response = get(client, url)
+    settings.NOTES_ASYNC_VIEWS = False
+    reload_urls()
+    # Страницы списка в кэше у представлений разные, валидаторы - общие.
+    cache.clear()
+    expected = author_client.get(url)
+    for header in ('ETag', 'Last-Modified'):
+        assert response.get(header) == expected.get(header)
@@ -0,0 +1,75 @@
+from http import HTTPStatus
+
+import pytest
+
+from django.test.client import Client
+from django.urls import reverse
+
+from notes.auth import user_cache
+
+SESSION_ENGINES = 'django.contrib.sessions.backends.'
+VIEW_QUERIES = {'notes:list': 1, 'notes:detail': 2}
+
+
+@pytest.fixture
+def make_client(settings, author):
+    """Фикстура для создания клиента автора с заданными сессиями."""
+    def make(engine, user_cache_ttl):
+        settings.SESSION_ENGINE = SESSION_ENGINES + engine
+        settings.NOTES_USER_CACHE_TTL = user_cache_ttl
+        client = Client()
+        client.force_login(author)
+        return client
+    return make
+
+
+@pytest.mark.parametrize('name', VIEW_QUERIES)
+@pytest.mark.parametrize(
+    'engine, user_cache_ttl, overhead',
+    (
+        ('db', 0, 2),
+        ('cached_db', 0, 1),
+        ('db', 60, 1),
+        ('cached_db', 60, 0),
+        ('signed_cookies', 60, 0),
+    )
+)
+def test_auth_queries_per_request(
+    make_client, note, name, engine, user_cache_ttl, overhead,
+    django_assert_num_queries
+):
+    """Тест числа запросов на сессию и пользователя при повторном входе."""
+    client = make_client(engine, user_cache_ttl)
+    args = (note.slug,) if name == 'notes:detail' else None
+    url = reverse(name, args=args)
+    client.get(url)
+    with django_assert_num_queries(VIEW_QUERIES[name] + overhead):
+        assert client.get(url).status_code == HTTPStatus.OK
+
+
+def test_password_change_drops_cached_user(make_client, author, note):
+    """Тест выхода из старых сессий после смены пароля."""
+    client = make_client('cached_db', 60)
+    url = reverse('notes:list')
+    client.get(url)
+    assert user_cache.get(author.pk) is not None
+    author.set_password('new-password-123')
+    author.save()
+    assert user_cache.get(author.pk) is None
+    assert client.get(url).status_code == HTTPStatus.FOUND
+
+
+def test_logout_drops_cached_user(make_client, author):
+    """Тест сброса кэша пользователя при выходе."""
+    client = make_client('cached_db', 60)
+    client.get(reverse('notes:list'))
+    client.post(reverse('users:logout'))
+    assert user_cache.get(author.pk) is None
+
+
+def test_cached_user_expires(make_client, author, monkeypatch):
+    """Тест истечения срока жизни пользователя в кэше."""
+    client = make_client('cached_db', 60)
+    client.get(reverse('notes:list'))
+    monkeypatch.setattr('notes.auth.time.monotonic', lambda: float('inf'))
+    assert user_cache.get(author.pk) is None
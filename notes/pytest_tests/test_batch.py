@@ -0,0 +1,149 @@
+import json
+from http import HTTPStatus
+
+import pytest
+
+from django.urls import reverse
+
+from notes.models import Note, NoteBody, NoteRevision, NoteStats, text_hash
+from notes.search import search_notes
+
+NEW_TEXT = 'Общий новый текст'
+
+
+def post_json(client, name, payload):
+    """Отправляет пакетный запрос с телом в JSON."""
+    return client.post(
+        reverse(name), data=json.dumps(payload),
+        content_type='application/json'
+    )
+
+
+@pytest.fixture
+def foreign_note(not_author):
+    """Фикстура для создания заметки другого пользователя."""
+    return Note.objects.create(
+        title='Чужая', text='Текст', slug='foreign', author=not_author
+    )
+
+
+@pytest.fixture
+def second_note(author):
+    """Фикстура для создания второй заметки автора."""
+    return Note.objects.create(
+        title='Вторая', text='Ещё текст', slug='second', author=author
+    )
+
+
+def test_batch_delete_reports_each_note(
+    author_client, author, note, second_note, foreign_note
+):
+    """Тест удаления пачки только своих заметок с отчётом по каждой."""
+    response = post_json(author_client, 'notes:batch_delete', {
+        'slugs': [note.slug, foreign_note.slug, 'missing', second_note.slug],
+    })
+    assert response.status_code == HTTPStatus.OK
+    assert response.json()['results'] == [
+        {'slug': note.slug, 'status': 'deleted'},
+        {'slug': foreign_note.slug, 'status': 'not_found'},
+        {'slug': 'missing', 'status': 'not_found'},
+        {'slug': second_note.slug, 'status': 'deleted'},
+    ]
+    assert list(Note.objects.all()) == [foreign_note]
+    stats = NoteStats.objects.get(user=author)
+    assert (stats.note_count, stats.text_bytes) == (0, 0)
+
+
+def test_batch_delete_by_ids(author_client, note, foreign_note):
+    """Тест удаления пачки по id."""
+    response = post_json(
+        author_client, 'notes:batch_delete',
+        {'ids': [note.pk, foreign_note.pk]}
+    )
+    assert [item['status'] for item in response.json()['results']] == [
+        'deleted', 'not_found'
+    ]
+    assert Note.objects.filter(pk=foreign_note.pk).exists()
+
+
+def test_batch_update_applies_changes(
+    author_client, author, note, second_note, foreign_note
+):
+    """Тест одинакового изменения пачки заметок одним UPDATE."""
+    author_client.get(reverse('notes:list'))
+    response = post_json(author_client, 'notes:batch_update', {
+        'ids': [note.pk, second_note.pk, foreign_note.pk],
+        'changes': {'title': 'Общий', 'text': NEW_TEXT},
+    })
+    assert [item['status'] for item in response.json()['results']] == [
+        'updated', 'updated', 'not_found'
+    ]
+    for updated in Note.objects.filter(author=author):
+        assert (updated.title, updated.text) == ('Общий', NEW_TEXT)
+        assert updated.content_hash == text_hash(NEW_TEXT)
+        assert updated.excerpt == NEW_TEXT
+        assert updated.updated_at > note.updated_at
+    assert Note.objects.get(pk=foreign_note.pk).title == 'Чужая'
+    assert NoteStats.objects.get(user=author).text_bytes == (
+        2 * len(NEW_TEXT.encode())
+    )
+    assert search_notes(Note.objects.all(), 'общий').count() == 2
+    response = author_client.get(reverse('notes:list'))
+    assert response['X-Notes-List-Cache'] == 'miss'
+
+
+def test_batch_update_records_revisions(author_client, note, second_note):
+    """Тест ревизий для каждой заметки пакетного изменения."""
+    # Повтор того же изменения новой ревизии не даёт.
+    for changes in (
+        {'title': 'Общий'}, {'text': NEW_TEXT}, {'text': NEW_TEXT}
+    ):
+        post_json(author_client, 'notes:batch_update', {
+            'ids': [note.pk, second_note.pk], 'changes': changes,
+        })
+    for updated in (note, second_note):
+        assert updated.revisions.count() == 3
+        revision = NoteRevision.objects.restore(updated.pk, 2)
+        assert (revision.title, revision.text) == ('Общий', updated.text)
+        revision = NoteRevision.objects.restore(updated.pk, 3)
+        assert (revision.title, revision.text) == ('Общий', NEW_TEXT)
+
+
+def test_batch_update_compresses_text(settings, author_client, note):
+    """Тест пакетного изменения на длинный текст со сжатием."""
+    settings.NOTES_COMPRESS_TEXT_OVER = 10
+    post_json(author_client, 'notes:batch_update', {
+        'slugs': [note.slug], 'changes': {'text': NEW_TEXT},
+    })
+    assert NoteBody.objects.filter(note=note).exists()
+    assert Note.objects.get(pk=note.pk).text == NEW_TEXT
+
+
+@pytest.mark.parametrize(
+    'name, payload',
+    (
+        ('notes:batch_delete', {}),
+        ('notes:batch_delete', {'slugs': ['a'], 'ids': [1]}),
+        ('notes:batch_delete', {'ids': ['1']}),
+        ('notes:batch_delete', {'slugs': ['a'] * 1001}),
+        ('notes:batch_update', {'slugs': ['a']}),
+        ('notes:batch_update', {'slugs': ['a'], 'changes': {'slug': 'b'}}),
+        (
+            'notes:batch_update',
+            {'slugs': ['a'], 'changes': {'title': 'т' * 101}}
+        ),
+    )
+)
+def test_batch_rejects_bad_payload(author_client, note, name, payload):
+    """Тест ошибки 400 для некорректных пакетных запросов."""
+    response = post_json(author_client, name, payload)
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+    assert response.json()['errors']
+    assert Note.objects.get(pk=note.pk).title == note.title
+
+
+def test_batch_requires_login(client, note):
+    """Тест редиректа анонимного пользователя."""
+    response = post_json(client, 'notes:batch_delete', {'slugs': [note.slug]})
+    assert response.status_code == HTTPStatus.FOUND
+    assert Note.objects.filter(pk=note.pk).exists()
@@ -0,0 +1,149 @@
+import json
+from http import HTTPStatus
+from io import StringIO
+
+import pytest
+
+from django.core.management import CommandError, call_command
+from django.urls import reverse
+
+from notes import bulk
+from notes.bulk import import_notes
+from notes.cache import get_list_version
+from notes.forms import WARNING
+from notes.models import Note
+
+IMPORT_LINES = (
+    {'title': 'Первая', 'text': 'Текст первой'},
+    {'title': 'Первая', 'text': 'Тот же заголовок'},
+    {'title': 'Вторая', 'text': 'Текст второй', 'slug': 'note-slug'},
+    {'title': 'Без текста'},
+    'не объект',
+)
+
+
+def as_jsonl(records):
+    """Склеивает записи в JSON Lines."""
+    return ''.join(
+        json.dumps(record, ensure_ascii=False) + '\n' for record in records
+    ) + '{broken\n'
+
+
+def test_import_creates_notes_in_bulk(author_client, author, note):
+    """Тест импорта заметок с подбором slug и отчётом об ошибках."""
+    response = author_client.post(
+        reverse('notes:import'),
+        data=as_jsonl(IMPORT_LINES),
+        content_type='application/x-ndjson',
+    )
+    assert response.status_code == HTTPStatus.OK
+    result = response.json()
+    assert result['created'] == 2
+    assert [error['line'] for error in result['errors']] == [3, 4, 5, 6]
+    assert result['errors'][0]['errors'] == ['note-slug' + WARNING]
+    slugs = set(
+        Note.objects.filter(author=author).values_list('slug', flat=True)
+    )
+    assert slugs == {'note-slug', 'pervaya', 'pervaya-1'}
+
+
+def test_import_keeps_given_slugs_first(author):
+    """Тест: заданный slug не уступает подобранному в той же порции."""
+    records = (
+        {'title': 'Первая', 'text': 'Текст'},
+        {'title': 'Другая', 'text': 'Текст', 'slug': 'pervaya'},
+        {'title': 'Третья', 'text': 'Текст', 'slug': 'pervaya'},
+    )
+    result = import_notes(author, as_jsonl(records).splitlines())
+    # Четвёртая строка - битый JSON из as_jsonl.
+    assert [error['line'] for error in result['errors']] == [3, 4]
+    assert dict(
+        Note.objects.filter(author=author).values_list('title', 'slug')
+    ) == {'Другая': 'pervaya', 'Первая': 'pervaya-1'}
+
+
+def test_failed_chunk_is_reported(author, monkeypatch):
+    """Тест: порция, которую не удалось сохранить, попадает в errors."""
+    version = get_list_version(author.pk)
+    allocate_slugs = bulk.allocate_slugs
+    calls = []
+
+    def allocate_or_collide(queryset, bases, max_length):
+        calls.append(bases)
+        if len(calls) == 1:
+            return allocate_slugs(queryset, bases, max_length)
+        return ['same'] * len(bases)
+
+    monkeypatch.setattr(bulk, 'allocate_slugs', allocate_or_collide)
+    result = import_notes(author, [
+        json.dumps({'title': f'Заметка {index}', 'text': 'Текст'})
+        for index in range(4)
+    ], chunk_size=2)
+    assert result['created'] == 2
+    assert result['errors'] == [
+        {'line': line, 'errors': [bulk.CHUNK_FAILED]} for line in (3, 4)
+    ]
+    assert Note.objects.filter(author=author).count() == 2
+    assert get_list_version(author.pk) != version
+
+
+def test_import_in_small_chunks(author, django_assert_max_num_queries):
+    """Тест импорта порциями: число запросов не растёт с числом заметок."""
+    lines = [
+        json.dumps({'title': f'Заметка {index}', 'text': 'Текст'})
+        for index in range(50)
+    ]
+    with django_assert_max_num_queries(6 * 5):
+        call_command(
+            'import_notes', author.username, '-', chunk_size=10,
+            stdin=StringIO('\n'.join(lines)), stdout=StringIO()
+        )
+    assert Note.objects.filter(author=author).count() == 50
+
+
+def test_export_streams_only_own_notes(author_client, not_author, note):
+    """Тест выгрузки заметок только текущего пользователя."""
+    Note.objects.create(title='Чужая', text='Текст', author=not_author)
+    response = author_client.get(reverse('notes:export'))
+    assert response.streaming
+    lines = b''.join(response.streaming_content).decode().splitlines()
+    assert [json.loads(line) for line in lines] == [
+        {'title': note.title, 'text': note.text, 'slug': note.slug}
+    ]
+
+
+def test_export_import_round_trip(author, not_author, note):
+    """Тест переноса заметок между пользователями командами manage.py."""
+    exported = StringIO()
+    call_command('export_notes', author.username, stdout=exported)
+    note.delete()
+    exported.seek(0)
+    call_command(
+        'import_notes', not_author.username, '-',
+        stdin=exported, stdout=StringIO()
+    )
+    copy = Note.objects.get(author=not_author)
+    assert (copy.title, copy.text, copy.slug) == (
+        note.title, note.text, note.slug
+    )
+
+
+def test_reimport_does_not_duplicate(author, note):
+    """Тест повторного импорта выгрузки: занятый slug - ошибка строки."""
+    exported = StringIO()
+    call_command('export_notes', author.username, stdout=exported)
+    exported.seek(0)
+    stderr = StringIO()
+    call_command(
+        'import_notes', author.username, '-',
+        stdin=exported, stdout=StringIO(), stderr=stderr
+    )
+    assert Note.objects.count() == 1
+    assert stderr.getvalue() == f'Строка 1: {note.slug}{WARNING}\n'
+
+
+@pytest.mark.django_db
+def test_import_command_requires_existing_user():
+    """Тест ошибки команды для несуществующего пользователя."""
+    with pytest.raises(CommandError, match='не найден'):
+        call_command('import_notes', 'nobody', '-', stdin=StringIO())
@@ -0,0 +1,62 @@
+from http import HTTPStatus
+
+import pytest
+
+from django.test import Client
+from django.urls import reverse
+
+from notes.models import Note, text_hash
+
+
+@pytest.fixture
+def detail_url(note):
+    """Фикстура для адреса страницы заметки."""
+    return reverse('notes:detail', args=(note.slug,))
+
+
+def test_note_has_content_hash(note):
+    """Тест вычисления хеша текста при сохранении."""
+    assert note.content_hash == text_hash(note.text)
+
+
+def test_detail_not_modified(author_client, detail_url):
+    """Тест ответа 304 без рендеринга шаблона для неизменённой заметки."""
+    response = author_client.get(detail_url)
+    assert response.has_header('Last-Modified')
+    response = author_client.get(
+        detail_url, HTTP_IF_NONE_MATCH=response['ETag']
+    )
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+    assert response.templates == []
+
+
+def test_detail_modified_after_edit(author_client, note, detail_url):
+    """Тест смены ETag после изменения заметки."""
+    etag = author_client.get(detail_url)['ETag']
+    note.text = 'Новый текст'
+    note.save()
+    response = author_client.get(detail_url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.OK
+
+
+def test_detail_etag_differs_between_sessions(author, note, detail_url):
+    """Тест привязки ETag к сессии: после нового входа страница новая."""
+    first, second = Client(), Client()
+    first.force_login(author)
+    second.force_login(author)
+    assert first.get(detail_url)['ETag'] != second.get(detail_url)['ETag']
+
+
+def test_list_not_modified_until_note_deleted(
+    author_client, author, note, django_assert_num_queries
+):
+    """Тест ответа 304 для списка и его сброса при удалении заметки."""
+    url = reverse('notes:list')
+    Note.objects.create(title='Вторая', text='Текст', author=author)
+    etag = author_client.get(url)['ETag']
+    with django_assert_num_queries(1):
+        response = author_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+    note.delete()
+    response = author_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.OK
@@ -1,9 +1,16 @@
+from http import HTTPStatus
+
 import pytest
 from pytest_lazy_fixtures import lf
 
+from django.db import transaction
 from django.urls import reverse
 
+from notes.cache import get_list_version
 from notes.forms import NoteForm
+from notes.models import Note, QueuedTask
+from notes.pagination import encode_cursor
+from notes.views import NotesList
 
 
 @pytest.mark.parametrize(
@@ -36,3 +43,68 @@ def test_pages_contain_form(author_client, name, args):
     response = author_client.get(url)
     assert 'form' in response.context
     assert isinstance(response.context['form'], NoteForm)
+
+
+def test_notes_list_is_paginated_by_cursor(author_client, many_notes):
+    """Тест курсорной пагинации списка заметок."""
+    url = reverse('notes:list')
+    response = author_client.get(url)
+    page = response.context['page_obj']
+    assert len(response.context['object_list']) == NotesList.paginate_by
+    assert page.has_next()
+    response = author_client.get(url, {'after': page.next_cursor})
+    object_list = response.context['object_list']
+    assert [note.id for note in object_list] == [many_notes[-1].id]
+    assert not response.context['page_obj'].has_next()
+
+
+def test_notes_list_does_not_load_text(author_client, note):
+    """Тест отсутствия текста заметок в выборке для списка."""
+    response = author_client.get(reverse('notes:list'))
+    listed_note = response.context['object_list'][0]
+    assert 'text' in listed_note.get_deferred_fields()
+
+
+@pytest.mark.parametrize('cursor', ('broken', encode_cursor(0, 1)))
+def test_notes_list_rejects_foreign_cursor(author_client, note, cursor):
+    """Тест отказа на испорченный или чужой курсор."""
+    response = author_client.get(reverse('notes:list'), {'after': cursor})
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+def test_notes_list_is_served_from_cache(
+    author_client, note, django_assert_num_queries
+):
+    """Тест повторной выдачи списка из кэша без запроса заметок."""
+    url = reverse('notes:list')
+    assert author_client.get(url)['X-Notes-List-Cache'] == 'miss'
+    with django_assert_num_queries(1):
+        response = author_client.get(url)
+    assert response['X-Notes-List-Cache'] == 'hit'
+    assert note in response.context['object_list']
+
+
+def test_notes_list_cache_is_invalidated_on_save(author_client, note):
+    """Тест сброса кэша списка при изменении и удалении заметки."""
+    url = reverse('notes:list')
+    author_client.get(url)
+    note.title = 'Изменённый заголовок'
+    note.save()
+    response = author_client.get(url)
+    assert response['X-Notes-List-Cache'] == 'miss'
+    assert note.title in response.content.decode()
+    note.delete()
+    response = author_client.get(url)
+    assert list(response.context['object_list']) == []
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.parametrize('backend', ('inline', 'database'))
+def test_notes_list_version_bumped_on_commit(settings, author, backend):
+    """Тест сброса кэша списка сразу при коммите, без очереди задач."""
+    settings.NOTES_TASK_BACKEND = backend
+    with transaction.atomic():
+        Note.objects.create(title='Новая', text='Текст', author=author)
+        before_commit = get_list_version(author.pk)
+    assert get_list_version(author.pk) != before_commit
+    assert not QueuedTask.objects.exclude(name='record_revision').exists()
@@ -0,0 +1,143 @@
+import threading
+from http import HTTPStatus
+
+import pytest
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import (
+    PBKDF2PasswordHasher, identify_hasher, make_password
+)
+from django.urls import reverse
+
+from notes import auth
+from notes.auth import password_pool
+
+LOGIN_URL = reverse('users:login')
+PASSWORD = 'Tr1cky-passw0rd'
+
+
+@pytest.fixture(autouse=True)
+def fast_scrypt(settings):
+    """Фикстура с лёгким scrypt и пересозданием пула паролей."""
+    settings.NOTES_SCRYPT = {
+        'work_factor': 2 ** 10, 'block_size': 8, 'parallelism': 1
+    }
+    password_pool.shutdown()
+    yield
+    password_pool.shutdown()
+
+
+@pytest.fixture
+def user(django_user_model):
+    """Фикстура для пользователя с паролем в старом формате PBKDF2."""
+    return django_user_model.objects.create(
+        username='Читатель',
+        password=make_password(PASSWORD, hasher='pbkdf2_sha256'),
+    )
+
+
+def login(client, password=PASSWORD, url=LOGIN_URL):
+    return client.post(
+        url, data={'username': 'Читатель', 'password': password}
+    )
+
+
+def stored_hash(user):
+    return get_user_model().objects.get(pk=user.pk).password
+
+
+def test_new_passwords_use_configured_scrypt():
+    """Тест параметров scrypt из NOTES_SCRYPT."""
+    encoded = make_password(PASSWORD)
+    assert encoded.startswith('scrypt$')
+    assert identify_hasher(encoded).decode(encoded)['work_factor'] == 2 ** 10
+
+
+def test_login_upgrades_old_hash(client, user):
+    """Тест перехеширования пароля PBKDF2 в scrypt при входе."""
+    assert login(client).status_code == HTTPStatus.FOUND
+    assert stored_hash(user).startswith('scrypt$')
+    client.logout()
+    assert login(client).status_code == HTTPStatus.FOUND
+
+
+def test_login_upgrades_scrypt_parameters(settings, client, user):
+    """Тест перехеширования после смены параметров scrypt."""
+    login(client)
+    client.logout()
+    settings.NOTES_SCRYPT = {**settings.NOTES_SCRYPT, 'work_factor': 2 ** 11}
+    login(client)
+    encoded = stored_hash(user)
+    assert identify_hasher(encoded).decode(encoded)['work_factor'] == 2 ** 11
+
+
+@pytest.mark.parametrize('password', ('wrong', PASSWORD.upper()))
+def test_wrong_password_is_checked_once(
+    monkeypatch, client, user, password
+):
+    """Тест: неверный пароль не перехешируется и проверяется один раз."""
+    calls = []
+    verify = PBKDF2PasswordHasher.verify
+
+    def counting_verify(self, *args):
+        calls.append(threading.current_thread().name)
+        return verify(self, *args)
+
+    monkeypatch.setattr(PBKDF2PasswordHasher, 'verify', counting_verify)
+    old_hash = stored_hash(user)
+    assert login(client, password).status_code == HTTPStatus.OK
+    assert stored_hash(user) == old_hash
+    assert len(calls) == 1
+    assert calls[0].startswith('notes-login')
+
+
+@pytest.mark.django_db
+def test_unknown_user_is_hashed_in_pool(monkeypatch, client):
+    """Тест: вход несуществующего пользователя тоже тратит хеширование."""
+    calls = []
+    monkeypatch.setattr(
+        auth, 'make_password',
+        lambda password: calls.append(threading.current_thread().name)
+    )
+    assert login(client).status_code == HTTPStatus.OK
+    assert len(calls) == 1
+    assert calls[0].startswith('notes-login')
+
+
+@pytest.mark.parametrize(
+    'url',
+    (
+        LOGIN_URL,
+        pytest.param('/admin/login/', marks=pytest.mark.skipif(
+            not settings.NOTES_ADMIN, reason='админка отключена'
+        )),
+    )
+)
+def test_full_pool_answers_503(settings, client, user, url):
+    """Тест ответа 503, если все потоки пула заняты и очередь полна.
+
+    Так отвечает любой вход, который проверяет пароль, в том числе в
+    админку.
+    """
+    settings.NOTES_LOGIN_WORKERS = 1
+    settings.NOTES_LOGIN_QUEUE = 0
+    settings.NOTES_LOGIN_WAIT = 0
+    release = threading.Event()
+    started = threading.Event()
+
+    def busy():
+        started.set()
+        release.wait(5)
+
+    blocker = threading.Thread(target=password_pool.run, args=(busy,))
+    blocker.start()
+    started.wait(5)
+    try:
+        response = login(client, url=url)
+    finally:
+        release.set()
+        blocker.join()
+    assert response.status_code == HTTPStatus.SERVICE_UNAVAILABLE
+    assert response['Retry-After'] == '1'
+    assert login(client).status_code == HTTPStatus.FOUND
@@ -0,0 +1,107 @@
+import logging
+import re
+from http import HTTPStatus
+from io import StringIO
+
+import pytest
+from asgiref.sync import async_to_sync, iscoroutinefunction
+
+from django.core.handlers.asgi import ASGIHandler
+from django.core.management import call_command
+from django.urls import reverse
+
+from notes import metrics
+from notes.middleware import (
+    PerformanceMiddleware, QueryBudgetExceeded, ReplicaPinMiddleware
+)
+from notes.api import NoteApiList
+from notes.views import NoteDetail
+
+
+@pytest.fixture(autouse=True)
+def clean_metrics():
+    """Фикстура для очистки замеров между тестами."""
+    metrics.reset()
+
+
+def test_server_timing_header(author_client, note):
+    """Тест заголовка Server-Timing с временем и числом запросов."""
+    response = author_client.get(reverse('notes:detail', args=(note.slug,)))
+    assert re.fullmatch(
+        r'app;dur=[\d.]+, db;dur=[\d.]+;desc="\d+ queries"',
+        response['Server-Timing']
+    )
+
+
+def test_metrics_are_recorded_by_url_name(author_client, note):
+    """Тест сохранения замеров по имени URL."""
+    author_client.get(reverse('notes:list'))
+    author_client.get(reverse('notes:detail', args=(note.slug,)))
+    views = [sample['view'] for sample in metrics.samples()]
+    assert views == ['notes:list', 'notes:detail']
+    assert all(sample['queries'] > 0 for sample in metrics.samples())
+
+
+def test_query_budget_is_enforced(author_client, note, monkeypatch):
+    """Тест исключения при превышении бюджета запросов."""
+    monkeypatch.setattr(NoteDetail, 'query_budget', 1)
+    with pytest.raises(QueryBudgetExceeded):
+        author_client.get(reverse('notes:detail', args=(note.slug,)))
+
+
+def test_query_budget_per_method(author_client, note, monkeypatch):
+    """Тест бюджета запросов по HTTP-методу: чтение дешевле записи."""
+    monkeypatch.setattr(NoteApiList, 'query_budget', {'GET': 1})
+    with pytest.raises(QueryBudgetExceeded, match='notes:api_list GET'):
+        author_client.get(reverse('notes:api_list'))
+    monkeypatch.setattr(NoteApiList, 'query_budget', {'POST': 1})
+    assert author_client.get(reverse('notes:api_list')).status_code == (
+        HTTPStatus.OK
+    )
+
+
+def test_perf_report_command(author_client, note, settings, tmp_path):
+    """Тест отчёта по перцентилям из журнала замеров."""
+    settings.NOTES_PERF_LOG = tmp_path / 'perf.jsonl'
+    for _ in range(3):
+        author_client.get(reverse('notes:list'))
+    out = StringIO()
+    call_command('perf_report', path=settings.NOTES_PERF_LOG, stdout=out)
+    assert re.search(r'^notes:list\s+3\s', out.getvalue(), re.MULTILINE)
+
+
+@pytest.mark.parametrize(
+    'middleware', (PerformanceMiddleware, ReplicaPinMiddleware)
+)
+def test_middleware_is_hybrid(middleware):
+    """Тест middleware, которое не требует адаптации sync/async."""
+    async def get_response(request):
+        pass
+
+    assert iscoroutinefunction(middleware(get_response))
+    assert not iscoroutinefunction(middleware(lambda request: None))
+
+
+def test_asgi_stack_is_not_adapted(settings, caplog):
+    """Тест асинхронной цепочки middleware без обёрток async_to_sync."""
+    settings.DEBUG = True
+    handler = ASGIHandler()
+    with caplog.at_level(logging.DEBUG, logger='django.request'):
+        handler.load_middleware(is_async=True)
+    adapted = [
+        record.getMessage() for record in caplog.records
+        if 'notes.middleware' in record.getMessage()
+    ]
+    assert adapted == []
+
+
+def test_queries_counted_under_asgi(async_views, async_author_client, note):
+    """Тест подсчёта запросов async-представления из потока ORM."""
+    response = async_to_sync(async_author_client.get)(
+        reverse('notes:detail', args=(note.slug,))
+    )
+    queries = int(re.search(
+        r'desc="(\d+) queries"', response['Server-Timing']
+    )[1])
+    assert queries > 0
+    assert metrics.samples()[-1]['queries'] == queries
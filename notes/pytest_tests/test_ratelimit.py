@@ -0,0 +1,199 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from itertools import count
+
+import pytest
+
+from django.urls import reverse
+
+from notes import ratelimit
+from notes.models import Note
+
+ADD_URL = reverse('notes:add')
+SIGNUP_URL = reverse('users:signup')
+BURST = 3
+SLUGS = (f'burst-{index}' for index in count())
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Фикстура с управляемыми часами ограничителя, в секундах."""
+    now = [1_000_000.0]
+    monkeypatch.setattr(
+        ratelimit.time, 'time_ns', lambda: int(now[0] * 1e9)
+    )
+    return now
+
+
+@pytest.fixture(autouse=True)
+def limits(settings):
+    """Фикстура с маленькими лимитами: 1 запрос в 10 секунд, 3 подряд."""
+    settings.NOTES_RATE_LIMITS = {
+        scope: {'rate': 1, 'period': 10, 'burst': BURST}
+        for scope in ('notes-write', 'signup')
+    }
+
+
+def post_notes(client, number, **extra):
+    """Отправляет number форм заметок, возвращает коды ответов."""
+    return [
+        client.post(ADD_URL, data={
+            'title': 'Заметка', 'text': 'Текст', 'slug': next(SLUGS)
+        }, **extra).status_code
+        for _ in range(number)
+    ]
+
+
+def test_take_token_retry_after(clock):
+    """Тест паузы до следующего жетона после исчерпания корзины."""
+    key = 'notes:rate:test:client'
+    assert [
+        ratelimit.take_token(key, 1, 10, BURST) for _ in range(BURST)
+    ] == [0] * BURST
+    assert ratelimit.take_token(key, 1, 10, BURST) == 10
+    clock[0] += 4
+    assert ratelimit.take_token(key, 1, 10, BURST) == 6
+    clock[0] += 6
+    assert ratelimit.take_token(key, 1, 10, BURST) == 0
+    assert ratelimit.take_token(key, 1, 10, BURST) == 10
+    clock[0] += 10 * BURST
+    assert [
+        ratelimit.take_token(key, 1, 10, BURST) for _ in range(BURST)
+    ] == [0] * BURST
+
+
+@pytest.mark.parametrize('idle', (False, True))
+def test_concurrent_burst_gets_exactly_burst_tokens(
+    clock, monkeypatch, idle
+):
+    """Тест: из одновременных запросов проходят ровно burst.
+
+    В том числе когда корзина простаивала и её TAT в прошлом.
+    """
+    key = 'notes:rate:test:c'
+    cache = ratelimit.get_cache()
+    if idle:
+        cache.set(key, int(clock[0] * 1000) - 600_000)
+
+    class SlowCache:
+        """Кэш, уступающий поток после incr, чтобы запросы пересекались."""
+
+        def __getattr__(self, name):
+            return getattr(cache, name)
+
+        def incr(self, *args):
+            value = cache.incr(*args)
+            time.sleep(0.001)
+            return value
+
+    monkeypatch.setattr(ratelimit, 'get_cache', SlowCache)
+    with ThreadPoolExecutor(8) as pool:
+        waits = list(pool.map(
+            lambda _: ratelimit.take_token(key, 1, 10, 5), range(40)
+        ))
+    assert waits.count(0) == 5
+
+
+def test_idle_bucket_that_cannot_be_reset_refuses(clock, monkeypatch):
+    """Тест отказа, если простаивавшую корзину так и не сдвинули."""
+    key = 'notes:rate:test:stuck'
+    cache = ratelimit.get_cache()
+    stale = int(clock[0] * 1000) - 600_000
+    cache.set(key, stale)
+    monkeypatch.setattr(ratelimit, 'reset_idle', lambda *args: False)
+    assert ratelimit.take_token(key, 1, 10, BURST) == 10
+    assert cache.get(key) == stale
+
+
+def test_burst_of_creates_is_throttled(author_client, clock):
+    """Тест ответа 429 с Retry-After на всплеск создания заметок."""
+    assert post_notes(author_client, BURST) == [HTTPStatus.FOUND] * BURST
+    response = author_client.post(ADD_URL, data={'title': 'Лишняя'})
+    assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS
+    assert response['Retry-After'] == '10'
+    assert Note.objects.count() == BURST
+    clock[0] += 10
+    assert post_notes(author_client, 1) == [HTTPStatus.FOUND]
+
+
+def test_reads_are_not_limited(author_client, clock):
+    """Тест: открытие формы не тратит жетоны."""
+    for _ in range(BURST * 2):
+        assert author_client.get(ADD_URL).status_code == HTTPStatus.OK
+    assert post_notes(author_client, BURST) == [HTTPStatus.FOUND] * BURST
+
+
+@pytest.mark.parametrize(
+    'name, args',
+    (
+        ('notes:edit', ()),
+        ('notes:delete', ()),
+        ('notes:revision', (1,)),
+    )
+)
+def test_edit_and_delete_share_write_bucket(
+    author_client, note, clock, name, args
+):
+    """Тест: правка, удаление и возврат к ревизии тратят жетоны создания."""
+    post_notes(author_client, BURST)
+    response = author_client.post(reverse(name, args=(note.slug, *args)))
+    assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS
+
+
+def test_user_is_limited_from_any_ip(author_client, clock):
+    """Тест корзины пользователя при смене IP."""
+    codes = [
+        post_notes(author_client, 1, REMOTE_ADDR=f'10.0.0.{index}')[0]
+        for index in range(BURST + 1)
+    ]
+    assert codes[-1] == HTTPStatus.TOO_MANY_REQUESTS
+
+
+def test_other_user_keeps_own_bucket(
+    author_client, not_author_client, clock
+):
+    """Тест: всплеск одного пользователя не блокирует другого."""
+    post_notes(author_client, BURST + 1, REMOTE_ADDR='10.0.0.1')
+    assert post_notes(not_author_client, 1, REMOTE_ADDR='10.0.0.2') == [
+        HTTPStatus.FOUND
+    ]
+
+
+def test_refused_user_does_not_charge_ip(
+    author_client, not_author_client, clock
+):
+    """Тест: отказ по корзине пользователя не тратит жетон IP."""
+    post_notes(author_client, BURST, REMOTE_ADDR='10.0.0.1')
+    assert post_notes(author_client, 1, REMOTE_ADDR='10.0.0.2') == [
+        HTTPStatus.TOO_MANY_REQUESTS
+    ]
+    assert post_notes(not_author_client, BURST, REMOTE_ADDR='10.0.0.2') == (
+        [HTTPStatus.FOUND] * BURST
+    )
+
+
+@pytest.mark.django_db
+def test_signup_is_limited_by_ip(client, clock):
+    """Тест ограничения регистраций с одного IP."""
+    codes = [
+        client.post(SIGNUP_URL, data={
+            'username': f'user{index}',
+            'password1': 'Tr1cky-passw0rd',
+            'password2': 'Tr1cky-passw0rd',
+        }).status_code
+        for index in range(BURST + 1)
+    ]
+    assert codes == [HTTPStatus.FOUND] * BURST + [
+        HTTPStatus.TOO_MANY_REQUESTS
+    ]
+    response = client.post(SIGNUP_URL, REMOTE_ADDR='10.0.0.9')
+    assert response.status_code == HTTPStatus.OK
+
+
+def test_limits_can_be_disabled(settings, author_client, clock):
+    """Тест отключения ограничителя настройкой."""
+    settings.NOTES_RATE_LIMIT_ENABLED = False
+    assert post_notes(author_client, BURST * 2) == (
+        [HTTPStatus.FOUND] * BURST * 2
+    )
@@ -0,0 +1,105 @@
+from http import HTTPStatus
+
+import pytest
+from pytest_django.asserts import assertRedirects
+from pytest_lazy_fixtures import lf
+
+from django.urls import reverse
+
+from notes.models import Note, NoteRevision
+from notes.revisions import apply_delta, encode_delta
+
+VERSIONS = [
+    'первая строка\nвторая строка\nтретья строка\n',
+    'первая строка\nвторая, изменённая\nтретья строка\n',
+    'новое начало\nпервая строка\nвторая, изменённая\nтретья строка',
+    '',
+    'строка с переводом\r\nи ещё одна\r\n',
+    'строка с переводом\r\nи ещё одна\r\nи последняя',
+    'совсем другой текст',
+]
+
+
+@pytest.fixture
+def edited_note(settings, note):
+    """Фикстура для заметки, прошедшей через все версии VERSIONS."""
+    settings.NOTES_REVISION_SNAPSHOT_EVERY = 3
+    for text in VERSIONS:
+        note.text = text
+        note.save()
+    return note
+
+
+@pytest.mark.parametrize('old', VERSIONS)
+@pytest.mark.parametrize('new', VERSIONS)
+def test_delta_round_trip(old, new):
+    """Тест восстановления текста по разнице."""
+    assert apply_delta(old, encode_delta(old, new)) == new
+
+
+def test_snapshot_every_k_revisions(edited_note):
+    """Тест чередования снимков и разниц."""
+    revisions = NoteRevision.objects.filter(note=edited_note).order_by(
+        'number'
+    )
+    assert [revision.is_snapshot for revision in revisions] == [
+        True, False, False, True, False, False, True, False
+    ]
+
+
+@pytest.mark.parametrize('number', range(2, len(VERSIONS) + 2))
+def test_restore_any_revision(
+    edited_note, number, django_assert_num_queries
+):
+    """Тест восстановления любой ревизии одним запросом."""
+    with django_assert_num_queries(1):
+        revision = NoteRevision.objects.restore(edited_note.pk, number)
+    assert revision.text == VERSIONS[number - 2]
+
+
+def test_unchanged_save_adds_no_revision(note):
+    """Тест сохранения без изменений без новой ревизии."""
+    note.save()
+    assert NoteRevision.objects.filter(note=note).count() == 1
+
+
+def test_revision_list_is_scoped_to_author(
+    author_client, not_author_client, edited_note
+):
+    """Тест истории заметки только для её автора."""
+    url = reverse('notes:revisions', args=(edited_note.slug,))
+    response = author_client.get(url)
+    assert len(response.context['revisions']) == len(VERSIONS) + 1
+    response = not_author_client.get(url)
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+def test_author_can_restore_revision(author_client, edited_note):
+    """Тест возврата к ревизии новой ревизией."""
+    url = reverse('notes:revision', args=(edited_note.slug, 3))
+    assert author_client.get(url).context['revision'].text == VERSIONS[1]
+    response = author_client.post(url)
+    assertRedirects(
+        response, reverse('notes:detail', args=(edited_note.slug,))
+    )
+    assert Note.objects.get(pk=edited_note.pk).text == VERSIONS[1]
+    assert NoteRevision.objects.filter(note=edited_note).count() == (
+        len(VERSIONS) + 2
+    )
+
+
+@pytest.mark.parametrize(
+    'parametrized_client, number',
+    (
+        (lf('not_author_client'), 1),
+        (lf('author_client'), 100),
+    )
+)
+def test_missing_revision_is_not_found(
+    edited_note, parametrized_client, number
+):
+    """Тест 404 для чужой и несуществующей ревизии."""
+    client = parametrized_client
+    url = reverse('notes:revision', args=(edited_note.slug, number))
+    assert client.get(url).status_code == HTTPStatus.NOT_FOUND
+    assert client.post(url).status_code == HTTPStatus.NOT_FOUND
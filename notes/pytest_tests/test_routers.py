@@ -0,0 +1,138 @@
+import sqlite3
+from http import HTTPStatus
+
+import pytest
+from asgiref.sync import async_to_sync
+
+from django.db import connections, transaction
+from django.urls import reverse
+
+from notes.middleware import ReplicaPinMiddleware
+from notes.models import Note, NoteRevision
+from notes.tasks import record_revision
+from notes.routers import (
+    PrimaryReplicaRouter, pinned_to_primary, wrote_to_primary
+)
+
+REPLICA = 'replica'
+
+
+@pytest.fixture
+def replica(tmp_path, settings):
+    """Фикстура для реплики - копии тестовой базы, отстающей от неё.
+
+    Возвращает функцию, которая догоняет реплику до основной базы.
+    """
+    path = tmp_path / 'replica.sqlite3'
+    primary = connections['default']
+
+    def sync():
+        connections[REPLICA].close()
+        primary.ensure_connection()
+        target = sqlite3.connect(path)
+        primary.connection.backup(target)
+        target.close()
+
+    connections[REPLICA] = primary.__class__(
+        {**primary.settings_dict, 'NAME': str(path)}, REPLICA
+    )
+    settings.DATABASE_REPLICAS = [REPLICA]
+    sync()
+    yield sync
+    connections[REPLICA].close()
+    del connections[REPLICA]
+
+
+@pytest.fixture
+def router():
+    """Фикстура для создания роутера вне запроса без записей."""
+    token = wrote_to_primary.set(False)
+    yield PrimaryReplicaRouter()
+    wrote_to_primary.reset(token)
+
+
+def test_reads_go_to_primary_without_replicas(router):
+    """Тест чтения из основной базы, если реплик нет."""
+    assert router.db_for_read(Note) == 'default'
+
+
+@pytest.mark.django_db(transaction=True)
+def test_reads_go_to_replica(router, replica):
+    """Тест чтения с реплики и записи в основную базу."""
+    assert router.db_for_read(Note) == REPLICA
+    token = pinned_to_primary.set(True)
+    try:
+        assert router.db_for_read(Note) == 'default'
+    finally:
+        pinned_to_primary.reset(token)
+    with transaction.atomic():
+        assert router.db_for_read(Note) == 'default'
+    router.db_for_write(Note)
+    assert router.db_for_read(Note) == 'default'
+
+
+@pytest.mark.django_db(transaction=True)
+def test_migrations_skip_replicas(router, replica):
+    """Тест запрета миграций на репликах."""
+    assert router.allow_migrate('default', 'notes')
+    assert not router.allow_migrate(REPLICA, 'notes')
+
+
+@pytest.mark.django_db(transaction=True)
+def test_lagging_replica_serves_detail(author, author_client, replica):
+    """Тест чтения заметки с отстающей реплики."""
+    note = Note.objects.create(title='Новая', text='Текст', author=author)
+    assert not Note.objects.using(REPLICA).filter(pk=note.pk).exists()
+    url = reverse('notes:detail', args=(note.slug,))
+    response = author_client.get(url)
+    assert response.status_code == HTTPStatus.NOT_FOUND
+    assert ReplicaPinMiddleware.cookie_name not in response.cookies
+    replica()
+    assert author_client.get(url).status_code == HTTPStatus.OK
+
+
+@pytest.mark.django_db(transaction=True)
+def test_write_pins_reader_to_primary(
+    author, author_client, replica, form_data
+):
+    """Тест чтения своих записей сразу после создания заметки."""
+    response = author_client.post(reverse('notes:add'), data=form_data)
+    assert response.status_code == HTTPStatus.FOUND
+    assert ReplicaPinMiddleware.cookie_name in response.cookies
+    assert Note.objects.using(REPLICA).count() == 0
+    response = author_client.get(
+        reverse('notes:detail', args=(form_data['slug'],))
+    )
+    assert response.status_code == HTTPStatus.OK
+    assert response.context['note'].title == form_data['title']
+
+
+@pytest.mark.django_db(transaction=True)
+def test_write_pins_reader_under_asgi(
+    async_views, author, async_author_client, replica, form_data
+):
+    """Тест закрепления за основной базой через ASGI-обработчик."""
+    response = async_to_sync(async_author_client.post)(
+        reverse('notes:add'), data=form_data
+    )
+    assert response.status_code == HTTPStatus.FOUND
+    assert ReplicaPinMiddleware.cookie_name in response.cookies
+    url = reverse('notes:detail', args=(form_data['slug'],))
+    response = async_to_sync(async_author_client.get)(url)
+    assert response.status_code == HTTPStatus.OK
+    async_author_client.cookies.pop(ReplicaPinMiddleware.cookie_name)
+    response = async_to_sync(async_author_client.get)(url)
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+@pytest.mark.django_db(transaction=True)
+def test_revision_task_reads_primary(router, author, replica):
+    """Тест записи ревизии по основной базе, а не по отстающей реплике."""
+    note = Note.objects.create(title='Новая', text='Текст', author=author)
+    replica()
+    Note.objects.filter(pk=note.pk).update(text='Текст после правки')
+    NoteRevision.objects.all().delete()
+    record_revision(note.pk)
+    assert NoteRevision.objects.restore(note.pk, 1).text == (
+        'Текст после правки'
+    )
@@ -46,7 +46,9 @@ def test_pages_availability_for_different_users(
         ('notes:delete', lf('slug_for_args')),
         ('notes:add', None),
         ('notes:success', None),
-        ('notes:list', None)
+        ('notes:list', None),
+        ('notes:search', None),
+        ('notes:export', None)
     )
 )
 def test_redirects(client, name, args):
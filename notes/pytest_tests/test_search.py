@@ -0,0 +1,112 @@
+import pytest
+
+from django.core.management import call_command
+from django.db import connection
+from django.urls import reverse
+
+from notes.bulk import create_notes, delete_batch, update_batch
+from notes.models import Note
+from notes.search import SEARCH_TABLE, build_match_query
+
+
+def search(client, query):
+    """Возвращает список заметок, найденных по запросу."""
+    response = client.get(reverse('notes:search'), {'q': query})
+    return list(response.context['object_list'])
+
+
+@pytest.mark.parametrize(
+    'query, found',
+    (
+        ('текст', True),
+        ('ЗАГОЛОВ', True),
+        ('отсутствует', False),
+        ('"', False),
+    )
+)
+def test_search_finds_own_notes(author_client, note, query, found):
+    """Тест поиска по заголовку и тексту заметки."""
+    assert (note in search(author_client, query)) is found
+
+
+def test_search_is_limited_to_author(not_author_client, note):
+    """Тест отсутствия чужих заметок в результатах поиска."""
+    assert search(not_author_client, 'текст') == []
+
+
+def test_search_index_follows_updates_and_deletes(author_client, note):
+    """Тест обновления индекса при изменении и удалении заметки."""
+    note.text = 'Совсем другое содержание'
+    note.save()
+    assert search(author_client, 'текст') == []
+    assert search(author_client, 'содержание') == [note]
+    note.delete()
+    assert search(author_client, 'содержание') == []
+
+
+def test_search_ranks_title_matches_first(author_client, author, note):
+    """Тест ранжирования: совпадение в заголовке важнее."""
+    titled = Note.objects.create(
+        title='Текст в заголовке', text='Другое', author=author
+    )
+    assert search(author_client, 'текст') == [titled, note]
+
+
+def test_rebuild_search_index(author_client, note):
+    """Тест перестроения индекса командой manage.py."""
+    call_command('rebuild_search_index', batch_size=1)
+    assert search(author_client, 'текст') == [note]
+
+
+def check_search_index():
+    """Проверка целостности индекса FTS5."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}) "
+            "VALUES ('integrity-check')"
+        )
+
+
+def test_search_finds_compressed_notes(settings, author_client, author):
+    """Тест поиска по тексту сжатых заметок при любых их изменениях."""
+    settings.NOTES_COMPRESS_TEXT_OVER = 30
+    note = Note.objects.create(
+        title='Сжатая', text='Длинный текст про ежиков', author=author
+    )
+    assert note.compressed
+    assert search(author_client, 'ежиков') == [note]
+    note.text = 'Длинный текст про кроликов'
+    note.save()
+    assert search(author_client, 'ежиков') == []
+    assert search(author_client, 'кроликов') == [note]
+    note.text = 'Коротко'
+    note.save()
+    assert not note.compressed
+    assert search(author_client, 'коротко') == [note]
+    (bulk,), _ = create_notes([
+        Note(title='Пакет', text='Длинный текст про зайцев', author=author)
+    ])
+    assert search(author_client, 'зайцев') == [bulk]
+    update_batch(
+        Note.objects.filter(author=author), author, 'id', [note.pk, bulk.pk],
+        {'text': 'Длинный текст про бобров'}
+    )
+    assert search(author_client, 'зайцев') == []
+    assert set(search(author_client, 'бобров')) == {note, bulk}
+    update_batch(
+        Note.objects.filter(author=author), author, 'id', [bulk.pk],
+        {'title': 'Переименована'}
+    )
+    assert search(author_client, 'переименована бобров') == [bulk]
+    call_command('rebuild_search_index', batch_size=1)
+    assert set(search(author_client, 'бобров')) == {note, bulk}
+    check_search_index()
+    note.delete()
+    delete_batch(Note.objects.filter(author=author), author, 'id', [bulk.pk])
+    assert search(author_client, 'бобров') == []
+    check_search_index()
+
+
+def test_build_match_query_quotes_terms():
+    """Тест экранирования пользовательского ввода для MATCH."""
+    assert build_match_query('foo "bar" OR') == '"foo"* "bar"* "OR"*'
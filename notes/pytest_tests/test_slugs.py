@@ -0,0 +1,65 @@
+from concurrent.futures import ThreadPoolExecutor
+from threading import Barrier
+
+import pytest
+from pytest_django.asserts import assertRedirects
+from pytils.translit import slugify
+
+from django.db import connection
+from django.urls import reverse
+
+from notes.models import Note
+from notes.slugs import next_free_slug
+
+PARALLEL_CREATES = 8
+
+
+@pytest.mark.parametrize(
+    'taken, expected',
+    (
+        (set(), 'slug'),
+        ({'slug'}, 'slug-1'),
+        ({'slug', 'slug-1', 'slug-7', 'slug-x', 'slugs-9'}, 'slug-8'),
+    )
+)
+def test_next_free_slug(taken, expected):
+    """Тест выбора следующего свободного суффикса."""
+    assert next_free_slug('slug', taken, 100) == expected
+
+
+def test_long_slug_suffix_fits_max_length():
+    """Тест усечения длинного slug перед добавлением суффикса."""
+    base = 'a' * 100
+    slug = next_free_slug(base, {base}, 100)
+    assert len(slug) <= 100
+    assert slug.endswith('-1')
+
+
+def test_empty_slug_gets_free_suffix(author_client, note, form_data):
+    """Тест подбора свободного slug вместо ошибки формы."""
+    form_data.pop('slug')
+    form_data['title'] = note.title
+    Note.objects.filter(pk=note.pk).update(slug=slugify(note.title))
+    response = author_client.post(reverse('notes:add'), data=form_data)
+    assertRedirects(response, reverse('notes:success'))
+    assert Note.objects.latest('id').slug == f'{slugify(note.title)}-1'
+
+
+@pytest.mark.django_db(transaction=True)
+def test_parallel_creates_get_distinct_slugs(author):
+    """Тест одновременного создания заметок с одинаковым заголовком."""
+    barrier = Barrier(PARALLEL_CREATES)
+
+    def create(index):
+        barrier.wait()
+        try:
+            return Note.objects.create(
+                title='Одинаковый заголовок', text=str(index), author=author
+            ).slug
+        finally:
+            connection.close()
+
+    with ThreadPoolExecutor(PARALLEL_CREATES) as executor:
+        slugs = list(executor.map(create, range(PARALLEL_CREATES)))
+    assert len(set(slugs)) == PARALLEL_CREATES
+    assert Note.objects.count() == PARALLEL_CREATES
@@ -0,0 +1,170 @@
+from datetime import timedelta
+from http import HTTPStatus
+
+import pytest
+
+from django.db import connection
+from django.urls import reverse
+from django.utils import timezone
+
+from notes.listing import filter_notes_list, title_prefix_range
+from notes.models import Note
+from notes.pagination import SORTS, CursorPaginator, encode_cursor
+from notes.views import NotesList
+
+LIST_URL = reverse('notes:list')
+TITLES = ['Бета', 'альфа', 'Альфа', 'Гамма', 'Альфа', 'Бета-2', 'Абв']
+
+
+@pytest.fixture
+def notes_to_sort(author, monkeypatch):
+    """Фикстура для заметок с повторами заголовков и разными датами.
+
+    Страница списка - две заметки, чтобы проверить курсоры.
+    """
+    monkeypatch.setattr(NotesList, 'paginate_by', 2)
+    notes = Note.objects.bulk_create(
+        Note(title=title, text='Текст', slug=f'sort-{index}', author=author)
+        for index, title in enumerate(TITLES)
+    )
+    start = timezone.now()
+    for index, note in enumerate(notes):
+        # Созданы по порядку, а изменены в обратном, с одинаковым временем
+        # у пар, чтобы курсор разбирал совпадения по id.
+        Note.objects.filter(pk=note.pk).update(
+            created_at=start + timedelta(minutes=index),
+            updated_at=start - timedelta(minutes=index // 2),
+        )
+    return Note.objects.filter(author=author)
+
+
+def walk(client, query):
+    """Проходит весь список по курсорам, возвращает slug заметок."""
+    slugs, params = [], dict(query)
+    while True:
+        page = client.get(LIST_URL, data=params).context['page_obj']
+        slugs += [note.slug for note in page]
+        if not page.has_next():
+            return slugs
+        params['after'] = page.next_cursor
+
+
+@pytest.mark.parametrize('sort', SORTS)
+def test_sorted_pages(author_client, notes_to_sort, sort):
+    """Тест порядка всего списка, собранного по страницам."""
+    expected = list(
+        notes_to_sort.order_by(*SORTS[sort]).values_list('slug', flat=True)
+    )
+    assert walk(author_client, {'sort': sort}) == expected
+
+
+@pytest.mark.parametrize(
+    'prefix, expected',
+    (
+        ('Альфа', {'Альфа'}),
+        ('Бета', {'Бета', 'Бета-2'}),
+        ('А', {'Альфа', 'Абв'}),
+        ('альф', {'альфа'}),
+        ('Я', set()),
+    )
+)
+def test_title_prefix(author_client, notes_to_sort, prefix, expected):
+    """Тест поиска по началу заголовка с учётом регистра."""
+    slugs = walk(author_client, {'q_title': prefix, 'sort': '-title'})
+    titles = set(
+        Note.objects.filter(slug__in=slugs).values_list('title', flat=True)
+    )
+    assert titles == expected
+
+
+@pytest.mark.parametrize(
+    'prefix, expected',
+    (
+        ('ab', ('ab', 'ac')),
+        ('a\U0010ffff', ('a\U0010ffff', 'b')),
+        ('\U0010ffff\U0010ffff', ('\U0010ffff\U0010ffff', None)),
+        ('a\ud7ff', ('a\ud7ff', 'a\ue000')),
+    )
+)
+def test_title_prefix_range(prefix, expected):
+    """Тест верхней границы для последних символов Юникода."""
+    assert title_prefix_range(prefix) == expected
+
+
+@pytest.mark.parametrize(
+    'prefix, expected',
+    (
+        ('a\U0010ffff', {'a\U0010ffff', 'a\U0010ffffz'}),
+        ('\ud7ff', {'\ud7ffz'}),
+        ('\U0010ffff', {'\U0010ffff'}),
+    )
+)
+def test_title_prefix_at_unicode_edge(author, author_client, prefix, expected):
+    """Тест поиска по началу заголовка с крайними символами Юникода."""
+    titles = (
+        'a\U0010ffff', 'a\U0010ffffz', 'b', '\ud7ffz', '\ue000',
+        '\U0010ffff',
+    )
+    Note.objects.bulk_create(
+        Note(title=title, text='Текст', slug=f'edge-{index}', author=author)
+        for index, title in enumerate(titles)
+    )
+    response = author_client.get(LIST_URL, data={'q_title': prefix})
+    assert response.status_code == HTTPStatus.OK
+    assert {
+        note.title for note in response.context['page_obj']
+    } == expected
+
+
+def test_cursor_of_other_sort_is_rejected(author, author_client):
+    """Тест: курсор одной сортировки не подходит для другой."""
+    cursor = encode_cursor(author.pk, 1, 'title', 'Альфа')
+    response = author_client.get(
+        LIST_URL, data={'sort': '-title', 'after': cursor}
+    )
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+def test_broken_cursor_value_is_rejected(author, author_client):
+    """Тест: курсор с испорченной датой даёт 404, а не ошибку."""
+    cursor = encode_cursor(author.pk, 1, 'created', 'не дата')
+    response = author_client.get(
+        LIST_URL, data={'sort': 'created', 'after': cursor}
+    )
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+def query_plan(queryset):
+    """Строки EXPLAIN QUERY PLAN для выборки."""
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+        return [row[-1] for row in cursor.fetchall()]
+
+
+@pytest.mark.parametrize('sort', SORTS)
+@pytest.mark.parametrize('q_title', ('', 'Аль'))
+@pytest.mark.parametrize('after_cursor', (False, True))
+def test_list_query_uses_index(
+    author, notes_to_sort, sort, q_title, after_cursor
+):
+    """Тест: каждая комбинация фильтров идёт по индексу без полного скана.
+
+    Без поиска по заголовку порядок тоже берётся из индекса, без
+    сортировки во временном B-дереве.
+    """
+    paginator = CursorPaginator(2, author.pk, sort)
+    cursor = None
+    if after_cursor:
+        first = paginator.page(paginator.window(notes_to_sort.all()))
+        cursor = first.next_cursor
+    queryset = filter_notes_list(
+        Note.objects.filter(author=author), author.pk, q_title=q_title
+    )
+    plan = query_plan(paginator.window(queryset, cursor))
+    note_steps = [step for step in plan if 'notes_note' in step]
+    assert note_steps
+    assert all(step.startswith('SEARCH') for step in note_steps), plan
+    assert all('INDEX' in step for step in note_steps), plan
+    if not q_title or sort.lstrip('-') == 'title':
+        assert not any('TEMP B-TREE' in step for step in plan), plan
@@ -0,0 +1,79 @@
+import os
+import sqlite3
+import subprocess
+import sys
+
+import pytest
+
+from django.db import connection
+
+from yanote.sqlite import PRAGMAS, init_command
+
+
+def connect(path, tuned):
+    """Соединение с настройками NOTES_SQLITE_TUNING или по умолчанию."""
+    database = sqlite3.connect(path, timeout=0.1, isolation_level=None)
+    if tuned:
+        database.executescript(init_command())
+    return database
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    'pragma, expected',
+    (
+        ('journal_mode', 'wal'),
+        ('synchronous', 1),
+        ('busy_timeout', PRAGMAS['busy_timeout']),
+        ('cache_size', PRAGMAS['cache_size']),
+    )
+)
+def test_connection_pragmas(pragma, expected):
+    """Тест применения PRAGMA к новому соединению."""
+    with connection.cursor() as cursor:
+        cursor.execute(f'PRAGMA {pragma}')
+        assert cursor.fetchone()[0] == expected
+
+
+@pytest.mark.parametrize('tuned', (False, True))
+def test_open_read_does_not_block_commit(tmp_path, tuned):
+    """Тест записи при открытой транзакции чтения с настройками и без.
+
+    В журнале отката читатель держит блокировку, и коммит писателя
+    падает с 'database is locked'; в WAL читатель видит свой снимок,
+    а писатель коммитит не дожидаясь.
+    """
+    path = tmp_path / 'db.sqlite3'
+    connect(path, tuned).execute('CREATE TABLE note (text TEXT)')
+    reader, writer = connect(path, tuned), connect(path, tuned)
+    reader.execute('BEGIN')
+    assert reader.execute('SELECT count(*) FROM note').fetchone() == (0,)
+    writer.execute('BEGIN IMMEDIATE')
+    writer.execute("INSERT INTO note VALUES ('Текст')")
+    if not tuned:
+        with pytest.raises(sqlite3.OperationalError, match='locked'):
+            writer.execute('COMMIT')
+        return
+    writer.execute('COMMIT')
+    assert reader.execute('SELECT count(*) FROM note').fetchone() == (0,)
+    reader.execute('COMMIT')
+    assert reader.execute('SELECT count(*) FROM note').fetchone() == (1,)
+
+
+@pytest.mark.parametrize('flag, tuned', (('1', True), ('0', False)))
+def test_tuning_switch(flag, tuned):
+    """Тест переключения настроек SQLite переменной окружения."""
+    output = subprocess.run(
+        [
+            sys.executable, '-c',
+            'from django.conf import settings; '
+            'database = settings.DATABASES["default"]; '
+            'print("init_command" in database["OPTIONS"], '
+            'database.get("CONN_MAX_AGE", 0))'
+        ],
+        capture_output=True, text=True, check=True, env={
+            **os.environ, 'DJANGO_SETTINGS_MODULE': 'yanote.settings',
+            'NOTES_SQLITE_TUNING': flag,
+        }
+    ).stdout.split()
+    assert output == [str(tuned), '600' if tuned else '0']
@@ -0,0 +1,100 @@
+import json
+import os
+import subprocess
+import sys
+from io import StringIO
+
+import pytest
+
+from django.core.management import call_command
+
+from notes.slugs import transliterate
+from notes.startup import parse_import_times, timed_ready, top_imports
+
+IMPORTTIME = '''\
+import time: self [us] | cumulative | imported package
+import time:       120 |        120 | _io
+import time:      1500 |       2100 |   pytils.translit
+import time:       300 |       2400 | pytils
+some warning
+'''
+
+
+def run_python(code, **env):
+    return subprocess.run(
+        [sys.executable, '-c', code], capture_output=True, text=True,
+        check=True, env={
+            **os.environ, 'DJANGO_SETTINGS_MODULE': 'yanote.settings', **env
+        }
+    ).stdout.strip()
+
+
+def test_parse_import_times():
+    imports = parse_import_times(IMPORTTIME.splitlines())
+    assert imports == [
+        {'module': '_io', 'self_ms': 0.12, 'cumulative_ms': 0.12, 'depth': 0},
+        {
+            'module': 'pytils.translit', 'self_ms': 1.5,
+            'cumulative_ms': 2.1, 'depth': 1
+        },
+        {'module': 'pytils', 'self_ms': 0.3, 'cumulative_ms': 2.4, 'depth': 0},
+    ]
+    assert [row['module'] for row in top_imports(imports, 2)] == [
+        'pytils', 'pytils.translit'
+    ]
+    assert top_imports(imports, 1, 'self_ms')[0]['module'] == (
+        'pytils.translit'
+    )
+
+
+def test_timed_ready_measures_each_app():
+    from django.apps import AppConfig
+
+    create = AppConfig.create
+    with timed_ready({}) as timings:
+        config = AppConfig.create('django.contrib.sessions')
+    assert AppConfig.create == create
+    assert timings == {}
+    config.ready()
+    assert set(timings) == {'sessions'}
+    assert timings['sessions'] >= 0
+
+
+def test_pytils_imported_lazily():
+    assert run_python(
+        'import sys, django; django.setup(); import notes.slugs; '
+        'print("pytils" in sys.modules)'
+    ) == 'False'
+    assert transliterate('Заметка') == 'zametka'
+
+
+@pytest.mark.parametrize('flag, installed', (('1', True), ('0', False)))
+def test_admin_optional(flag, installed):
+    output = run_python(
+        'import django; django.setup(); '
+        'from django.apps import apps; from django.urls import resolve; '
+        'from django.urls.exceptions import Resolver404\n'
+        'try:\n    resolve("/admin/"); routed = True\n'
+        'except Resolver404:\n    routed = False\n'
+        'print(apps.is_installed("django.contrib.admin"), routed)',
+        NOTES_ADMIN=flag
+    )
+    assert output == f'{installed} {installed}'
+
+
+def test_startup_profile_command(monkeypatch):
+    # Профиль снимается в подпроцессе с окружением этого процесса.
+    monkeypatch.setenv('NOTES_ADMIN', '1')
+    out = StringIO()
+    call_command('startup_profile', '--top', '3', '--json', stdout=out)
+    report = json.loads(out.getvalue())
+    assert {'admin', 'auth', 'notes'} <= set(report['ready_ms'])
+    assert report['setup_ms'] > 0
+    assert len(report['imports']) == 3
+    assert report['imports'][0]['cumulative_ms'] >= (
+        report['imports'][-1]['cumulative_ms']
+    )
+    out = StringIO()
+    call_command('startup_profile', '--no-admin', '--top', '2', stdout=out)
+    assert 'AppConfig.ready()' in out.getvalue()
+    assert '\nadmin ' not in out.getvalue()
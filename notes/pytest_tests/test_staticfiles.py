@@ -0,0 +1,201 @@
+import gzip
+from http import HTTPStatus
+
+import pytest
+
+from asgiref.sync import async_to_sync
+from asgiref.testing import ApplicationCommunicator
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management import call_command
+from django.test import RequestFactory
+
+from notes.encodings import accepted_encodings, preferred_encoding
+from notes.staticfiles import (
+    IMMUTABLE, ASGIStaticFilesApp, StaticFilesApp, compressed_variants,
+    serve_static
+)
+
+CSS = 'notes/css/base.css'
+PNG = 'notes/img/logo.png'
+
+
+@pytest.fixture
+def static_root(settings, tmp_path):
+    """Фикстура со статикой, собранной collectstatic во временный каталог.
+
+    Файлы берутся из своего каталога, чтобы не зависеть от админки.
+    """
+    source = tmp_path / 'source'
+    for name, content in (
+        (CSS, b'body { margin: 0; padding: 0; }\n' * 40),
+        (PNG, bytes(range(256)) * 4),
+    ):
+        (source / name).parent.mkdir(parents=True, exist_ok=True)
+        (source / name).write_bytes(content)
+    settings.STATICFILES_DIRS = [source]
+    settings.STATIC_ROOT = tmp_path / 'static'
+    settings.STORAGES = {
+        **settings.STORAGES,
+        'staticfiles': {
+            'BACKEND': 'notes.staticfiles.CompressedManifestStaticFilesStorage'
+        },
+    }
+    call_command('collectstatic', interactive=False, verbosity=0)
+    return settings.STATIC_ROOT
+
+
+@pytest.fixture
+def handler():
+    """Фикстура с WSGI-обработчиком статики поверх пустого приложения."""
+    return StaticFilesApp(lambda environ, start_response: None)
+
+
+def serve(handler, path, **headers):
+    """Ответ обработчика; файл закрывается сразу, без request_finished."""
+    response = handler.serve(RequestFactory().get(path, headers=headers))
+    if response.streaming:
+        response.body = b''.join(response.streaming_content)
+        response.file_to_stream.close()
+    return response
+
+
+def test_collectstatic_hashes_and_compresses(static_root):
+    hashed = staticfiles_storage.hashed_files[CSS]
+    assert hashed != CSS
+    assert staticfiles_storage.url(CSS) == f'/static/{hashed}'
+    for name in (CSS, hashed):
+        assert gzip.decompress(
+            (static_root / f'{name}.gz').read_bytes()
+        ) == (static_root / name).read_bytes()
+    # Несжимаемые файлы лежат без копий.
+    assert (static_root / PNG).is_file()
+    assert not list(static_root.rglob('*.png.gz'))
+
+
+def test_compressed_variants_skip_incompressible():
+    assert set(compressed_variants(b'a' * 1000)) >= {'.gz'}
+    assert compressed_variants(bytes(range(256))) == {}
+
+
+def test_hashed_file_is_immutable(static_root, handler):
+    hashed = staticfiles_storage.hashed_files[CSS]
+    response = serve(handler, f'/static/{hashed}')
+    assert response.status_code == HTTPStatus.OK
+    assert response['Cache-Control'] == IMMUTABLE
+    assert response['Content-Type'] == 'text/css'
+    assert 'Content-Encoding' not in response
+    assert 'Content-Disposition' not in response
+    assert response.body == (static_root / hashed).read_bytes()
+
+
+def test_unhashed_file_is_cached_briefly(static_root, handler, settings):
+    response = serve(handler, f'/static/{CSS}')
+    assert response['Cache-Control'] == (
+        f'public, max-age={settings.NOTES_STATIC_MAX_AGE}'
+    )
+
+
+def test_gzip_variant(static_root, handler):
+    response = serve(handler, f'/static/{CSS}', accept_encoding='gzip, br')
+    assert response['Content-Encoding'] == 'gzip'
+    assert response['Content-Type'] == 'text/css'
+    assert 'Accept-Encoding' in response['Vary']
+    assert int(response['Content-Length']) == (
+        (static_root / f'{CSS}.gz').stat().st_size
+    )
+    assert gzip.decompress(response.body) == (static_root / CSS).read_bytes()
+
+
+def test_brotli_variant(fake_brotli, static_root, handler):
+    response = serve(handler, f'/static/{CSS}', accept_encoding='gzip, br')
+    assert response['Content-Encoding'] == 'br'
+    assert fake_brotli.decompress(response.body) == (
+        (static_root / CSS).read_bytes()
+    )
+
+
+@pytest.mark.parametrize(
+    'accept, expected',
+    (
+        ('gzip, br', 'br'),
+        ('br;q=0.5, gzip', 'gzip'),
+        ('gzip;q=0, br;q=0', None),
+        ('GZIP', 'gzip'),
+        ('*', 'br'),
+        ('*;q=0.1, br;q=0', 'gzip'),
+        ('gzipped, xbr', None),
+        ('', None),
+    )
+)
+def test_preferred_encoding(accept, expected):
+    assert preferred_encoding(accept, ('br', 'gzip')) == expected
+
+
+def test_accepted_encodings():
+    assert accepted_encodings('br;q=0.8, gzip ; q=0, *;q=1.2.3, ;q=1') == {
+        'br': 0.8, 'gzip': 0.0, '*': 0.0
+    }
+
+
+def test_gzip_refused_with_zero_quality(static_root, handler):
+    response = serve(handler, f'/static/{CSS}', accept_encoding='gzip;q=0')
+    assert 'Content-Encoding' not in response
+    assert response.body == (static_root / CSS).read_bytes()
+
+
+def test_not_modified(static_root, handler):
+    response = serve(handler, f'/static/{CSS}')
+    again = serve(handler, f'/static/{CSS}', if_none_match=response['ETag'])
+    assert again.status_code == HTTPStatus.NOT_MODIFIED
+    assert again['ETag'] == response['ETag']
+
+
+@pytest.mark.parametrize('path', ('/static/nope.css', '/static/../db.sqlite3'))
+def test_missing_file(static_root, handler, path):
+    response = handler.get_response(RequestFactory().get(path))
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+def test_unsafe_method(static_root, handler):
+    request = RequestFactory().post(f'/static/{CSS}')
+    assert handler.serve(request).status_code == (
+        HTTPStatus.METHOD_NOT_ALLOWED
+    )
+
+
+def test_other_paths_go_to_application(settings):
+    def application(environ, start_response):
+        return ['приложение']
+
+    assert StaticFilesApp(application)(
+        {'PATH_INFO': '/notes/'}, None
+    ) == ['приложение']
+    settings.NOTES_STATIC_SERVE = False
+    assert serve_static(application, StaticFilesApp) is application
+
+
+def test_asgi_handler(static_root):
+    async def application(scope, receive, send):
+        raise AssertionError('статика не дошла до приложения')
+
+    hashed = staticfiles_storage.hashed_files[CSS]
+    communicator = ApplicationCommunicator(ASGIStaticFilesApp(application), {
+        'type': 'http', 'method': 'GET', 'path': f'/static/{hashed}',
+        'query_string': b'', 'headers': [(b'accept-encoding', b'gzip')],
+    })
+
+    async def fetch():
+        await communicator.send_input({'type': 'http.request'})
+        start = await communicator.receive_output(5)
+        body = b''
+        while True:
+            message = await communicator.receive_output(5)
+            body += message.get('body', b'')
+            if not message.get('more_body'):
+                return start, body
+
+    start, body = async_to_sync(fetch)()
+    headers = dict(start['headers'])
+    assert start['status'] == HTTPStatus.OK
+    assert headers[b'Cache-Control'] == IMMUTABLE.encode()
+    assert gzip.decompress(body) == (static_root / hashed).read_bytes()
@@ -0,0 +1,56 @@
+import json
+from io import StringIO
+
+from django.core.management import call_command
+from django.urls import reverse
+
+from notes.bulk import import_notes
+from notes.models import Note, NoteStats
+
+
+def stats_of(user):
+    """Счётчики пользователя из базы."""
+    stats = NoteStats.objects.get(user=user)
+    return stats.note_count, stats.text_bytes
+
+
+def test_stats_follow_notes(author, note):
+    """Тест счётчиков при создании, изменении и удалении заметок."""
+    assert stats_of(author) == (1, note.text_size)
+    note.text = 'Другой, более длинный текст'
+    note.save()
+    assert stats_of(author) == (1, len(note.text.encode()))
+    second = Note.objects.create(title='Вторая', text='Текст', author=author)
+    assert stats_of(author) == (2, note.text_size + second.text_size)
+    Note.objects.without_text().get(pk=note.pk).delete()
+    assert stats_of(author) == (1, second.text_size)
+    assert NoteStats.objects.get(user=author).last_modified is not None
+
+
+def test_missing_stats_are_rebuilt(author, note):
+    """Тест пересчёта счётчиков, если строки ещё нет."""
+    NoteStats.objects.all().delete()
+    Note.objects.create(title='Вторая', text='Текст', author=author)
+    assert stats_of(author) == (2, note.text_size + len('Текст'.encode()))
+
+
+def test_import_updates_stats(author, note):
+    """Тест счётчиков после импорта."""
+    lines = [json.dumps({'title': 'Импорт', 'text': 'Текст'})] * 3
+    import_notes(author, lines)
+    assert stats_of(author) == (4, note.text_size + 3 * len('Текст'.encode()))
+
+
+def test_reconcile_command_fixes_drift(author, not_author, note):
+    """Тест команды пересчёта разъехавшихся счётчиков."""
+    NoteStats.objects.update(note_count=100, text_bytes=-1)
+    call_command('reconcile_note_stats', batch_size=1, stdout=StringIO())
+    assert stats_of(author) == (1, note.text_size)
+    assert stats_of(not_author) == (0, 0)
+
+
+def test_home_shows_stats(author_client, note):
+    """Тест сводки по заметкам на главной странице."""
+    response = author_client.get(reverse('notes:home'))
+    assert response.context['note_stats'].note_count == 1
+    assert 'Заметок: 1' in response.content.decode()
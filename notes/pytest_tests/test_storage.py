@@ -0,0 +1,95 @@
+import json
+from http import HTTPStatus
+
+import pytest
+
+from django.urls import reverse
+
+from notes.bulk import export_notes, import_notes
+from notes.models import EXCERPT_LENGTH, Note, NoteBody
+
+LONG_TEXT = 'Очень длинный текст заметки. ' * 100
+
+
+@pytest.fixture
+def compression(settings):
+    """Фикстура для хранения длинных текстов в сжатом виде."""
+    settings.NOTES_COMPRESS_TEXT_OVER = 1000
+
+
+@pytest.fixture
+def long_note(author):
+    """Фикстура для создания длинной заметки."""
+    return Note.objects.create(
+        title='Длинная', text=LONG_TEXT, slug='long', author=author
+    )
+
+
+def test_excerpt_and_size_follow_text(note):
+    """Тест пересчёта начала и размера текста при сохранении."""
+    assert note.excerpt == note.text
+    assert note.text_size == len(note.text.encode())
+    note.text = LONG_TEXT
+    note.save()
+    note.refresh_from_db()
+    assert len(note.excerpt) == EXCERPT_LENGTH
+    assert LONG_TEXT.startswith(note.excerpt[:-1])
+    assert note.text_size == len(LONG_TEXT.encode())
+    assert not note.compressed
+
+
+def test_delete_page_does_not_load_text(author_client, note):
+    """Тест страницы удаления без загрузки текста."""
+    response = author_client.get(reverse('notes:delete', args=(note.slug,)))
+    assert 'text' in response.context['note'].get_deferred_fields()
+    assert note.excerpt in response.content.decode()
+
+
+def test_long_text_is_stored_compressed(compression, long_note):
+    """Тест хранения длинного текста в NoteBody."""
+    assert long_note.compressed
+    assert long_note.text == LONG_TEXT
+    row = Note.objects.values('text', 'text_size').get(pk=long_note.pk)
+    assert row == {'text': '', 'text_size': len(LONG_TEXT.encode())}
+    assert len(NoteBody.objects.get(note=long_note).data) < row['text_size']
+    assert Note.objects.get(pk=long_note.pk).text == LONG_TEXT
+
+
+def test_detail_shows_compressed_text(compression, author_client, long_note):
+    """Тест страницы заметки со сжатым текстом без лишних запросов."""
+    response = author_client.get(
+        reverse('notes:detail', args=(long_note.slug,))
+    )
+    assert response.status_code == HTTPStatus.OK
+    assert response.context['note'].text == LONG_TEXT
+
+
+def test_shortened_text_leaves_body_table(compression, long_note):
+    """Тест возврата текста в строку заметки после сокращения."""
+    long_note.text = 'Короткий текст'
+    long_note.save()
+    assert not NoteBody.objects.exists()
+    assert Note.objects.values_list('text', flat=True).get() == (
+        'Короткий текст'
+    )
+
+
+def test_compressed_note_deletes_body(compression, long_note):
+    """Тест удаления сжатого текста вместе с заметкой."""
+    long_note.delete()
+    assert not NoteBody.objects.exists()
+
+
+def test_import_and_export_compressed_text(compression, author):
+    """Тест импорта и выгрузки длинных заметок."""
+    lines = [
+        json.dumps({'title': 'Длинная', 'text': LONG_TEXT}),
+        json.dumps({'title': 'Короткая', 'text': 'Текст'}),
+    ]
+    assert import_notes(author, lines)['created'] == 2
+    assert NoteBody.objects.count() == 1
+    exported = [
+        json.loads(line)['text']
+        for line in export_notes(Note.objects.filter(author=author))
+    ]
+    assert exported == [LONG_TEXT, 'Текст']
@@ -0,0 +1,187 @@
+import pytest
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from notes.forms import NoteForm
+from notes.models import Note, NoteTag, Tag
+from notes.tags import MAX_TAGS, parse_tags, set_note_tags
+
+LIST_URL = reverse('notes:list')
+
+
+def counts_of(author):
+    """Счётчики тегов пользователя из базы."""
+    return dict(
+        Tag.objects.filter(author=author).values_list('name', 'note_count')
+    )
+
+
+@pytest.fixture
+def tagged_notes(author):
+    """Фикстура для трёх заметок с разными наборами тегов."""
+    notes = {}
+    for slug, tags in (
+        ('work-home', ['работа', 'дом']),
+        ('work', ['работа']),
+        ('home', ['дом']),
+    ):
+        notes[slug] = Note.objects.create(
+            title=slug, text='Текст', slug=slug, author=author
+        )
+        set_note_tags(notes[slug], tags)
+    return notes
+
+
+@pytest.mark.parametrize(
+    'value, expected',
+    (
+        ('', []),
+        ('Работа, дом', ['работа', 'дом']),
+        (' работа ;  Дом  , работа,, ', ['работа', 'дом']),
+        ('очень   длинный\tтег', ['очень длинный тег']),
+        ('x' * 60, ['x' * 50]),
+    )
+)
+def test_parse_tags(value, expected):
+    """Тест разбора и нормализации строки тегов."""
+    assert parse_tags(value) == expected
+
+
+def test_create_note_with_tags(author, author_client, form_data):
+    """Тест сохранения тегов из формы создания заметки."""
+    form_data['tags'] = 'Работа, дом'
+    author_client.post(reverse('notes:add'), data=form_data)
+    note = Note.objects.get(slug=form_data['slug'])
+    assert set(note.tags.values_list('name', flat=True)) == {'работа', 'дом'}
+    assert counts_of(author) == {'работа': 1, 'дом': 1}
+
+
+def test_edit_note_tags(author, author_client, note, form_data):
+    """Тест замены тегов при редактировании и счётчиков после неё."""
+    set_note_tags(note, ['работа', 'дом'])
+    url = reverse('notes:edit', args=(note.slug,))
+    assert author_client.get(url).context['form'].initial['tags'] in (
+        'работа, дом', 'дом, работа'
+    )
+    form_data['tags'] = 'дом, отпуск'
+    author_client.post(url, data=form_data)
+    assert set(note.tags.values_list('name', flat=True)) == {'дом', 'отпуск'}
+    assert counts_of(author) == {'работа': 0, 'дом': 1, 'отпуск': 1}
+
+
+def test_form_save_without_commit_keeps_tags(author, form_data):
+    """Тест сохранения тегов через save_m2m() после save(commit=False)."""
+    form_data['tags'] = 'Работа, дом'
+    form = NoteForm(data=form_data)
+    assert form.is_valid()
+    note = form.save(commit=False)
+    note.author = author
+    note.save()
+    assert not note.tags.exists()
+    form.save_m2m()
+    assert set(note.tags.values_list('name', flat=True)) == {'работа', 'дом'}
+    assert counts_of(author) == {'работа': 1, 'дом': 1}
+
+
+def test_too_many_tags(author_client, form_data):
+    """Тест ограничения числа тегов у заметки."""
+    form_data['tags'] = ','.join(f'тег{i}' for i in range(MAX_TAGS + 1))
+    response = author_client.post(reverse('notes:add'), data=form_data)
+    assert response.context['form'].errors['tags']
+    assert not Note.objects.exists()
+
+
+def test_counts_follow_note_deletion(author, tagged_notes):
+    """Тест счётчиков после удаления заметки и её связей каскадом."""
+    assert counts_of(author) == {'работа': 2, 'дом': 2}
+    Note.objects.without_text().get(slug='work-home').delete()
+    assert counts_of(author) == {'работа': 1, 'дом': 1}
+
+
+def test_recount_fixes_drift(author, tagged_notes):
+    """Тест пересчёта разъехавшихся счётчиков."""
+    Tag.objects.update(note_count=100)
+    Tag.objects.recount()
+    assert counts_of(author) == {'работа': 2, 'дом': 2}
+
+
+@pytest.mark.parametrize(
+    'query, expected',
+    (
+        ('?tag=работа', {'work-home', 'work'}),
+        ('?tag=работа&tag=дом', {'work-home'}),
+        ('?tag=работа&tag=дом&match=any', {'work-home', 'work', 'home'}),
+        ('?tag=Дом&tag=нет', set()),
+        ('?tag=дом&tag=нет&match=any', {'work-home', 'home'}),
+        ('', {'work-home', 'work', 'home'}),
+    )
+)
+def test_list_filtered_by_tags(author_client, tagged_notes, query, expected):
+    """Тест фильтра списка по всем или любому из тегов."""
+    response = author_client.get(LIST_URL + query)
+    assert {note.slug for note in response.context['object_list']} == (
+        expected
+    )
+
+
+def test_filter_ignores_other_users_tags(
+    not_author, not_author_client, tagged_notes
+):
+    """Тест: одноимённые теги другого пользователя не подмешиваются."""
+    note = Note.objects.create(
+        title='Чужая', text='Текст', slug='other', author=not_author
+    )
+    set_note_tags(note, ['работа'])
+    response = not_author_client.get(LIST_URL + '?tag=работа')
+    assert [note.slug for note in response.context['object_list']] == [
+        'other'
+    ]
+
+
+def test_list_tags_without_n_plus_one(author, author_client, tagged_notes):
+    """Тест: число запросов списка не зависит от числа заметок с тегами."""
+    def add_notes_and_count_queries(count):
+        for index in range(count):
+            note = Note.objects.create(
+                title='Ещё одна', text='Текст', author=author
+            )
+            set_note_tags(note, ['работа', f'тег{note.pk}'])
+        with CaptureQueriesContext(connection) as queries:
+            author_client.get(LIST_URL)
+        return len(queries)
+
+    add_notes_and_count_queries(0)
+    assert add_notes_and_count_queries(1) == add_notes_and_count_queries(10)
+
+
+def test_list_shows_tags_and_counts(author_client, tagged_notes):
+    """Тест тегов у заметок и облака тегов со счётчиками."""
+    content = author_client.get(LIST_URL).content.decode()
+    assert '#работа' in content
+    assert 'работа</a>\n          (2)' in content
+
+
+def test_filtered_pages_are_cached_separately(author_client, tagged_notes):
+    """Тест: страница с фильтром не отдаётся вместо полного списка."""
+    author_client.get(LIST_URL + '?tag=дом')
+    response = author_client.get(LIST_URL)
+    assert len(response.context['object_list']) == 3
+    set_note_tags(tagged_notes['work'], ['работа', 'дом'])
+    response = author_client.get(LIST_URL + '?tag=дом')
+    assert response['X-Notes-List-Cache'] == 'miss'
+    assert len(response.context['object_list']) == 3
+
+
+def test_tag_links_use_index(tagged_notes):
+    """Тест: отбор заметок по тегу идёт по индексу (tag, note)."""
+    tag = Tag.objects.get(name='работа')
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'EXPLAIN QUERY PLAN SELECT note_id FROM '
+            f'{NoteTag._meta.db_table} WHERE tag_id = %s',
+            (tag.pk,)
+        )
+        plan = ' '.join(str(row[-1]) for row in cursor.fetchall())
+    assert 'COVERING INDEX' in plan
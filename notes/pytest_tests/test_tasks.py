@@ -0,0 +1,259 @@
+import json
+from io import StringIO
+import threading
+from datetime import timedelta
+
+import pytest
+
+from django.core.management import call_command
+from django.utils import timezone
+
+from notes.models import NoteRevision, QueuedTask
+from notes.taskqueue import (
+    LEASE_EXPIRED, TASKS, DatabaseBackend, InlineBackend, ThreadBackend,
+    make_job
+)
+
+
+@pytest.fixture
+def gate():
+    """Фикстура, задерживающая задачу remember, пока её не откроют."""
+    gate = threading.Event()
+    gate.set()
+    return gate
+
+
+@pytest.fixture
+def calls(monkeypatch, gate):
+    """Фикстура с тестовыми задачами; возвращает список их вызовов."""
+    calls = []
+    lock = threading.Lock()
+
+    def remember(value):
+        gate.wait(5)
+        with lock:
+            calls.append(value)
+
+    def flaky(value):
+        with lock:
+            calls.append(value)
+            if len(calls) < 2:
+                raise ValueError('ещё рано')
+
+    def broken():
+        raise ValueError('всегда падает')
+
+    monkeypatch.setitem(TASKS, 'remember', remember)
+    monkeypatch.setitem(TASKS, 'flaky', flaky)
+    monkeypatch.setitem(TASKS, 'broken', broken)
+    return calls
+
+
+@pytest.fixture
+def database_backend(settings):
+    """Фикстура очереди в базе с повтором без паузы."""
+    settings.NOTES_TASK_RETRY_DELAY = 0
+    return DatabaseBackend()
+
+
+def test_inline_retries_until_success(calls):
+    """Тест повтора упавшей задачи при немедленном выполнении."""
+    backend = InlineBackend()
+    backend.enqueue(make_job('flaky', {'value': 1}))
+    stats = backend.stats()
+    assert calls == [1, 1]
+    assert (stats['done'], stats['retried'], stats['failed']) == (1, 1, 0)
+
+
+def test_inline_gives_up_after_max_attempts(settings, calls):
+    """Тест отказа от задачи после NOTES_TASK_MAX_ATTEMPTS попыток."""
+    settings.NOTES_TASK_MAX_ATTEMPTS = 2
+    backend = InlineBackend()
+    backend.enqueue(make_job('broken', {}))
+    assert backend.stats()['failed'] == 1
+
+
+def test_thread_backend_dedupes_waiting_jobs(settings, gate, calls):
+    """Тест пропуска задачи, такая же из которой ещё ждёт в очереди."""
+    settings.NOTES_TASK_WORKERS = 1
+    backend = ThreadBackend()
+    gate.clear()
+    backend.put(make_job('remember', {'value': 'first'}, key='a'))
+    backend.put(make_job('remember', {'value': 'second'}, key='b'))
+    backend.put(make_job('remember', {'value': 'third'}, key='b'))
+    assert backend.depth() >= 1
+    gate.set()
+    backend.join()
+    stats = backend.stats()
+    assert sorted(calls) == ['first', 'second']
+    assert (stats['enqueued'], stats['deduplicated']) == (2, 1)
+    assert stats['depth'] == 0
+    assert set(stats['latency_ms']) == {'p50', 'p95', 'p99'}
+
+
+def test_thread_backend_keeps_order_on_retry(settings, calls):
+    """Тест порядка задач одного order, когда первая повторяется."""
+    settings.NOTES_TASK_RETRY_DELAY = 0
+    backend = ThreadBackend()
+    backend.put(make_job('flaky', {'value': 1}, order='note:1'))
+    backend.put(make_job('remember', {'value': 2}, order='note:1'))
+    backend.join()
+    assert calls == [1, 1, 2]
+
+
+def test_thread_backend_drains_on_exit(gate, calls):
+    """Тест ожидания очереди при выходе процесса."""
+    backend = ThreadBackend()
+    gate.clear()
+    backend.put(make_job('remember', {'value': 1}))
+    assert not backend.drain(0.05)
+    gate.set()
+    assert backend.drain(5)
+    assert calls == [1]
+
+
+@pytest.mark.django_db
+def test_thread_backend_waits_for_commit(
+    django_capture_on_commit_callbacks, calls
+):
+    """Тест постановки задачи в очередь только после коммита."""
+    backend = ThreadBackend()
+    with django_capture_on_commit_callbacks(execute=True):
+        backend.enqueue(make_job('remember', {'value': 1}))
+        assert backend.stats()['enqueued'] == 0
+    backend.join()
+    assert calls == [1]
+
+
+@pytest.mark.django_db
+def test_database_backend_dedupes_pending(database_backend, calls):
+    """Тест одной строки на ключ, пока задача ждёт выполнения."""
+    for value in range(3):
+        database_backend.enqueue(
+            make_job('remember', {'value': value}, key='note:1')
+        )
+    assert QueuedTask.objects.count() == 1
+    assert database_backend.stats()['deduplicated'] == 2
+    assert database_backend.run_next()
+    assert not database_backend.run_next()
+    assert calls == [0]
+    assert not QueuedTask.objects.exists()
+
+
+@pytest.mark.django_db
+def test_database_backend_retries_later(database_backend, calls):
+    """Тест переноса упавшей задачи на потом и её повтора."""
+    database_backend.enqueue(make_job('flaky', {'value': 1}))
+    database_backend.run_next()
+    task = QueuedTask.objects.get()
+    assert (task.status, task.attempts) == (QueuedTask.PENDING, 1)
+    assert 'ещё рано' in task.last_error
+    QueuedTask.objects.update(run_after=timezone.now() - timedelta(1))
+    assert database_backend.run_next()
+    assert not QueuedTask.objects.exists()
+    assert calls == [1, 1]
+
+
+@pytest.mark.django_db
+def test_database_backend_keeps_order_on_retry(
+    settings, database_backend, calls
+):
+    """Тест задачи, ждущей повтора более ранней с тем же order."""
+    settings.NOTES_TASK_RETRY_DELAY = 60
+    database_backend.enqueue(make_job('flaky', {'value': 1}, order='note:1'))
+    database_backend.enqueue(
+        make_job('remember', {'value': 2}, order='note:1')
+    )
+    database_backend.enqueue(make_job('remember', {'value': 3}))
+    assert database_backend.run_next()
+    assert database_backend.run_next()
+    assert not database_backend.run_next()
+    QueuedTask.objects.update(run_after=timezone.now() - timedelta(1))
+    assert database_backend.run_next()
+    assert database_backend.run_next()
+    assert calls == [1, 3, 1, 2]
+
+
+@pytest.mark.django_db
+def test_database_backend_keeps_failed(settings, database_backend, calls):
+    """Тест сохранения задачи, исчерпавшей попытки."""
+    settings.NOTES_TASK_MAX_ATTEMPTS = 1
+    database_backend.enqueue(make_job('broken', {}, key='broken'))
+    database_backend.run_next()
+    assert QueuedTask.objects.get().status == QueuedTask.FAILED
+    assert database_backend.depth() == 0
+    database_backend.enqueue(make_job('broken', {}, key='broken'))
+    assert database_backend.depth() == 1
+
+
+@pytest.mark.django_db
+def test_database_backend_reclaims_lost_tasks(
+    settings, database_backend, calls
+):
+    """Тест возврата в очередь задачи, исполнитель которой упал."""
+    settings.NOTES_TASK_MAX_ATTEMPTS = 2
+    for value in range(3):
+        database_backend.enqueue(
+            make_job('remember', {'value': value}, key=f'note:{value}')
+        )
+    claimed = [database_backend.claim() for _ in range(3)]
+    assert not database_backend.run_next()
+    # Исполнитель первой задачи пропал, вторая успела упасть раньше,
+    # а для третьей уже поставлена такая же.
+    QueuedTask.objects.update(claimed_at=timezone.now() - timedelta(
+        seconds=settings.NOTES_TASK_LEASE + 1
+    ))
+    QueuedTask.objects.filter(pk=claimed[1].pk).update(attempts=1)
+    database_backend.enqueue(make_job('remember', {'value': 2}, key='note:2'))
+    assert database_backend.run_next()
+    assert database_backend.run_next()
+    assert not database_backend.run_next()
+    assert sorted(calls) == [0, 2]
+    failed = QueuedTask.objects.get()
+    assert (failed.pk, failed.status, failed.attempts) == (
+        claimed[1].pk, QueuedTask.FAILED, 2
+    )
+    assert failed.last_error == LEASE_EXPIRED
+
+
+def test_run_tasks_command(settings, note):
+    """Тест записи ревизии командой run_tasks при очереди в базе."""
+    settings.NOTES_TASK_BACKEND = 'database'
+    note.text = 'Текст, изменённый в фоне'
+    note.save()
+    assert note.revisions.count() == 1
+    call_command('run_tasks', '--once', stdout=StringIO())
+    assert note.revisions.count() == 2
+    assert NoteRevision.objects.restore(note.pk, 2).text == note.text
+
+
+def test_every_queued_edit_gets_a_revision(settings, note):
+    """Тест ревизии на каждую правку, пока прежние задачи ждут."""
+    settings.NOTES_TASK_BACKEND = 'database'
+    versions = ['Вторая версия', 'Третья версия', 'Вторая версия']
+    for text in versions:
+        note.text = text
+        note.save()
+    note.title = 'Новый заголовок'
+    note.save()
+    note.save()
+    assert QueuedTask.objects.count() == 5
+    call_command('run_tasks', '--once', stdout=StringIO())
+    assert note.revisions.count() == 5
+    revisions = [
+        NoteRevision.objects.restore(note.pk, number)
+        for number in range(2, 6)
+    ]
+    assert [revision.text for revision in revisions] == versions + [
+        versions[-1]
+    ]
+    assert revisions[-1].title == 'Новый заголовок'
+
+
+@pytest.mark.django_db
+def test_queue_stats_command(capsys):
+    """Тест вывода метрик очереди в JSON."""
+    call_command('queue_stats', '--backend', 'database')
+    stats = json.loads(capsys.readouterr().out)
+    assert stats['backend'] == 'database'
+    assert stats['depth'] == 0
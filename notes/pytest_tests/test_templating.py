@@ -0,0 +1,42 @@
+import pytest
+
+from django.template import engines
+from django.urls import reverse
+
+from notes.templating import LEAN_ENGINE, warm_up_templates
+
+
+def cached_names(engine):
+    """Имена шаблонов в кэше загрузчика движка."""
+    loader, = engine.engine.template_loaders
+    return set(loader.get_template_cache)
+
+
+def test_warm_up_compiles_project_templates():
+    """Тест прогрева шаблонов обоих движков."""
+    for engine in engines.all():
+        engine.engine.template_loaders[0].reset()
+    assert warm_up_templates() > 0
+    for engine in engines.all():
+        assert {
+            'base.html',
+            'notes/list.html',
+            'notes/detail.html',
+            'registration/login.html',
+        } <= cached_names(engine)
+
+
+@pytest.mark.parametrize(
+    'name, engine',
+    (
+        ('notes:list', LEAN_ENGINE),
+        ('notes:detail', LEAN_ENGINE),
+        ('notes:add', 'django'),
+    )
+)
+def test_views_choose_context_processors(author_client, note, name, engine):
+    """Тест страниц без ненужных им context processors."""
+    args = (note.slug,) if name == 'notes:detail' else None
+    response = author_client.get(reverse(name, args=args))
+    assert 'user' in response.context
+    assert ('messages' in response.context) is (engine != LEAN_ENGINE)
@@ -0,0 +1,148 @@
+import math
+import time
+from functools import wraps
+from http import HTTPStatus
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+
+BUCKET_KEY = 'notes:rate:{scope}:{client}'
+TOO_MANY_REQUESTS = 'Слишком много запросов, попробуйте позже.'
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+# Сколько раз запрос пробует взять жетон, пока простаивавшую корзину
+# переносит другой запрос, и пауза между попытками, секунды.
+IDLE_RESET_ATTEMPTS = 10
+IDLE_RESET_WAIT = 0.001
+
+
+def get_cache():
+    """Кэш, в котором лежат корзины ограничителя."""
+    return caches[settings.NOTES_RATE_LIMIT_CACHE]
+
+
+def reset_idle(cache, key, now, timeout):
+    """Переносит TAT новой или простаивавшей корзины на now.
+
+    Переносит один запрос, захвативший замок через add, поэтому
+    одновременные запросы не сдвигают корзину каждый по-своему.
+    False - замок у другого запроса.
+    """
+    lock = f'{key}:reset'
+    if not cache.add(lock, 1, 1):
+        return False
+    try:
+        tat = cache.get(key)
+        if tat is None or tat < now:
+            cache.set(key, now, timeout)
+    finally:
+        cache.delete(lock)
+    return True
+
+
+def token_interval(rate, period):
+    """Интервал между жетонами в миллисекундах."""
+    return max(1, round(period * 1000 / rate))
+
+
+def take_token(key, rate, period, burst):
+    """Берёт жетон из корзины key, возвращает паузу до следующего.
+
+    Корзина хранится как GCRA: в кэше лежит теоретическое время
+    прихода следующего запроса (TAT) в миллисекундах, и каждый
+    запрос сдвигает его атомарным incr на интервал period / rate.
+    Запрос проходит, пока TAT опережает текущее время не больше чем
+    на burst интервалов. 0 - жетон выдан, иначе - пауза в секундах.
+    """
+    cache = get_cache()
+    interval = token_interval(rate, period)
+    now = time.time_ns() // 1_000_000
+    timeout = math.ceil(burst * interval / 1000) + 1
+    for _ in range(IDLE_RESET_ATTEMPTS):
+        tat = cache.get(key)
+        if tat is None or tat < now:
+            # Корзина новая или простаивала: отсчёт начинается с
+            # текущего момента.
+            if not reset_idle(cache, key, now, timeout):
+                time.sleep(IDLE_RESET_WAIT)
+            continue
+        try:
+            tat = cache.incr(key, interval)
+        except ValueError:
+            # Ключ вытеснили между get и incr.
+            continue
+        if tat - interval >= now:
+            break
+    else:
+        # Корзину так и не удалось перенести: жетон не выдаётся, чтобы
+        # не пропускать запросы мимо счёта.
+        return math.ceil(interval / 1000)
+    excess = tat - now - burst * interval
+    if excess > 0:
+        cache.decr(key, interval)
+        return math.ceil(excess / 1000)
+    cache.touch(key, timeout)
+    return 0
+
+
+def return_token(key, rate, period, burst):
+    """Возвращает в корзину key жетон, выданный take_token."""
+    try:
+        get_cache().decr(key, token_interval(rate, period))
+    except ValueError:
+        pass
+
+
+def client_keys(request, scope):
+    """Ключи корзин запроса: по IP и, если он вошёл, по пользователю."""
+    keys = [BUCKET_KEY.format(
+        scope=scope, client=f'ip:{request.META.get("REMOTE_ADDR", "")}'
+    )]
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated:
+        keys.append(BUCKET_KEY.format(scope=scope, client=f'user:{user.pk}'))
+    return keys
+
+
+def check_rate(request, scope):
+    """Пауза в секундах, если запрос превысил лимит scope, иначе 0.
+
+    Жетон берётся из каждой корзины запроса по очереди; если какая-то
+    отказала, уже взятые жетоны возвращаются.
+    """
+    limit = settings.NOTES_RATE_LIMITS.get(scope)
+    if not settings.NOTES_RATE_LIMIT_ENABLED or limit is None:
+        return 0
+    taken = []
+    for key in client_keys(request, scope):
+        retry_after = take_token(key, **limit)
+        if retry_after:
+            for taken_key in taken:
+                return_token(taken_key, **limit)
+            return retry_after
+        taken.append(key)
+    return 0
+
+
+def rate_limit(scope):
+    """Декоратор представления: лимит NOTES_RATE_LIMITS[scope].
+
+    Считаются только изменяющие запросы; при превышении отдаётся 429
+    с заголовком Retry-After.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapped(request, *args, **kwargs):
+            if request.method not in SAFE_METHODS:
+                retry_after = check_rate(request, scope)
+                if retry_after:
+                    response = HttpResponse(
+                        TOO_MANY_REQUESTS,
+                        status=HTTPStatus.TOO_MANY_REQUESTS,
+                        content_type='text/plain; charset=utf-8'
+                    )
+                    response['Retry-After'] = str(retry_after)
+                    return response
+            return view(request, *args, **kwargs)
+        return wrapped
+    return decorator
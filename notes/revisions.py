@@ -0,0 +1,44 @@
+import json
+import zlib
+from difflib import SequenceMatcher
+
+
+def encode_snapshot(text):
+    """Полная копия текста для ревизии-снимка."""
+    return zlib.compress(text.encode())
+
+
+def encode_delta(old, new):
+    """Разница между версиями текста по строкам.
+
+    Неизменные участки хранятся как [начало, конец] в строках старой
+    версии, новые - как строки текста.
+    """
+    old_lines, new_lines = old.splitlines(True), new.splitlines(True)
+    operations = []
+    matcher = SequenceMatcher(None, old_lines, new_lines)
+    for tag, old_start, old_end, new_start, new_end in matcher.get_opcodes():
+        if tag == 'equal':
+            operations.append([old_start, old_end])
+        elif new_start < new_end:
+            operations.append(''.join(new_lines[new_start:new_end]))
+    return zlib.compress(json.dumps(operations, ensure_ascii=False).encode())
+
+
+def apply_delta(old, data):
+    """Восстанавливает новую версию текста по старой и разнице."""
+    old_lines = old.splitlines(True)
+    return ''.join(
+        operation if isinstance(operation, str)
+        else ''.join(old_lines[operation[0]:operation[1]])
+        for operation in json.loads(zlib.decompress(data))
+    )
+
+
+def replay(revisions):
+    """Текст последней ревизии цепочки, начинающейся со снимка."""
+    snapshot, *deltas = revisions
+    text = zlib.decompress(snapshot.data).decode()
+    for revision in deltas:
+        text = apply_delta(text, revision.data)
+    return text
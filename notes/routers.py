@@ -0,0 +1,40 @@
+import random
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+PRIMARY = DEFAULT_DB_ALIAS
+
+pinned_to_primary = ContextVar('pinned_to_primary', default=False)
+wrote_to_primary = ContextVar('wrote_to_primary', default=False)
+
+
+class PrimaryReplicaRouter:
+    """Чтение с реплик из DATABASE_REPLICAS, запись в основную базу.
+
+    Чтение идёт в основную базу, если запрос закреплён за ней после
+    недавней записи, если в этом запросе уже была запись или если
+    открыта транзакция: внутри неё чтение должно видеть свои же данные.
+    """
+
+    def db_for_read(self, model, **hints):
+        replicas = settings.DATABASE_REPLICAS
+        if (
+            not replicas
+            or pinned_to_primary.get()
+            or wrote_to_primary.get()
+            or connections[PRIMARY].in_atomic_block
+        ):
+            return PRIMARY
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        wrote_to_primary.set(True)
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db not in settings.DATABASE_REPLICAS
@@ -0,0 +1,176 @@
+import re
+
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.models import Q
+
+from .models import Note, NoteBody, decompress_text
+
+SEARCH_TABLE = 'notes_note_fts'
+NOTE_TABLE = Note._meta.db_table
+TITLE_WEIGHT = 10.0
+TEXT_WEIGHT = 1.0
+
+CREATE_TABLE = (
+    f'CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5('
+    f"title, text, content='{NOTE_TABLE}', content_rowid='id', "
+    "tokenize='unicode61 remove_diacritics 2')"
+)
+INDEX_ROW = f'INSERT INTO {SEARCH_TABLE}(rowid, title, text) '
+# Внешнему индексу FTS5 при удалении нужны ровно те значения, которые
+# были проиндексированы, иначе индекс портится.
+UNINDEX_ROW = (
+    f'INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}, rowid, title, text) '
+)
+# Триггеры ведут индекс только для несжатых заметок: у сжатой в
+# notes_note пустой text, её индексирует Python распакованным текстом.
+INDEX_NEW = (
+    f'{INDEX_ROW}SELECT new.id, new.title, new.text WHERE NOT new.compressed;'
+)
+UNINDEX_OLD = (
+    f"{UNINDEX_ROW}SELECT 'delete', old.id, old.title, old.text "
+    'WHERE NOT old.compressed;'
+)
+TRIGGERS = {
+    f'{SEARCH_TABLE}_insert': (
+        f'AFTER INSERT ON {NOTE_TABLE} BEGIN {INDEX_NEW} END'
+    ),
+    f'{SEARCH_TABLE}_delete': (
+        f'AFTER DELETE ON {NOTE_TABLE} BEGIN {UNINDEX_OLD} END'
+    ),
+    f'{SEARCH_TABLE}_update': (
+        f'AFTER UPDATE OF title, text, compressed ON {NOTE_TABLE} '
+        f'BEGIN {UNINDEX_OLD} {INDEX_NEW} END'
+    ),
+}
+
+
+def is_supported(connection):
+    """Полнотекстовый индекс есть только у SQLite."""
+    return connection.vendor == 'sqlite'
+
+
+def ensure_search_index(using=DEFAULT_DB_ALIAS, **kwargs):
+    """Создаёт таблицу FTS5 и триггеры, если их нет.
+
+    Вызывается после каждой миграции: при пересоздании таблицы
+    notes_note SQLite удаляет её триггеры, и их нужно вернуть.
+    """
+    connection = connections[using]
+    if not is_supported(connection):
+        return
+    with connection.cursor() as cursor:
+        tables = connection.introspection.table_names(cursor)
+        if not {NOTE_TABLE, NoteBody._meta.db_table} <= set(tables):
+            return
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE name LIKE %s",
+            (f'{SEARCH_TABLE}%',)
+        )
+        existing = {name for name, in cursor.fetchall()}
+        missing = [name for name in TRIGGERS if name not in existing]
+        if SEARCH_TABLE in existing and not missing:
+            return
+        cursor.execute(CREATE_TABLE)
+        for name in missing:
+            cursor.execute(f'CREATE TRIGGER {name} {TRIGGERS[name]}')
+    rebuild_search_index(using=using)
+
+
+def compressed_entries(notes, using=DEFAULT_DB_ALIAS):
+    """Строки индекса (id, title, text) сжатых заметок из notes.
+
+    notes - id заметок или условие на NoteBody; текст распаковывается.
+    """
+    bodies = NoteBody.objects.using(using)
+    if not isinstance(notes, Q):
+        notes = Q(note_id__in=notes)
+    return [
+        (note_id, title, decompress_text(data))
+        for note_id, title, data in bodies.filter(notes).values_list(
+            'note_id', 'note__title', 'data'
+        )
+    ]
+
+
+def index_entries(entries, using=DEFAULT_DB_ALIAS, delete=False):
+    """Добавляет строки (id, title, text) в индекс или удаляет из него.
+
+    Старую строку заметки удаляют до записи новой с тем же id.
+    """
+    connection = connections[using]
+    if not entries or not is_supported(connection):
+        return
+    sql = (
+        f"{UNINDEX_ROW}VALUES ('delete', %s, %s, %s)" if delete
+        else f'{INDEX_ROW}VALUES (%s, %s, %s)'
+    )
+    with connection.cursor() as cursor:
+        cursor.executemany(sql, entries)
+
+
+def unindex_deleted_note(sender, instance, using, **kwargs):
+    """Убирает сжатую заметку из индекса перед удалением (pre_delete)."""
+    if instance.compressed:
+        index_entries(
+            compressed_entries([instance.pk], using), using, delete=True
+        )
+
+
+def rebuild_search_index(batch_size=1000, using=DEFAULT_DB_ALIAS):
+    """Перестраивает индекс порциями, возвращает число заметок."""
+    connection = connections[using]
+    with transaction.atomic(using=using), connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}) VALUES ('delete-all')"
+        )
+    last_id, total = 0, 0
+    while True:
+        with transaction.atomic(using=using), connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT max(id), count(*) FROM (SELECT id FROM {NOTE_TABLE} '
+                'WHERE id > %s ORDER BY id LIMIT %s)',
+                (last_id, batch_size)
+            )
+            batch_last_id, count = cursor.fetchone()
+            if not count:
+                return total
+            cursor.execute(
+                f'INSERT INTO {SEARCH_TABLE}(rowid, title, text) '
+                f'SELECT id, title, text FROM {NOTE_TABLE} '
+                'WHERE id > %s AND id <= %s AND NOT compressed',
+                (last_id, batch_last_id)
+            )
+            index_entries(compressed_entries(
+                Q(note_id__gt=last_id, note_id__lte=batch_last_id), using
+            ), using)
+        last_id = batch_last_id
+        total += count
+
+
+def build_match_query(query):
+    """Превращает ввод пользователя в безопасное выражение MATCH."""
+    terms = re.findall(r'\w+', query)
+    return ' '.join(f'"{term}"*' for term in terms)
+
+
+def search_notes(queryset, query):
+    """Ограничивает выборку заметками, найденными по запросу, по bm25."""
+    match = build_match_query(query)
+    if not match:
+        return queryset.none()
+    if not is_supported(connections[queryset.db]):
+        return queryset.filter(
+            Q(title__icontains=query) | Q(text__icontains=query)
+        )
+    return queryset.extra(
+        tables=[SEARCH_TABLE],
+        where=[
+            f'{SEARCH_TABLE}.rowid = {NOTE_TABLE}.id',
+            f'{SEARCH_TABLE} MATCH %s',
+        ],
+        params=[match],
+        select={
+            'rank': f'bm25({SEARCH_TABLE}, {TITLE_WEIGHT}, {TEXT_WEIGHT})'
+        },
+        order_by=['rank'],
+    )
@@ -0,0 +1,126 @@
+import gzip
+import json
+from operator import attrgetter
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
+
+from .encodings import preferred_encoding
+from .tags import prefetch_tags
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+API_FIELDS = (
+    'id', 'slug', 'title', 'text', 'excerpt', 'tags', 'text_size',
+    'created_at', 'updated_at',
+)
+LIST_FIELDS = ('id', 'slug', 'title', 'excerpt', 'tags', 'updated_at')
+DETAIL_FIELDS = API_FIELDS
+# Поля, которые берутся не из одноимённой колонки notes_note.
+COMPUTED_FIELDS = ('text', 'tags')
+
+
+def _isoformat(name):
+    def get(note):
+        value = getattr(note, name)
+        return value.isoformat() if value is not None else None
+    return get
+
+
+def _tag_names(note):
+    return [tag.name for tag in note.tags.all()]
+
+
+GETTERS = {name: attrgetter(name) for name in API_FIELDS}
+GETTERS.update({
+    'created_at': _isoformat('created_at'),
+    'updated_at': _isoformat('updated_at'),
+    'tags': _tag_names,
+})
+
+
+def read_fields(params, default):
+    """Поля ответа из ?fields=id,title,..., по умолчанию default."""
+    value = params.get('fields')
+    if not value:
+        return default
+    fields = tuple(dict.fromkeys(
+        name.strip() for name in value.split(',') if name.strip()
+    ))
+    unknown = [name for name in fields if name not in GETTERS]
+    if unknown or not fields:
+        raise ValidationError(
+            f'Неизвестные поля: {", ".join(unknown)}. '
+            f'Доступны: {", ".join(API_FIELDS)}.'
+        )
+    return fields
+
+
+def select_fields(queryset, fields, *extra):
+    """Загружает из базы только то, что попадёт в ответ.
+
+    Текст подтягивается вместе со сжатым телом, теги - отдельным
+    запросом на всю страницу; extra - поля, нужные не для ответа,
+    а, например, для курсора.
+    """
+    columns = [
+        name for name in (*fields, *extra)
+        if name and name not in COMPUTED_FIELDS
+    ]
+    if 'text' in fields:
+        queryset = queryset.with_text()
+        columns += ['text', 'compressed', 'body__data']
+    if 'tags' in fields:
+        queryset = prefetch_tags(queryset)
+    return queryset.only(*columns)
+
+
+def serialize_note(note, fields):
+    """Заметка в виде словаря только с полями fields."""
+    return {name: GETTERS[name](note) for name in fields}
+
+
+def dumps(payload):
+    """Компактный JSON без экранирования кириллицы."""
+    return json.dumps(
+        payload, ensure_ascii=False, separators=(',', ':')
+    ).encode()
+
+
+def compress(request, response):
+    """Сжимает большой ответ brotli или gzip, если клиент их принимает.
+
+    Brotli доступен, только если установлен пакет brotli.
+    """
+    if len(response.content) < settings.NOTES_API_COMPRESS_OVER:
+        return response
+    patch_vary_headers(response, ('Accept-Encoding',))
+    encoding = preferred_encoding(
+        request.META.get('HTTP_ACCEPT_ENCODING', ''),
+        ('br', 'gzip') if brotli is not None else ('gzip',)
+    )
+    if encoding == 'br':
+        content = brotli.compress(response.content)
+    elif encoding == 'gzip':
+        content = gzip.compress(
+            response.content, compresslevel=6, mtime=0
+        )
+    else:
+        return response
+    response.content = content
+    response['Content-Encoding'] = encoding
+    response['Content-Length'] = str(len(content))
+    return response
+
+
+def api_response(request, payload, status=200):
+    """JSON-ответ API, при необходимости сжатый."""
+    response = HttpResponse(
+        dumps(payload), status=status, content_type='application/json'
+    )
+    return compress(request, response)
@@ -0,0 +1,77 @@
+import re
+from functools import lru_cache
+
+from django.db.models import Q
+
+SLUG_ATTEMPTS = 5
+SUFFIX_RESERVE = 8
+
+
+@lru_cache(maxsize=4096)
+def transliterate(title):
+    """Транслитерация заголовка, повторяющиеся заголовки из кэша.
+
+    pytils импортируется при первом вызове, а не при запуске.
+    """
+    from pytils.translit import slugify
+
+    return slugify(title)
+
+
+def slug_stem(base, max_length):
+    """Часть slug перед суффиксом -N, чтобы суффикс влез в max_length."""
+    return base[:max_length - SUFFIX_RESERVE]
+
+
+def taken_slugs_filter(base, max_length):
+    """Условие на base и все base-N, которое обслуживает индекс по slug."""
+    stem = slug_stem(base, max_length)
+    return Q(slug=base) | Q(slug__gt=f'{stem}-', slug__lt=f'{stem}.')
+
+
+def next_free_slug(base, taken, max_length):
+    """Возвращает base или base-N с номером больше всех занятых."""
+    if base not in taken:
+        return base
+    stem = slug_stem(base, max_length)
+    suffix = re.compile(rf'^{re.escape(stem)}-(\d+)$')
+    numbers = [
+        int(match.group(1))
+        for match in map(suffix.match, taken) if match
+    ]
+    return f'{stem}-{max(numbers, default=0) + 1}'
+
+
+def allocate_slug(queryset, base, max_length):
+    """Находит свободный slug одним запросом по индексу."""
+    taken = set(
+        queryset.filter(
+            taken_slugs_filter(base, max_length)
+        ).values_list('slug', flat=True)
+    )
+    return next_free_slug(base, taken, max_length)
+
+
+def allocate_slugs(queryset, bases, max_length):
+    """Подбирает slug для пачки заметок.
+
+    Один запрос проверяет все slug пачки сразу, отдельный запрос
+    нужен только для каждого занятого slug.
+    """
+    taken = set(
+        queryset.filter(slug__in=set(bases)).values_list('slug', flat=True)
+    )
+    probed = set()
+    slugs = []
+    for base in bases:
+        if base in taken and base not in probed:
+            taken.update(
+                queryset.filter(
+                    taken_slugs_filter(base, max_length)
+                ).values_list('slug', flat=True)
+            )
+            probed.add(base)
+        slug = next_free_slug(base, taken, max_length)
+        taken.add(slug)
+        slugs.append(slug)
+    return slugs
@@ -0,0 +1,126 @@
+"""Замеры запуска проекта: импорт модулей и AppConfig.ready().
+
+Запуск в отдельном процессе, чтобы импорты шли с нуля:
+    python -X importtime -m notes.startup
+
+В stdout печатается JSON с временем django.setup(), импорта
+URLConf и ready() каждого приложения; строки -X importtime
+интерпретатор пишет в stderr, их разбирает parse_import_times().
+"""
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+from importlib import import_module
+
+IMPORT_LINE = re.compile(
+    r'^import time:\s+(?P<self>\d+)\s+\|\s+(?P<cumulative>\d+)\s+\|'
+    r'(?P<indent>\s*)(?P<module>\S+)\s*$'
+)
+
+
+def elapsed_ms(started):
+    return round((time.perf_counter() - started) * 1000, 3)
+
+
+@contextmanager
+def timed_ready(timings):
+    """Замеряет ready() приложений, созданных внутри блока.
+
+    AppConfig.create подменяется, и ready() каждого созданного
+    приложения пишет своё время в timings[label] в миллисекундах.
+    """
+    from django.apps import AppConfig
+
+    create = AppConfig.create
+
+    def timed_create(entry):
+        config = create(entry)
+        ready = config.ready
+
+        def timed():
+            started = time.perf_counter()
+            try:
+                ready()
+            finally:
+                timings[config.label] = elapsed_ms(started)
+
+        config.ready = timed
+        return config
+
+    AppConfig.create = timed_create
+    try:
+        yield timings
+    finally:
+        AppConfig.create = create
+
+
+def profile_setup():
+    """Настраивает Django в текущем процессе и возвращает замеры."""
+    import django
+    from django.conf import settings
+
+    ready = {}
+    started = time.perf_counter()
+    with timed_ready(ready):
+        django.setup()
+    setup_ms = elapsed_ms(started)
+    started = time.perf_counter()
+    import_module(settings.ROOT_URLCONF)
+    return {
+        'setup_ms': setup_ms,
+        'urlconf_ms': elapsed_ms(started),
+        'ready_ms': ready,
+    }
+
+
+def parse_import_times(lines):
+    """Разбирает вывод -X importtime в список замеров по модулям.
+
+    depth - вложенность импорта: 0 у модулей, которые импортировал
+    сам запускаемый код.
+    """
+    imports = []
+    for line in lines:
+        match = IMPORT_LINE.match(line)
+        if match is None:
+            continue
+        imports.append({
+            'module': match['module'],
+            'self_ms': int(match['self']) / 1000,
+            'cumulative_ms': int(match['cumulative']) / 1000,
+            'depth': max(0, len(match['indent']) - 1) // 2,
+        })
+    return imports
+
+
+def top_imports(imports, top=20, key='cumulative_ms'):
+    """Самые долгие импорты по key."""
+    return sorted(imports, key=lambda row: row[key], reverse=True)[:top]
+
+
+def run_profile(env=None):
+    """Замеры запуска в чистом интерпретаторе с -X importtime.
+
+    env дополняет окружение текущего процесса, из которого берётся
+    и DJANGO_SETTINGS_MODULE.
+    """
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-m', 'notes.startup'],
+        capture_output=True, text=True, check=True,
+        env={**os.environ, **(env or {})}
+    )
+    report = json.loads(result.stdout)
+    report['imports'] = parse_import_times(result.stderr.splitlines())
+    report['imports_ms'] = round(
+        sum(row['self_ms'] for row in report['imports']), 3
+    )
+    return report
+
+
+if __name__ == '__main__':
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yanote.settings')
+    print(json.dumps(profile_setup()))
@@ -0,0 +1,152 @@
+"""Статика без отдельного веб-сервера.
+
+collectstatic через CompressedManifestStaticFilesStorage (включается
+NOTES_STATIC_MANIFEST=1) кладёт в STATIC_ROOT файлы с хешем содержимого
+в имени и рядом их сжатые копии .gz и, если установлен brotli, .br;
+обработчики WSGI/ASGI отдают эти файлы сами, до middleware, с вечным
+кэшем для хешированных имён.
+"""
+import gzip
+import mimetypes
+import os
+from functools import cached_property
+from http import HTTPStatus
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.staticfiles.handlers import (
+    ASGIStaticFilesHandler, StaticFilesHandler
+)
+from django.contrib.staticfiles.storage import (
+    ManifestStaticFilesStorage, staticfiles_storage
+)
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import patch_vary_headers
+from django.utils.http import quote_etag
+
+from .encodings import preferred_encoding
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE = ('.css', '.js', '.mjs', '.svg', '.json', '.map', '.txt')
+COMPRESS_OVER = 256
+# Сжатая копия нужна, только если она заметно меньше оригинала.
+COMPRESS_RATIO = 0.95
+ENCODINGS = {'br': '.br', 'gzip': '.gz'}
+IMMUTABLE = 'public, max-age=31536000, immutable'
+
+
+def compressed_variants(data):
+    """Сжатые копии содержимого файла: {расширение: байты}."""
+    variants = {'.gz': gzip.compress(data, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variants['.br'] = brotli.compress(data)
+    return {
+        suffix: content for suffix, content in variants.items()
+        if len(content) < len(data) * COMPRESS_RATIO
+    }
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """Хеширующее хранилище, которое ещё и сжимает собранные файлы.
+
+    Сжимаются и исходные, и хешированные имена: первые нужны тем,
+    кто ссылается на файл без {% static %}.
+    """
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run=dry_run, **options)
+        if dry_run:
+            return
+        for name in sorted({*paths, *self.hashed_files.values()}):
+            self.compress(name)
+
+    def compress(self, name):
+        if not name.endswith(COMPRESSIBLE):
+            return
+        data = Path(self.path(name)).read_bytes()
+        if len(data) < COMPRESS_OVER:
+            return
+        for suffix, content in compressed_variants(data).items():
+            Path(self.path(name + suffix)).write_bytes(content)
+
+
+class StaticFilesMixin:
+    """Отдача файлов из STATIC_ROOT вместо поиска по finders.
+
+    Если клиент принимает br или gzip и рядом лежит сжатая копия,
+    отдаётся она. FileResponse передаёт открытый файл серверу через
+    wsgi.file_wrapper, и тот может отправить его sendfile без
+    копирования в Python.
+    """
+
+    @cached_property
+    def immutable_names(self):
+        """Имена с хешем содержимого из манифеста collectstatic."""
+        hashed = getattr(staticfiles_storage, 'hashed_files', {})
+        return frozenset(hashed.values())
+
+    def find_file(self, name, accepted):
+        """Путь к файлу и кодировка лучшего варианта для клиента."""
+        try:
+            path = safe_join(settings.STATIC_ROOT, name)
+        except SuspiciousFileOperation:
+            raise Http404(name)
+        encoding = preferred_encoding(accepted, [
+            encoding for encoding, suffix in ENCODINGS.items()
+            if os.path.isfile(path + suffix)
+        ])
+        if encoding is not None:
+            return path + ENCODINGS[encoding], encoding
+        if not os.path.isfile(path):
+            raise Http404(name)
+        return path, None
+
+    def serve(self, request):
+        if request.method not in ('GET', 'HEAD'):
+            return HttpResponse(status=HTTPStatus.METHOD_NOT_ALLOWED)
+        name = self.file_path(request.path).replace(os.sep, '/')
+        path, encoding = self.find_file(
+            name, request.headers.get('Accept-Encoding', '')
+        )
+        stat = os.stat(path)
+        etag = quote_etag(f'{stat.st_mtime_ns:x}-{stat.st_size:x}')
+        if request.headers.get('If-None-Match') == etag:
+            response = HttpResponse(status=HTTPStatus.NOT_MODIFIED)
+        else:
+            content_type, _ = mimetypes.guess_type(name)
+            response = FileResponse(
+                open(path, 'rb'),
+                content_type=content_type or 'application/octet-stream'
+            )
+            del response['Content-Disposition']
+            if encoding:
+                response['Content-Encoding'] = encoding
+        response['ETag'] = etag
+        response['Cache-Control'] = (
+            IMMUTABLE if name in self.immutable_names
+            else f'public, max-age={settings.NOTES_STATIC_MAX_AGE}'
+        )
+        if name.endswith(COMPRESSIBLE):
+            patch_vary_headers(response, ('Accept-Encoding',))
+        return response
+
+
+class StaticFilesApp(StaticFilesMixin, StaticFilesHandler):
+    """WSGI-обёртка приложения, отдающая STATIC_URL из STATIC_ROOT."""
+
+
+class ASGIStaticFilesApp(StaticFilesMixin, ASGIStaticFilesHandler):
+    """ASGI-обёртка приложения, отдающая STATIC_URL из STATIC_ROOT."""
+
+
+def serve_static(application, handler):
+    """Оборачивает приложение handler-ом, если NOTES_STATIC_SERVE."""
+    if settings.NOTES_STATIC_SERVE:
+        return handler(application)
+    return application
@@ -0,0 +1,138 @@
+import re
+
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.models import Count, Prefetch
+
+from .cache import invalidate_notes_list
+from .models import NoteTag, Tag
+
+MAX_TAGS = 20
+TAG_LENGTH = Tag._meta.get_field('name').max_length
+LINK_TABLE = NoteTag._meta.db_table
+TAG_TABLE = Tag._meta.db_table
+
+TRIGGERS = {
+    f'{LINK_TABLE}_count_insert': (
+        f'AFTER INSERT ON {LINK_TABLE} BEGIN '
+        f'UPDATE {TAG_TABLE} SET note_count = note_count + 1 '
+        'WHERE id = new.tag_id; END'
+    ),
+    f'{LINK_TABLE}_count_delete': (
+        f'AFTER DELETE ON {LINK_TABLE} BEGIN '
+        f'UPDATE {TAG_TABLE} SET note_count = note_count - 1 '
+        'WHERE id = old.tag_id; END'
+    ),
+    f'{LINK_TABLE}_count_update': (
+        f'AFTER UPDATE OF tag_id ON {LINK_TABLE} BEGIN '
+        f'UPDATE {TAG_TABLE} SET note_count = note_count - 1 '
+        'WHERE id = old.tag_id; '
+        f'UPDATE {TAG_TABLE} SET note_count = note_count + 1 '
+        'WHERE id = new.tag_id; END'
+    ),
+}
+
+
+def normalize_tags(names):
+    """Приводит названия тегов к нижнему регистру без повторов."""
+    tags = []
+    for name in names:
+        name = ' '.join(name.split()).lower()[:TAG_LENGTH]
+        if name and name not in tags:
+            tags.append(name)
+    return tags
+
+
+def parse_tags(value):
+    """Разбирает строку тегов через запятую."""
+    return normalize_tags(re.split(r'[,;]', value or ''))
+
+
+def read_tag_filter(params):
+    """Фильтр списка из ?tag=...&tag=...&match=any|all."""
+    names = normalize_tags(params.getlist('tag'))[:MAX_TAGS]
+    return names, params.get('match') != 'any'
+
+
+def ensure_tag_triggers(using=DEFAULT_DB_ALIAS, **kwargs):
+    """Создаёт триггеры счётчиков тегов, если их нет.
+
+    Как и триггеры поиска, их нужно вернуть после пересоздания
+    таблицы миграцией; счётчики при этом пересчитываются.
+    """
+    connection = connections[using]
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        if LINK_TABLE not in connection.introspection.table_names(cursor):
+            return
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'trigger' "
+            'AND tbl_name = %s',
+            (LINK_TABLE,)
+        )
+        existing = {name for name, in cursor.fetchall()}
+        missing = [name for name in TRIGGERS if name not in existing]
+        if not missing:
+            return
+        with transaction.atomic(using=using):
+            for name in missing:
+                cursor.execute(f'CREATE TRIGGER {name} {TRIGGERS[name]}')
+            Tag.objects.using(using).recount()
+
+
+def set_note_tags(note, names, current=()):
+    """Приводит теги заметки к names; current - её теги до правки.
+
+    Счётчики тегов меняют триггеры на связях, а не этот код.
+    """
+    names, current = set(names), set(current)
+    added, removed = names - current, current - names
+    if not added and not removed:
+        return False
+    with transaction.atomic(savepoint=False):
+        if removed:
+            NoteTag.objects.filter(
+                note=note, tag__author_id=note.author_id,
+                tag__name__in=removed
+            ).delete()
+        if added:
+            Tag.objects.bulk_create(
+                [Tag(author_id=note.author_id, name=name) for name in added],
+                ignore_conflicts=True
+            )
+            NoteTag.objects.bulk_create(
+                [
+                    NoteTag(note=note, tag=tag)
+                    for tag in Tag.objects.filter(
+                        author_id=note.author_id, name__in=added
+                    )
+                ],
+                ignore_conflicts=True
+            )
+        invalidate_notes_list(note.author_id)
+    return True
+
+
+def filter_by_tags(queryset, author_id, names, match_all=True):
+    """Заметки с тегами names: со всеми сразу или хотя бы с одним.
+
+    Отбор - один подзапрос по индексу (tag, note): для «любого» тега
+    это просто список заметок, для «всех» - группировка по заметке.
+    """
+    if not names:
+        return queryset
+    links = NoteTag.objects.filter(
+        tag__author_id=author_id, tag__name__in=names
+    )
+    if match_all:
+        links = links.values('note').annotate(
+            matched=Count('tag')
+        ).filter(matched=len(names))
+    return queryset.filter(pk__in=links.values('note'))
+
+
+def prefetch_tags(queryset):
+    """Загружает теги заметок одним запросом на страницу."""
+    return queryset.prefetch_related(
+        Prefetch('tags', queryset=Tag.objects.only('id', 'name'))
+    )
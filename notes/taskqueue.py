@@ -0,0 +1,357 @@
+import atexit
+import logging
+import queue
+import threading
+import time
+from collections import Counter, deque
+from itertools import count
+from datetime import timedelta
+from statistics import quantiles
+
+from django.conf import settings
+from django.db import IntegrityError, close_old_connections, transaction
+from django.db.models import Exists, F, OuterRef
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+LATENCY_SAMPLES = 1000
+LEASE_EXPIRED = 'Исполнитель не завершил задачу за NOTES_TASK_LEASE.'
+
+TASKS = {}
+
+
+def task(func):
+    """Регистрирует функцию как задачу очереди под её именем."""
+    TASKS[func.__name__] = func
+    return func
+
+
+def make_job(name, kwargs, key=None, order=None):
+    return {
+        'name': name,
+        'kwargs': kwargs,
+        'key': key,
+        'order': order,
+        'enqueued_at': time.time(),
+        'attempts': 0,
+    }
+
+
+def retry_delay(attempts):
+    """Пауза перед повтором: удваивается с каждой попыткой."""
+    return settings.NOTES_TASK_RETRY_DELAY * 2 ** (attempts - 1)
+
+
+class QueueMetrics:
+    """Счётчики и задержка от постановки задачи до её запуска."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.counters = Counter()
+            self.latencies = deque(maxlen=LATENCY_SAMPLES)
+
+    def count(self, name):
+        with self._lock:
+            self.counters[name] += 1
+
+    def started(self, job):
+        with self._lock:
+            self.latencies.append(
+                (time.time() - job['enqueued_at']) * 1000
+            )
+
+    def report(self):
+        with self._lock:
+            latencies = sorted(self.latencies)
+            counters = dict(self.counters)
+        report = {
+            name: counters.get(name, 0)
+            for name in ('enqueued', 'deduplicated', 'done', 'retried',
+                         'failed')
+        }
+        if latencies:
+            cuts = quantiles(latencies, n=100) if len(latencies) > 1 else (
+                latencies * 99
+            )
+            report['latency_ms'] = {
+                'p50': round(cuts[49], 3),
+                'p95': round(cuts[94], 3),
+                'p99': round(cuts[98], 3),
+            }
+        return report
+
+
+class BaseBackend:
+    """Общее для очередей: запуск задачи и учёт результата."""
+
+    def __init__(self):
+        self.metrics = QueueMetrics()
+
+    def run(self, job):
+        """Выполняет задачу, возвращает текст ошибки или None."""
+        self.metrics.started(job)
+        job['attempts'] += 1
+        try:
+            TASKS[job['name']](**job['kwargs'])
+        except Exception as error:
+            logger.exception('Задача %s упала', job['name'])
+            if job['attempts'] < settings.NOTES_TASK_MAX_ATTEMPTS:
+                self.metrics.count('retried')
+            else:
+                self.metrics.count('failed')
+            return repr(error)
+        self.metrics.count('done')
+        return None
+
+    def stats(self):
+        return {'backend': self.name, 'depth': self.depth(),
+                **self.metrics.report()}
+
+
+class InlineBackend(BaseBackend):
+    """Выполняет задачу сразу, в том же потоке и транзакции."""
+    name = 'inline'
+
+    def enqueue(self, job):
+        self.metrics.count('enqueued')
+        while self.run(job) and (
+            job['attempts'] < settings.NOTES_TASK_MAX_ATTEMPTS
+        ):
+            pass
+
+    def depth(self):
+        return 0
+
+
+class ThreadBackend(BaseBackend):
+    """Очередь в памяти процесса с пулом рабочих потоков.
+
+    Задача попадает в очередь после коммита транзакции, в которой её
+    поставили. Пока задача с тем же ключом ждёт в очереди, повторная
+    постановка пропускается. У каждого потока своя очередь: задачи с
+    одним order идут в одну и выполняются в порядке постановки, а
+    упавшая повторяется сразу на месте. При выходе процесс ждёт
+    выполнения очереди не дольше NOTES_TASK_DRAIN_TIMEOUT; не
+    успевшие задачи теряются, их сохраняет только очередь в базе.
+    """
+    name = 'thread'
+
+    def __init__(self):
+        super().__init__()
+        self.queues = [
+            queue.Queue() for _ in range(settings.NOTES_TASK_WORKERS)
+        ]
+        self.turns = count()
+        self.pending = set()
+        self.lock = threading.Lock()
+        self.workers = []
+
+    def enqueue(self, job):
+        transaction.on_commit(lambda: self.put(job))
+
+    def put(self, job):
+        with self.lock:
+            if job['key'] is not None:
+                if job['key'] in self.pending:
+                    self.metrics.count('deduplicated')
+                    return
+                self.pending.add(job['key'])
+            if not self.workers:
+                self.start()
+            turn = next(self.turns) if job['order'] is None else hash(
+                job['order']
+            )
+        self.metrics.count('enqueued')
+        self.queues[turn % len(self.queues)].put(job)
+
+    def start(self):
+        for number, jobs in enumerate(self.queues):
+            worker = threading.Thread(
+                target=self.work, args=(jobs,), name=f'notes-tasks-{number}',
+                daemon=True
+            )
+            worker.start()
+            self.workers.append(worker)
+        atexit.register(self.drain)
+
+    def work(self, jobs):
+        while True:
+            job = jobs.get()
+            with self.lock:
+                self.pending.discard(job['key'])
+            try:
+                while self.run(job) and (
+                    job['attempts'] < settings.NOTES_TASK_MAX_ATTEMPTS
+                ):
+                    time.sleep(retry_delay(job['attempts']))
+            finally:
+                close_old_connections()
+                jobs.task_done()
+
+    def join(self):
+        """Ждёт, пока очереди опустеют; для тестов и бенчмарков."""
+        for jobs in self.queues:
+            jobs.join()
+
+    def drain(self, timeout=None):
+        """Ждёт выполнения очереди не дольше timeout секунд.
+
+        Возвращает False, если задачи остались.
+        """
+        if timeout is None:
+            timeout = settings.NOTES_TASK_DRAIN_TIMEOUT
+        deadline = time.monotonic() + timeout
+        for jobs in self.queues:
+            with jobs.all_tasks_done:
+                while jobs.unfinished_tasks and time.monotonic() < deadline:
+                    jobs.all_tasks_done.wait(deadline - time.monotonic())
+        left = sum(jobs.unfinished_tasks for jobs in self.queues)
+        if left:
+            logger.warning('Задач не выполнено до выхода: %s', left)
+        return not left
+
+    def depth(self):
+        return sum(jobs.qsize() for jobs in self.queues)
+
+
+class DatabaseBackend(BaseBackend):
+    """Очередь в таблице QueuedTask, которую разбирает manage.py run_tasks.
+
+    Строка задачи пишется в той же транзакции, что и заметка, поэтому
+    задача не теряется ни при откате, ни при падении процесса: взятая
+    задача, не завершённая за NOTES_TASK_LEASE, возвращается в очередь.
+    Задача с order не берётся, пока не выполнена более ранняя с тем же
+    order, в том числе ждущая повтора.
+    """
+    name = 'database'
+
+    def enqueue(self, job):
+        from .models import QueuedTask
+
+        try:
+            with transaction.atomic():
+                QueuedTask.objects.create(
+                    name=job['name'], kwargs=job['kwargs'],
+                    dedupe_key=job['key'], order_key=job['order'],
+                )
+        except IntegrityError:
+            self.metrics.count('deduplicated')
+        else:
+            self.metrics.count('enqueued')
+
+    def claim(self):
+        """Забирает самую старую готовую задачу, помечая её running."""
+        from .models import QueuedTask
+
+        now = timezone.now()
+        with transaction.atomic():
+            self.reclaim_expired(now)
+            earlier = QueuedTask.objects.filter(
+                order_key=OuterRef('order_key'), id__lt=OuterRef('id'),
+                status__in=(QueuedTask.PENDING, QueuedTask.RUNNING),
+            )
+            row = QueuedTask.objects.filter(
+                status=QueuedTask.PENDING, run_after__lte=now
+            ).exclude(Exists(earlier)).order_by('run_after', 'id').first()
+            if row is not None:
+                row.status, row.claimed_at = QueuedTask.RUNNING, now
+                row.save(update_fields=['status', 'claimed_at'])
+        return row
+
+    def reclaim_expired(self, now):
+        """Возвращает в очередь задачи, чей исполнитель пропал.
+
+        Пропавший запуск считается упавшей попыткой. Если такая же
+        задача уже ждёт, просроченная строка просто удаляется.
+        """
+        from .models import QueuedTask
+
+        expired = QueuedTask.objects.filter(
+            status=QueuedTask.RUNNING,
+            claimed_at__lt=now - timedelta(seconds=settings.NOTES_TASK_LEASE),
+        )
+        expired.filter(dedupe_key__in=QueuedTask.objects.filter(
+            status=QueuedTask.PENDING
+        ).values('dedupe_key')).delete()
+        lost = {
+            'attempts': F('attempts') + 1, 'last_error': LEASE_EXPIRED,
+            'claimed_at': None,
+        }
+        expired.filter(
+            attempts__gte=settings.NOTES_TASK_MAX_ATTEMPTS - 1
+        ).update(status=QueuedTask.FAILED, **lost)
+        expired.update(status=QueuedTask.PENDING, run_after=now, **lost)
+
+    def run_next(self):
+        """Выполняет одну задачу из таблицы, False - если задач нет."""
+        row = self.claim()
+        if row is None:
+            return False
+        job = {
+            'name': row.name,
+            'kwargs': row.kwargs,
+            'key': row.dedupe_key,
+            'order': row.order_key,
+            'enqueued_at': row.enqueued_at.timestamp(),
+            'attempts': row.attempts,
+        }
+        error = self.run(job)
+        if error is None:
+            row.delete()
+            return True
+        row.attempts, row.last_error = job['attempts'], error
+        if row.attempts < settings.NOTES_TASK_MAX_ATTEMPTS:
+            row.status = row.PENDING
+            row.run_after = timezone.now() + timedelta(
+                seconds=retry_delay(row.attempts)
+            )
+        else:
+            row.status = row.FAILED
+        try:
+            with transaction.atomic():
+                row.save()
+        except IntegrityError:
+            # Пока задача выполнялась, поставили такую же.
+            row.delete()
+        return True
+
+    def depth(self):
+        from .models import QueuedTask
+
+        return QueuedTask.objects.filter(status=QueuedTask.PENDING).count()
+
+
+BACKENDS = {
+    backend.name: backend
+    for backend in (InlineBackend, ThreadBackend, DatabaseBackend)
+}
+_backends = {}
+_backends_lock = threading.Lock()
+
+
+def get_backend(name=None):
+    """Очередь из NOTES_TASK_BACKEND, одна на процесс."""
+    name = name or settings.NOTES_TASK_BACKEND
+    with _backends_lock:
+        if name not in _backends:
+            _backends[name] = BACKENDS[name]()
+        return _backends[name]
+
+
+def enqueue(name, key=None, order=None, **kwargs):
+    """Ставит задачу name(**kwargs) в очередь.
+
+    Задача с ключом key не ставится повторно, пока такая же ждёт.
+    Задачи с одним order выполняются по одной в порядке постановки.
+    """
+    get_backend().enqueue(make_job(name, kwargs, key, order))
+
+
+def queue_stats():
+    """Глубина очереди, счётчики и задержка запуска задач."""
+    return get_backend().stats()
@@ -0,0 +1,43 @@
+from django.db import DEFAULT_DB_ALIAS
+
+from .models import Note, NoteRevision
+from .taskqueue import task
+
+
+@task
+def record_revision(note_id, title=None, text=None):
+    """Записывает ревизию по снимку заметки из задачи.
+
+    Задачи, поставленные без снимка, берут текущее состояние. Всё
+    читается из основной базы: задача выполняется вне запроса, и
+    роутер отправил бы её на отстающую реплику. Повторный запуск
+    ничего не добавляет: неизменённая заметка новой ревизии не
+    получает.
+    """
+    notes = Note.objects.using(DEFAULT_DB_ALIAS).filter(pk=note_id)
+    if text is None:
+        note = notes.with_text().first()
+    else:
+        note = notes.only('id').first()
+        if note is not None:
+            note.title, note.text = title, text
+    if note is not None:
+        NoteRevision.objects.db_manager(DEFAULT_DB_ALIAS).record(note)
+
+
+@task
+def record_revisions(note_ids, title=None, text=None):
+    """Записывает ревизии заметок после пакетного изменения.
+
+    title и text - общие новые значения из изменения; остальное
+    читается из основной базы, как и в record_revision.
+    """
+    notes = Note.objects.using(DEFAULT_DB_ALIAS).filter(pk__in=note_ids)
+    notes = notes.with_text() if text is None else notes.only('id', 'title')
+    notes = list(notes)
+    for note in notes:
+        if title is not None:
+            note.title = title
+        if text is not None:
+            note.text = text
+    NoteRevision.objects.db_manager(DEFAULT_DB_ALIAS).record_many(notes)
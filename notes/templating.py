@@ -0,0 +1,30 @@
+from pathlib import Path
+
+from django.conf import settings
+from django.template import engines
+from django.template.backends.django import DjangoTemplates
+
+LEAN_ENGINE = 'lean'
+
+
+def warm_up_templates():
+    """Компилирует шаблоны проекта в кэш загрузчика каждого движка.
+
+    Так первый запрос к странице не тратит время на разбор шаблона.
+    Возвращает число скомпилированных шаблонов.
+    """
+    compiled = 0
+    for engine in engines.all():
+        if not isinstance(engine, DjangoTemplates):
+            continue
+        for directory in map(Path, engine.template_dirs):
+            for path in sorted(directory.rglob('*.html')):
+                engine.get_template(path.relative_to(directory).as_posix())
+                compiled += 1
+    return compiled
+
+
+def warm_up_on_startup():
+    """Прогрев при запуске приложения, если он включён настройкой."""
+    if settings.NOTES_TEMPLATE_WARMUP:
+        warm_up_templates()
@@ -1,15 +1,46 @@
+from django.conf import settings
 from django.urls import path
 
-from notes import views
+from notes import api, async_views, views
 
 app_name = 'notes'
 
+if settings.NOTES_ASYNC_VIEWS:
+    NotesList = async_views.AsyncNotesList
+    NoteDetail = async_views.AsyncNoteDetail
+else:
+    NotesList, NoteDetail = views.NotesList, views.NoteDetail
+
 urlpatterns = [
     path('', views.Home.as_view(), name='home'),
     path('add/', views.NoteCreate.as_view(), name='add'),
     path('edit/<slug:slug>/', views.NoteUpdate.as_view(), name='edit'),
-    path('note/<slug:slug>/', views.NoteDetail.as_view(), name='detail'),
+    path('note/<slug:slug>/', NoteDetail.as_view(), name='detail'),
     path('delete/<slug:slug>/', views.NoteDelete.as_view(), name='delete'),
-    path('notes/', views.NotesList.as_view(), name='list'),
+    path(
+        'note/<slug:slug>/revisions/',
+        views.NoteRevisionList.as_view(),
+        name='revisions'
+    ),
+    path(
+        'note/<slug:slug>/revisions/<int:number>/',
+        views.NoteRevisionRestore.as_view(),
+        name='revision'
+    ),
+    path('notes/', NotesList.as_view(), name='list'),
+    path('search/', views.NoteSearch.as_view(), name='search'),
+    path('export/', views.NoteExport.as_view(), name='export'),
+    path('import/', views.NoteImport.as_view(), name='import'),
+    path(
+        'batch/delete/', views.NoteBatchDelete.as_view(), name='batch_delete'
+    ),
+    path(
+        'batch/update/', views.NoteBatchUpdate.as_view(), name='batch_update'
+    ),
     path('done/', views.NoteSuccess.as_view(), name='success'),
+    path('api/notes/', api.NoteApiList.as_view(), name='api_list'),
+    path(
+        'api/notes/<slug:slug>/', api.NoteApiDetail.as_view(),
+        name='api_detail'
+    ),
 ]
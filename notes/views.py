@@ -1,15 +1,47 @@
+from functools import partial
+from http import HTTPStatus
+
+from django.conf import settings
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+from django.db.models.functions import Length
+from django.http import Http404, JsonResponse, StreamingHttpResponse
+from django.shortcuts import redirect
 from django.urls import reverse_lazy
+from django.utils.decorators import method_decorator
 from django.views import generic
+from django.views.decorators.http import condition
 
-from .forms import NoteForm
-from .models import Note
+from .bulk import (
+    delete_batch, export_notes, import_notes, read_batch, update_batch
+)
+from .cache import get_or_set, list_cache_key
+from .conditional import note_etag, note_last_modified, notes_list_etag
+from .forms import WARNING, NoteForm
+from .listing import filter_notes_list, list_query, read_list_params
+from .models import Note, NoteRevision, NoteStats, Tag
+from .pagination import CursorPaginationMixin
+from .ratelimit import rate_limit
+from .search import search_notes
+from .templating import LEAN_ENGINE
 
 
 class Home(generic.TemplateView):
     """Домашняя страница."""
     template_name = 'notes/home.html'
 
+    def get_context_data(self, **kwargs):
+        """Сводка по заметкам берётся из одной строки NoteStats."""
+        context = super().get_context_data(**kwargs)
+        user = self.request.user
+        if user.is_authenticated:
+            context['note_stats'] = (
+                NoteStats.objects.filter(user=user).first()
+                or NoteStats(user=user)
+            )
+        return context
+
 
 class NoteSuccess(LoginRequiredMixin, generic.TemplateView):
     """Страница успешного выполнения операции."""
@@ -20,40 +52,236 @@ class NoteBase(LoginRequiredMixin):
     """Базовый класс для остальных CBV."""
     model = Note
     success_url = reverse_lazy('notes:success')
+    load_text = False
 
     def get_queryset(self):
-        """Пользователь может работать только со своими заметками."""
-        return self.model.objects.filter(author=self.request.user)
+        """Пользователь может работать только со своими заметками.
 
+        Текст загружается только представлениями с load_text.
+        """
+        queryset = self.model.objects.filter(author=self.request.user)
+        if self.load_text:
+            return queryset.with_text()
+        return queryset.without_text()
 
-class NoteCreate(NoteBase, generic.CreateView):
-    """Добавление заметки."""
+
+class NoteFormMixin(NoteBase):
+    """Общее для создания и редактирования заметки."""
     template_name = 'notes/form.html'
     form_class = NoteForm
 
     def form_valid(self, form):
-        new_note = form.save(commit=False)
-        new_note.author = self.request.user
-        new_note.save()
+        """Slug, занятый параллельным запросом, - ошибка формы."""
+        try:
+            with transaction.atomic():
+                return super().form_valid(form)
+        except IntegrityError:
+            form.add_error('slug', form.cleaned_data['slug'] + WARNING)
+            return self.form_invalid(form)
+
+
+@method_decorator(rate_limit('notes-write'), name='dispatch')
+class NoteCreate(NoteFormMixin, generic.CreateView):
+    """Добавление заметки."""
+    query_budget = 13
+
+    def form_valid(self, form):
+        form.instance.author = self.request.user
         return super().form_valid(form)
 
 
-class NoteUpdate(NoteBase, generic.UpdateView):
+@method_decorator(rate_limit('notes-write'), name='dispatch')
+class NoteUpdate(NoteFormMixin, generic.UpdateView):
     """Редактирование заметки."""
-    template_name = 'notes/form.html'
-    form_class = NoteForm
+    query_budget = 15
+    load_text = True
 
 
+@method_decorator(rate_limit('notes-write'), name='dispatch')
 class NoteDelete(NoteBase, generic.DeleteView):
     """Удаление заметки."""
     template_name = 'notes/delete.html'
+    query_budget = 7
 
 
-class NotesList(NoteBase, generic.ListView):
+@method_decorator(condition(etag_func=notes_list_etag), name='get')
+class NotesList(CursorPaginationMixin, NoteBase, generic.ListView):
     """Список всех заметок пользователя."""
     template_name = 'notes/list.html'
+    template_engine = LEAN_ENGINE
+    query_budget = 6
+    paginate_by = 50
 
+    def get_queryset(self):
+        """Для списка текст заметок не нужен, теги - одним запросом."""
+        self.list_params = read_list_params(self.request.GET)
+        self.list_query = list_query(**self.list_params)
+        return filter_notes_list(
+            super().get_queryset(), self.request.user.pk, **self.list_params
+        )
 
+    def get_sort(self):
+        return self.list_params['sort']
+
+    def paginate_queryset(self, queryset, page_size):
+        """Страница списка берётся из кэша, пока заметки не менялись."""
+        self.list_cache_key = list_cache_key(
+            self.request.user.pk, self.get_cursor(), self.list_query
+        )
+        result, self.list_cache_hit = get_or_set(
+            self.list_cache_key,
+            partial(super().paginate_queryset, queryset, page_size),
+        )
+        return result
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['list_cache_key'] = self.list_cache_key
+        context['list_cache_timeout'] = settings.NOTES_LIST_CACHE_TIMEOUT
+        context.update(self.list_params)
+        context['list_query'] = self.list_query
+        # Ленивый запрос: выполнится, только если фрагмент не в кэше.
+        context['user_tags'] = Tag.objects.filter(
+            author=self.request.user, note_count__gt=0
+        ).only('name', 'note_count')
+        return context
+
+    def get(self, request, *args, **kwargs):
+        response = super().get(request, *args, **kwargs)
+        response['X-Notes-List-Cache'] = (
+            'hit' if self.list_cache_hit else 'miss'
+        )
+        return response
+
+
+@method_decorator(
+    condition(etag_func=note_etag, last_modified_func=note_last_modified),
+    name='get'
+)
 class NoteDetail(NoteBase, generic.DetailView):
     """Заметка подробно."""
     template_name = 'notes/detail.html'
+    template_engine = LEAN_ENGINE
+    query_budget = 4
+    load_text = True
+
+
+class NoteSearch(NoteBase, generic.ListView):
+    """Полнотекстовый поиск по заметкам пользователя."""
+    template_name = 'notes/search.html'
+    template_engine = LEAN_ENGINE
+    query_budget = 4
+    paginate_by = 20
+
+    def get_queryset(self):
+        """Ищем только среди своих заметок, лучшие совпадения первыми."""
+        self.query = self.request.GET.get('q', '').strip()
+        return search_notes(
+            super().get_queryset().only('id', 'slug', 'title', 'excerpt'),
+            self.query
+        )
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['query'] = self.query
+        return context
+
+
+class NoteExport(NoteBase, generic.View):
+    """Выгрузка всех заметок пользователя в JSON Lines."""
+
+    def get(self, request, *args, **kwargs):
+        response = StreamingHttpResponse(
+            export_notes(self.get_queryset()),
+            content_type='application/x-ndjson; charset=utf-8',
+        )
+        response['Content-Disposition'] = 'attachment; filename="notes.jsonl"'
+        return response
+
+
+@method_decorator(rate_limit('notes-write'), name='dispatch')
+class NoteImport(NoteBase, generic.View):
+    """Загрузка заметок из JSON Lines в теле запроса."""
+
+    def post(self, request, *args, **kwargs):
+        return JsonResponse(import_notes(request.user, request))
+
+
+class NoteBatchMixin(NoteBase):
+    """Пакетная операция над заметками из JSON в теле запроса."""
+    with_changes = False
+
+    def post(self, request, *args, **kwargs):
+        try:
+            key, values, changes = read_batch(request.body, self.with_changes)
+            results = self.apply(key, values, changes)
+        except ValidationError as error:
+            return JsonResponse(
+                {'errors': error.messages}, status=HTTPStatus.BAD_REQUEST
+            )
+        return JsonResponse({'results': results})
+
+
+@method_decorator(rate_limit('notes-write'), name='dispatch')
+class NoteBatchDelete(NoteBatchMixin, generic.View):
+    """Удаление нескольких заметок одним запросом."""
+    query_budget = 10
+
+    def apply(self, key, values, changes):
+        return delete_batch(
+            self.get_queryset(), self.request.user, key, values
+        )
+
+
+@method_decorator(rate_limit('notes-write'), name='dispatch')
+class NoteBatchUpdate(NoteBatchMixin, generic.View):
+    """Одинаковое изменение нескольких заметок одним запросом."""
+    query_budget = 11
+    with_changes = True
+
+    def apply(self, key, values, changes):
+        return update_batch(
+            self.get_queryset(), self.request.user, key, values, changes
+        )
+
+
+class NoteRevisionList(NoteBase, generic.DetailView):
+    """История изменений заметки."""
+    template_name = 'notes/revisions.html'
+    query_budget = 4
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['revisions'] = self.object.revisions.defer('data').annotate(
+            size=Length('data')
+        ).order_by('-number')
+        return context
+
+
+@method_decorator(rate_limit('notes-write'), name='dispatch')
+class NoteRevisionRestore(NoteBase, generic.DetailView):
+    """Просмотр ревизии заметки и возврат к ней."""
+    template_name = 'notes/revision.html'
+    query_budget = 8
+    load_text = True
+
+    def get_revision(self):
+        try:
+            return NoteRevision.objects.restore(
+                self.object.pk, self.kwargs['number']
+            )
+        except NoteRevision.DoesNotExist:
+            raise Http404('Ревизия не найдена.')
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['revision'] = self.get_revision()
+        return context
+
+    def post(self, request, *args, **kwargs):
+        """Возврат к ревизии сохраняется как новая ревизия."""
+        self.object = self.get_object()
+        revision = self.get_revision()
+        self.object.title, self.object.text = revision.title, revision.text
+        self.object.save()
+        return redirect('notes:detail', slug=self.object.slug)
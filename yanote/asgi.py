@@ -11,6 +11,11 @@ import os
 
 from django.core.asgi import get_asgi_application
 
+from notes.staticfiles import ASGIStaticFilesApp, serve_static
+from notes.templating import warm_up_on_startup
+
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yanote.settings')
 
-application = get_asgi_application()
+application = serve_static(get_asgi_application(), ASGIStaticFilesApp)
+
+warm_up_on_startup()
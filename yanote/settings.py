@@ -1,7 +1,10 @@
+import os
 from pathlib import Path
 
 from django.urls import reverse_lazy
 
+from yanote import sqlite
+
 BASE_DIR = Path(__file__).resolve().parent.parent
 
 SECRET_KEY = 'django-insecure-yipnj$#j!ajarq%k55z4kuf3x79)91h0h42o9!1ho(z=!%mt=#'
@@ -11,8 +14,12 @@ DEBUG = False
 ALLOWED_HOSTS = ['*']
 
 
+# Админка нужна не каждому процессу: NOTES_ADMIN=0 в окружении
+# убирает её из приложений и URL и сокращает холодный старт.
+NOTES_ADMIN = os.environ.get('NOTES_ADMIN', '1') != '0'
+
 INSTALLED_APPS = [
-    'django.contrib.admin',
+    *(['django.contrib.admin'] if NOTES_ADMIN else []),
     'django.contrib.auth',
     'django.contrib.contenttypes',
     'django.contrib.sessions',
@@ -22,6 +29,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'notes.middleware.PerformanceMiddleware',
+    'notes.middleware.ReplicaPinMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -29,15 +38,22 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'notes.middleware.LoginBusyMiddleware',
 ]
 
 ROOT_URLCONF = 'yanote.urls'
 
+TEMPLATE_LOADERS = [
+    ('django.template.loaders.cached.Loader', [
+        'django.template.loaders.filesystem.Loader',
+        'django.template.loaders.app_directories.Loader',
+    ]),
+]
+
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [BASE_DIR / 'templates'],
-        'APP_DIRS': True,
         'OPTIONS': {
             'context_processors': [
                 'django.template.context_processors.debug',
@@ -45,20 +61,144 @@ TEMPLATES = [
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
             ],
+            'loaders': TEMPLATE_LOADERS,
+        },
+    },
+    # Для страниц, которым нужен только user: views выбирают его
+    # атрибутом template_engine = 'lean'.
+    {
+        'NAME': 'lean',
+        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'DIRS': [BASE_DIR / 'templates'],
+        'OPTIONS': {
+            'context_processors': [
+                'django.contrib.auth.context_processors.auth',
+            ],
+            'loaders': TEMPLATE_LOADERS,
         },
     },
 ]
+# Компилировать шаблоны при запуске WSGI/ASGI-приложения.
+NOTES_TEMPLATE_WARMUP = True
 
 WSGI_APPLICATION = 'yanote.wsgi.application'
+ASGI_APPLICATION = 'yanote.asgi.application'
+
+# Асинхронные представления списка и заметки для запуска под ASGI.
+NOTES_ASYNC_VIEWS = False
 
 
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'OPTIONS': {
+            'transaction_mode': 'IMMEDIATE',
+        },
+        'TEST': {
+            'NAME': BASE_DIR / 'test_db.sqlite3',
+        },
     }
 }
 
+# WAL, PRAGMA из yanote.sqlite и постоянные соединения;
+# NOTES_SQLITE_TUNING=0 оставляет настройки SQLite по умолчанию.
+NOTES_SQLITE_TUNING = os.environ.get('NOTES_SQLITE_TUNING', '1') != '0'
+
+if NOTES_SQLITE_TUNING:
+    DATABASES['default']['OPTIONS']['init_command'] = sqlite.init_command()
+    DATABASES['default']['CONN_MAX_AGE'] = 600
+    DATABASES['default']['CONN_HEALTH_CHECKS'] = True
+
+# Алиасы реплик для чтения, например копия db.sqlite3:
+# DATABASES['replica'] = {
+#     'ENGINE': 'django.db.backends.sqlite3',
+#     'NAME': BASE_DIR / 'db_replica.sqlite3',
+#     'TEST': {'MIRROR': 'default'},
+# }
+# DATABASE_REPLICAS = ['replica']
+DATABASE_REPLICAS = []
+DATABASE_ROUTERS = ['notes.routers.PrimaryReplicaRouter']
+# Сколько секунд после записи читать из основной базы.
+NOTES_REPLICA_PIN_SECONDS = 5
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'yanote',
+    }
+}
+
+NOTES_LIST_CACHE = 'default'
+NOTES_LIST_CACHE_TIMEOUT = 300
+
+# Журнал замеров PerformanceMiddleware для manage.py perf_report.
+NOTES_PERF_LOG = None
+# Превышение query_budget представления - исключение, а не warning.
+NOTES_ENFORCE_QUERY_BUDGETS = False
+# Текст длиннее этого числа байт хранится сжатым в отдельной таблице,
+# None - не сжимать.
+NOTES_COMPRESS_TEXT_OVER = None
+# Каждая K-я ревизия заметки хранится полной копией, остальные - разницей.
+NOTES_REVISION_SNAPSHOT_EVERY = 10
+
+# Очередь фоновых задач: 'thread' - потоки в процессе, 'database' -
+# таблица, которую разбирает manage.py run_tasks, 'inline' - сразу.
+NOTES_TASK_BACKEND = 'thread'
+NOTES_TASK_WORKERS = 2
+NOTES_TASK_MAX_ATTEMPTS = 3
+# Пауза перед первым повтором, секунд; дальше удваивается.
+NOTES_TASK_RETRY_DELAY = 1
+# Задача очереди в базе, которую взяли и не завершили за столько секунд
+# (исполнитель упал), возвращается в очередь как упавшая попытка.
+NOTES_TASK_LEASE = 300
+# Сколько секунд процесс при выходе ждёт, пока потоки 'thread' разберут
+# очередь; задачи, не успевшие выполниться, теряются.
+NOTES_TASK_DRAIN_TIMEOUT = 10
+
+# Ограничение изменяющих запросов по пользователю и по IP: rate запросов
+# за period секунд, подряд - не больше burst.
+NOTES_RATE_LIMIT_ENABLED = True
+NOTES_RATE_LIMIT_CACHE = 'default'
+NOTES_RATE_LIMITS = {
+    'notes-write': {'rate': 60, 'period': 60, 'burst': 20},
+    'signup': {'rate': 5, 'period': 3600, 'burst': 3},
+}
+
+# Ответы JSON API длиннее этого числа байт сжимаются gzip или brotli.
+NOTES_API_COMPRESS_OVER = 1024
+
+# Сессии из кэша с записью в базу. Без обращений к базе вовсе -
+# 'django.contrib.sessions.backends.signed_cookies', прежнее поведение -
+# 'django.contrib.sessions.backends.db'.
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+
+# ModelBackend оставлен для сессий, созданных до CachedModelBackend.
+AUTHENTICATION_BACKENDS = [
+    'notes.auth.CachedModelBackend',
+    'django.contrib.auth.backends.ModelBackend',
+]
+# Сколько секунд пользователь живёт в кэше процесса, 0 - не кэшировать.
+NOTES_USER_CACHE_TTL = 60
+NOTES_USER_CACHE_SIZE = 1000
+# Проверка паролей при входе: потоков хеширования, мест в очереди к ним
+# и сколько секунд ждать места, прежде чем ответить 503.
+NOTES_LOGIN_WORKERS = 4
+NOTES_LOGIN_QUEUE = 16
+NOTES_LOGIN_WAIT = 5
+
+# Новые пароли хешируются первым хешером, пароли в остальных форматах
+# перехешируются им при входе. scrypt с parallelism=1 в несколько раз
+# быстрее PBKDF2 по умолчанию и требует 128 * block_size * work_factor
+# байт памяти (16 МБ), что и делает перебор дорогим.
+PASSWORD_HASHERS = [
+    'notes.hashers.ScryptPasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+]
+NOTES_SCRYPT = {'work_factor': 2 ** 14, 'block_size': 8, 'parallelism': 1}
 
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -82,6 +222,30 @@ USE_TZ = True
 
 
 STATIC_URL = '/static/'
+STATIC_ROOT = BASE_DIR / 'staticfiles'
+
+# NOTES_STATIC_MANIFEST=1 собирает статику с хешем содержимого в именах
+# и сжатыми копиями. Тогда после каждого обновления кода и перед
+# запуском нужен python manage.py collectstatic: без манифеста страницы
+# со {% static %} отвечают 500.
+NOTES_STATIC_MANIFEST = os.environ.get('NOTES_STATIC_MANIFEST', '0') != '0'
+
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': (
+            'notes.staticfiles.CompressedManifestStaticFilesStorage'
+            if NOTES_STATIC_MANIFEST
+            else 'django.contrib.staticfiles.storage.StaticFilesStorage'
+        ),
+    },
+}
+# WSGI/ASGI-приложение само отдаёт STATIC_URL из STATIC_ROOT.
+NOTES_STATIC_SERVE = True
+# Кэш для файлов без хеша в имени, секунды.
+NOTES_STATIC_MAX_AGE = 60
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
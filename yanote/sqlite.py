@@ -0,0 +1,21 @@
+"""PRAGMA для соединений SQLite при нескольких писателях и читателях."""
+
+PRAGMAS = {
+    # Читатели не ждут писателя, писатель не ждёт читателей.
+    'journal_mode': 'WAL',
+    # В режиме WAL fsync только на контрольных точках.
+    'synchronous': 'NORMAL',
+    'mmap_size': 256 * 1024 * 1024,
+    # Отрицательное значение - размер кэша страниц в КиБ.
+    'cache_size': -64 * 1024,
+    'busy_timeout': 5000,
+    'temp_store': 'MEMORY',
+}
+
+
+def init_command(pragmas=None):
+    """Строка для OPTIONS['init_command'], выполняемая на новом соединении."""
+    pragmas = PRAGMAS if pragmas is None else pragmas
+    return ';'.join(
+        f'PRAGMA {name}={value}' for name, value in pragmas.items()
+    )
@@ -1,14 +1,20 @@
-from django.contrib import admin
+from django.conf import settings
 from django.contrib.auth import views as auth_views
 from django.contrib.auth.forms import UserCreationForm
 from django.urls import include, path
 from django.views.generic import CreateView
 
+from notes.ratelimit import rate_limit
+
 urlpatterns = [
     path('', include('notes.urls')),
-    path('admin/', admin.site.urls),
 ]
 
+if settings.NOTES_ADMIN:
+    from django.contrib import admin
+
+    urlpatterns += [path('admin/', admin.site.urls)]
+
 auth_urls = ([
     path(
         'login/',
@@ -25,11 +31,11 @@ auth_urls = ([
     ),
     path(
         'signup/',
-        CreateView.as_view(
+        rate_limit('signup')(CreateView.as_view(
             form_class=UserCreationForm,
             success_url='/',
             template_name='registration/signup.html',
-        ),
+        )),
         name='signup'
     ),
 ], 'users')
@@ -11,6 +11,11 @@ import os
 
 from django.core.wsgi import get_wsgi_application
 
+from notes.staticfiles import StaticFilesApp, serve_static
+from notes.templating import warm_up_on_startup
+
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yanote.settings')
 
-application = get_wsgi_application()
+application = serve_static(get_wsgi_application(), StaticFilesApp)
+
+warm_up_on_startup()